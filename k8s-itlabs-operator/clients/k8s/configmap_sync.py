@@ -0,0 +1,125 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from kubernetes import client
+from kubernetes.client import ApiException, V1ConfigMap, V1ObjectMeta
+
+from exceptions import InfrastructureServiceProblem
+
+logger = logging.getLogger('configmap_sync')
+
+
+@dataclass
+class SyncLoop:
+    interval: float
+    stop: threading.Event = field(default_factory=threading.Event)
+    thread: Optional[threading.Thread] = None
+
+
+class ConfigMapSync:
+    """
+    Data of ConfigMap that is changed in memory and written to Kubernetes
+    in background every `sync_interval` seconds, so callers are not delayed
+    by Kubernetes API. Keys are merged, so ConfigMap may be shared by
+    replicas of operator.
+
+    `on_sync` is called with actual ConfigMap after every sync, e.g. to
+    read its annotations.
+    """
+
+    def __init__(self, name: str, namespace: str, sync_interval: float,
+                 on_sync: Optional[Callable[[V1ConfigMap], None]] = None):
+        self.name = name
+        self.namespace = namespace
+        self._on_sync = on_sync
+
+        self._api = client.CoreV1Api()
+        # Value None means that key must be removed from ConfigMap
+        self._pending: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._sync = SyncLoop(sync_interval)
+
+    @property
+    def sync_interval(self) -> float:
+        return self._sync.interval
+
+    def _read_or_create(self) -> V1ConfigMap:
+        try:
+            return self._api.read_namespaced_config_map(self.name, self.namespace)
+        except ApiException as e:
+            if e.status != 404:
+                raise
+        try:
+            return self._api.create_namespaced_config_map(
+                self.namespace, V1ConfigMap(metadata=V1ObjectMeta(name=self.name), data={})
+            )
+        except ApiException as e:
+            # Another replica created ConfigMap first
+            if e.status != 409:
+                raise
+        return self._api.read_namespaced_config_map(self.name, self.namespace)
+
+    def read(self) -> V1ConfigMap:
+        """Returns ConfigMap, it is created if it doesn't exist."""
+        try:
+            config_map = self._read_or_create()
+        except ApiException as e:
+            raise InfrastructureServiceProblem('Kubernetes', e)
+        if self._on_sync is not None:
+            self._on_sync(config_map)
+        return config_map
+
+    def set(self, key: str, value: Optional[str]):
+        with self._lock:
+            self._pending[key] = value
+
+    def delete(self, key: str):
+        self.set(key, None)
+
+    def discard(self, key: str):
+        """Removes key unless it was changed after the last sync."""
+        with self._lock:
+            self._pending.setdefault(key, None)
+
+    def sync(self):
+        """Writes pending changes and reads actual ConfigMap in one request."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        try:
+            if pending:
+                # Keys with null value are removed by merge patch
+                config_map = self._api.patch_namespaced_config_map(
+                    self.name, self.namespace, {'data': pending}
+                )
+            else:
+                config_map = self._api.read_namespaced_config_map(self.name, self.namespace)
+        except ApiException as e:
+            with self._lock:
+                # Changes made during request are newer than failed ones
+                self._pending = {**pending, **self._pending}
+            raise InfrastructureServiceProblem('Kubernetes', e)
+        if self._on_sync is not None:
+            self._on_sync(config_map)
+
+    def _sync_loop(self):
+        while not self._sync.stop.wait(self._sync.interval):
+            try:
+                self.sync()
+            except Exception as e:
+                logger.error(f"ConfigMap `{self.name}` sync failed", exc_info=e)
+
+    def start(self):
+        self._sync.stop.clear()
+        self._sync.thread = threading.Thread(
+            target=self._sync_loop, name=f'configmap-sync-{self.name}', daemon=True
+        )
+        self._sync.thread.start()
+
+    def stop(self):
+        self._sync.stop.set()
+        if self._sync.thread is not None:
+            self._sync.thread.join()
+            self._sync.thread = None
+        self.sync()
@@ -0,0 +1,61 @@
+import copy
+import threading
+from typing import Dict, Iterable, Optional, Set
+
+from utils.cache import MISSING
+
+CONNECTORS_GROUP = "itlabs.io"
+CONNECTORS_VERSION = "v1"
+CONNECTORS_PLURALS = (
+    "keycloakconnectors",
+    "postgresconnectors",
+    "rabbitconnectors",
+    "sentryconnectors",
+)
+
+
+class CustomObjectStore:
+    """
+    In-memory store of cluster-scoped custom objects indexed by name.
+
+    Store is filled by initial list of objects and is kept fresh by watch
+    events. Until initial list of plural is loaded, `get` returns `MISSING`
+    and caller should request object from Kubernetes API.
+    """
+
+    def __init__(self):
+        self._objects: Dict[str, Dict[str, dict]] = {}
+        self._synced_plurals: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def replace(self, plural: str, objects: Iterable[dict]):
+        """Replace all objects of plural, e.g. after initial list."""
+        with self._lock:
+            self._objects[plural] = {
+                obj["metadata"]["name"]: copy.deepcopy(obj) for obj in objects
+            }
+            self._synced_plurals.add(plural)
+
+    def upsert(self, plural: str, obj: dict):
+        with self._lock:
+            self._objects.setdefault(plural, {})[obj["metadata"]["name"]] = copy.deepcopy(obj)
+
+    def delete(self, plural: str, name: str):
+        with self._lock:
+            self._objects.get(plural, {}).pop(name, None)
+
+    def get(self, plural: str, name: str) -> Optional[dict]:
+        with self._lock:
+            if plural not in self._synced_plurals:
+                return MISSING
+            obj = self._objects.get(plural, {}).get(name)
+        return copy.deepcopy(obj) if obj is not None else None
+
+    def is_synced(self, plural: str) -> bool:
+        return plural in self._synced_plurals
+
+    def is_ready(self, plurals: Iterable[str] = CONNECTORS_PLURALS) -> bool:
+        return all(self.is_synced(plural) for plural in plurals)
+
+
+connectors_store = CustomObjectStore()
@@ -1,9 +1,11 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from kubernetes import client, config
 from kubernetes.client import V1ConfigMap, ApiException
 
 import settings as operator_settings
+from clients.k8s.custom_object_store import connectors_store, CONNECTORS_GROUP, CONNECTORS_VERSION
+from utils.cache import MISSING
 
 
 class KubernetesClient:
@@ -25,6 +27,31 @@ class KubernetesClient:
         except ApiException:
             return None
 
+    @staticmethod
+    def list_cluster_custom_objects(group: str, version: str, plural: str) -> List[Dict]:
+        api = client.CustomObjectsApi()
+        return api.list_cluster_custom_object(group=group, version=version, plural=plural).get("items", [])
+
+    @classmethod
+    def get_connector_custom_object(cls, plural: str, name: str) -> Optional[Dict]:
+        """
+        Returns connector custom object from in-memory store. Kubernetes API
+        is requested only if store is not synced yet or object is not found
+        in it, e.g. watch event was not received yet.
+
+        Object from API is not put into store: its watch DELETE event may be
+        already processed, so store is changed only by watch events.
+        """
+        obj = connectors_store.get(plural, name)
+        if obj is MISSING or obj is None:
+            obj = cls.get_cluster_custom_object(
+                group=CONNECTORS_GROUP,
+                version=CONNECTORS_VERSION,
+                plural=plural,
+                name=name,
+            )
+        return obj
+
     @staticmethod
     def configure_kubernetes():
         try:
@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from kubernetes import client
+from kubernetes.client import ApiException, V1Lease, V1LeaseSpec, V1ObjectMeta
+
+import settings as operator_settings
+from exceptions import InfrastructureServiceProblem
+from observability.metrics.metrics import app_lease_lost_total
+
+logger = logging.getLogger('lease_lock')
+
+
+class LeaseLockTimeout(TimeoutError):
+    pass
+
+
+@dataclass(frozen=True)
+class LeaseTiming:
+    lease_duration: int = operator_settings.LEASE_DURATION
+    renew_interval: float = operator_settings.LEASE_RENEW_INTERVAL
+    retry_interval: float = operator_settings.LEASE_RETRY_INTERVAL
+
+
+@dataclass
+class LeaseRenewal:
+    stop: threading.Event = field(default_factory=threading.Event)
+    # Set when lease was taken over by another replica while it was held
+    lost: threading.Event = field(default_factory=threading.Event)
+    thread: Optional[threading.Thread] = None
+
+
+class LeaseLock:
+    """
+    Lock shared between operator replicas based on `coordination.k8s.io/v1`
+    Lease object.
+
+    Holder renews the lease in background every `renew_interval` seconds.
+    Lease that was not renewed for `lease_duration` seconds, e.g. holder
+    crashed, is taken over by another replica. Holder that lost the lease
+    this way is not able to renew it anymore, so holder should check `is_lost`
+    when work under the lock is done.
+    """
+
+    def __init__(self, name: str,
+                 namespace: str = operator_settings.OPERATOR_NAMESPACE,
+                 identity: str = operator_settings.LEASE_HOLDER_IDENTITY,
+                 lease_duration: int = operator_settings.LEASE_DURATION,
+                 renew_interval: float = operator_settings.LEASE_RENEW_INTERVAL,
+                 retry_interval: float = operator_settings.LEASE_RETRY_INTERVAL):
+        self.name = name
+        self.namespace = namespace
+        self.identity = identity
+        self.timing = LeaseTiming(lease_duration, renew_interval, retry_interval)
+
+        self._api = client.CoordinationV1Api()
+        self._lease: Optional[V1Lease] = None
+        self._renewal = LeaseRenewal()
+
+    @property
+    def is_lost(self) -> bool:
+        return self._renewal.lost.is_set()
+
+    @staticmethod
+    def _now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    def _is_expired(self, lease: V1Lease) -> bool:
+        spec = lease.spec
+        if not spec.holder_identity or not spec.renew_time:
+            return True
+        duration = spec.lease_duration_seconds or self.timing.lease_duration
+        return spec.renew_time + timedelta(seconds=duration) < self._now()
+
+    def _build_spec(self) -> V1LeaseSpec:
+        now = self._now()
+        return V1LeaseSpec(
+            holder_identity=self.identity,
+            lease_duration_seconds=self.timing.lease_duration,
+            acquire_time=now,
+            renew_time=now,
+        )
+
+    def _try_acquire(self) -> bool:
+        try:
+            lease = self._api.read_namespaced_lease(self.name, self.namespace)
+        except ApiException as e:
+            if e.status != 404:
+                raise
+            lease = None
+
+        try:
+            if lease is None:
+                self._lease = self._api.create_namespaced_lease(
+                    self.namespace,
+                    V1Lease(metadata=V1ObjectMeta(name=self.name), spec=self._build_spec()),
+                )
+                return True
+            if lease.spec.holder_identity == self.identity or self._is_expired(lease):
+                if lease.spec.holder_identity not in (None, self.identity):
+                    logger.warning(f"Lease `{self.name}` of `{lease.spec.holder_identity}` is expired, taking over")
+                # Resource version in metadata makes replace fail on concurrent change
+                lease.spec = self._build_spec()
+                self._lease = self._api.replace_namespaced_lease(self.name, self.namespace, lease)
+                return True
+        except ApiException as e:
+            # Another replica created or updated lease first
+            if e.status != 409:
+                raise
+        return False
+
+    def acquire(self, timeout: Optional[float] = None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._try_acquire():
+                if deadline is not None and time.monotonic() + self.timing.retry_interval > deadline:
+                    raise LeaseLockTimeout(f"Lease `{self.name}` is not acquired in {timeout} seconds")
+                time.sleep(self.timing.retry_interval)
+        except ApiException as e:
+            raise InfrastructureServiceProblem('Kubernetes', e)
+        self._start_renewal()
+
+    def _renew(self):
+        self._lease.spec.renew_time = self._now()
+        self._lease = self._api.replace_namespaced_lease(self.name, self.namespace, self._lease)
+
+    def _renewal_loop(self):
+        while not self._renewal.stop.wait(self.timing.renew_interval):
+            try:
+                self._renew()
+            except ApiException as e:
+                if e.status != 409:
+                    logger.error(f"Lease `{self.name}` renewal failed", exc_info=e)
+                    continue
+                # Lease was taken over, there is nothing to renew
+                logger.error(f"Lease `{self.name}` was taken over by another replica while it was held")
+                app_lease_lost_total.inc()
+                self._renewal.lost.set()
+                return
+            except Exception as e:
+                logger.error(f"Lease `{self.name}` renewal failed", exc_info=e)
+
+    def _start_renewal(self):
+        self._renewal = LeaseRenewal()
+        self._renewal.thread = threading.Thread(
+            target=self._renewal_loop, name=f'lease-renewal-{self.name}', daemon=True
+        )
+        self._renewal.thread.start()
+
+    def release(self):
+        self._renewal.stop.set()
+        if self._renewal.thread is not None:
+            self._renewal.thread.join()
+            self._renewal.thread = None
+        if self._lease is None:
+            return
+        try:
+            self._api.delete_namespaced_lease(
+                self.name,
+                self.namespace,
+                body=client.V1DeleteOptions(
+                    preconditions=client.V1Preconditions(
+                        resource_version=self._lease.metadata.resource_version
+                    )
+                ),
+            )
+        except ApiException as e:
+            # Lease is expired and taken over or deleted, so it is released anyway
+            logger.warning(f"Lease `{self.name}` was not deleted: {e.reason}")
+        finally:
+            self._lease = None
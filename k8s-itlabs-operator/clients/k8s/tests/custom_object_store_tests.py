@@ -0,0 +1,77 @@
+import pytest
+
+from clients.k8s.custom_object_store import CustomObjectStore
+from clients.k8s.k8s_client import KubernetesClient
+from utils.cache import MISSING
+
+
+def connector(name: str, host: str = 'host') -> dict:
+    return {'metadata': {'name': name}, 'spec': {'host': host}}
+
+
+@pytest.mark.unit
+class TestCustomObjectStore:
+    def test_get_before_sync(self):
+        store = CustomObjectStore()
+        store.upsert('postgresconnectors', connector('pg'))
+
+        assert store.get('postgresconnectors', 'pg') is MISSING
+        assert not store.is_ready(['postgresconnectors'])
+
+    def test_get_after_sync(self):
+        store = CustomObjectStore()
+        store.replace('postgresconnectors', [connector('pg')])
+
+        assert store.get('postgresconnectors', 'pg') == connector('pg')
+        assert store.get('postgresconnectors', 'other') is None
+        assert store.is_ready(['postgresconnectors'])
+
+    def test_upsert_and_delete(self):
+        store = CustomObjectStore()
+        store.replace('postgresconnectors', [connector('pg')])
+
+        store.upsert('postgresconnectors', connector('pg', host='new-host'))
+        assert store.get('postgresconnectors', 'pg')['spec']['host'] == 'new-host'
+
+        store.delete('postgresconnectors', 'pg')
+        assert store.get('postgresconnectors', 'pg') is None
+
+    def test_returned_object_is_copy(self):
+        store = CustomObjectStore()
+        store.replace('postgresconnectors', [connector('pg')])
+
+        store.get('postgresconnectors', 'pg')['spec']['host'] = 'changed'
+
+        assert store.get('postgresconnectors', 'pg')['spec']['host'] == 'host'
+
+
+@pytest.mark.unit
+class TestGetConnectorCustomObject:
+    def test_answered_from_store(self, mocker):
+        store = CustomObjectStore()
+        store.replace('postgresconnectors', [connector('pg')])
+        mocker.patch('clients.k8s.k8s_client.connectors_store', store)
+        api_mock = mocker.patch.object(KubernetesClient, 'get_cluster_custom_object')
+
+        assert KubernetesClient.get_connector_custom_object('postgresconnectors', 'pg') == connector('pg')
+        api_mock.assert_not_called()
+
+    def test_fallback_to_api_on_miss(self, mocker):
+        store = CustomObjectStore()
+        mocker.patch('clients.k8s.k8s_client.connectors_store', store)
+        api_mock = mocker.patch.object(KubernetesClient, 'get_cluster_custom_object', return_value=connector('pg'))
+
+        assert KubernetesClient.get_connector_custom_object('postgresconnectors', 'pg') == connector('pg')
+        api_mock.assert_called_once()
+
+    def test_object_from_api_is_not_stored(self, mocker):
+        store = CustomObjectStore()
+        store.replace('postgresconnectors', [])
+        mocker.patch('clients.k8s.k8s_client.connectors_store', store)
+        mocker.patch.object(KubernetesClient, 'get_cluster_custom_object', return_value=connector('pg'))
+
+        KubernetesClient.get_connector_custom_object('postgresconnectors', 'pg')
+        # Object deleted meanwhile is not resurrected in store
+        store.delete('postgresconnectors', 'pg')
+
+        assert store.get('postgresconnectors', 'pg') is None
@@ -0,0 +1,84 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from kubernetes.client import ApiException, V1Lease, V1LeaseSpec, V1ObjectMeta
+
+from clients.k8s.lease_lock import LeaseLock, LeaseLockTimeout
+
+
+def lease(holder: str, renewed_ago: float = 0, duration: int = 15) -> V1Lease:
+    renew_time = LeaseLock._now() - timedelta(seconds=renewed_ago)
+    return V1Lease(
+        metadata=V1ObjectMeta(name='lease', resource_version='1'),
+        spec=V1LeaseSpec(holder_identity=holder, lease_duration_seconds=duration, renew_time=renew_time),
+    )
+
+
+@pytest.fixture
+def api(mocker):
+    api = MagicMock()
+    mocker.patch('clients.k8s.lease_lock.client.CoordinationV1Api', return_value=api)
+    return api
+
+
+def create_lock(**kwargs) -> LeaseLock:
+    lock = LeaseLock('lease', namespace='operator', identity='replica-1', retry_interval=.01, **kwargs)
+    lock._start_renewal = MagicMock()
+    return lock
+
+
+@pytest.mark.unit
+class TestLeaseLock:
+    def test_create_missing_lease(self, api):
+        api.read_namespaced_lease.side_effect = ApiException(status=404)
+
+        create_lock().acquire()
+
+        api.create_namespaced_lease.assert_called_once()
+
+    def test_take_over_expired_lease(self, api):
+        api.read_namespaced_lease.return_value = lease('replica-2', renewed_ago=60)
+
+        create_lock().acquire()
+
+        replaced = api.replace_namespaced_lease.call_args.args[2]
+        assert replaced.spec.holder_identity == 'replica-1'
+
+    def test_wait_for_lease_of_another_replica(self, api):
+        api.read_namespaced_lease.return_value = lease('replica-2')
+
+        with pytest.raises(LeaseLockTimeout):
+            create_lock().acquire(timeout=.05)
+
+        api.replace_namespaced_lease.assert_not_called()
+
+    def test_retry_on_conflict(self, api):
+        api.read_namespaced_lease.side_effect = ApiException(status=404)
+        api.create_namespaced_lease.side_effect = [ApiException(status=409), lease('replica-1')]
+
+        create_lock().acquire()
+
+        assert api.create_namespaced_lease.call_count == 2
+
+    def test_release_deletes_lease(self, api):
+        api.read_namespaced_lease.side_effect = ApiException(status=404)
+        api.create_namespaced_lease.return_value = lease('replica-1')
+        lock = create_lock()
+        lock.acquire()
+
+        lock.release()
+
+        api.delete_namespaced_lease.assert_called_once()
+
+    def test_lease_taken_over_during_renewal_is_lost(self, api):
+        api.read_namespaced_lease.side_effect = ApiException(status=404)
+        api.create_namespaced_lease.return_value = lease('replica-1')
+        api.replace_namespaced_lease.side_effect = ApiException(status=409)
+        lock = LeaseLock('lease', namespace='operator', identity='replica-1', renew_interval=.01)
+        lock.acquire()
+
+        lock._renewal.thread.join(timeout=1)
+
+        assert lock.is_lost
+        lock.release()
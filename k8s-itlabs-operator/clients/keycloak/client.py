@@ -1,3 +1,4 @@
+import hashlib
 import http.client
 from abc import ABCMeta, abstractmethod
 from typing import Optional
@@ -11,9 +12,11 @@ from clients.keycloak.dto_factories import ClientDtoFactory, TokenDtoFactory, \
     ErrorDtoFactory
 from clients.keycloak.settings import KEYCLOAK_TIMEOUT
 from clients.keycloak.exceptions import KeycloakError
+from clients.keycloak.token_cache import KeycloakTokenCache, keycloak_token_cache
 from clients.keycloak.url_patterns import URL_ADMIN_CLIENT, URL_ADMIN_CLIENTS, \
     URL_TOKEN, URL_ADMIN_CLIENT_SECRET
 from exceptions import InfrastructureServiceProblem
+from utils.http import get_session
 
 
 class AbstractKeycloakClient:
@@ -33,26 +36,27 @@ class AbstractKeycloakClient:
 
 
 class KeycloakClient(AbstractKeycloakClient):
-    def __init__(self, url: str, realm: str, username: str, password: str):
+    def __init__(self, url: str, realm: str, username: str, password: str,
+                 session: Optional[requests.Session] = None,
+                 token_cache: Optional[KeycloakTokenCache] = None):
         self._url = url
         self._realm = realm
         self._username = username
         self._password = password
+        self._session = session or get_session('keycloak')
+        self._token_cache = token_cache or keycloak_token_cache
+        # Token of changed password isn't reused, password itself isn't kept in key
+        self._token_key = (url, realm, username, hashlib.sha256(password.encode()).hexdigest())
 
     def _build_path(self, path: str) -> str:
         return urljoin(self._url, path)
 
-    def _get_token(self) -> Token:
+    def _request_token(self, data: dict) -> Token:
         path = self._build_path(URL_TOKEN.format(realm_id=self._realm))
         try:
-            response = requests.post(
+            response = self._session.post(
                 path,
-                data={
-                    "client_id": "admin-cli",
-                    "grant_type": "password",
-                    "username": self._username,
-                    "password": self._password,
-                },
+                data={"client_id": "admin-cli", **data},
                 timeout=KEYCLOAK_TIMEOUT,
             )
             if response.status_code != http.client.OK:
@@ -62,20 +66,45 @@ class KeycloakClient(AbstractKeycloakClient):
             raise InfrastructureServiceProblem("Keycloak", e)
         return TokenDtoFactory.dto_from_dict(response.json())
 
-    def _get_auth(self) -> BearerAuth:
+    def _login(self) -> Token:
+        return self._request_token({
+            "grant_type": "password",
+            "username": self._username,
+            "password": self._password,
+        })
+
+    def _refresh(self, refresh_token: str) -> Token:
+        return self._request_token({
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        })
+
+    def _get_token(self) -> Token:
+        return self._token_cache.get(self._token_key, login=self._login, refresh=self._refresh)
+
+    def _send(self, method: str, path: str, **kwargs) -> requests.Response:
+        """
+        Sends admin request with cached token. If token was revoked before
+        its expiration, request is repeated once with token of full login.
+        """
         token = self._get_token()
-        return BearerAuth(token.access_token)
+        response = self._session.request(
+            method, path, auth=BearerAuth(token.access_token), timeout=KEYCLOAK_TIMEOUT, **kwargs
+        )
+        if response.status_code == http.client.UNAUTHORIZED:
+            self._token_cache.invalidate(self._token_key, token)
+            token = self._get_token()
+            response = self._session.request(
+                method, path, auth=BearerAuth(token.access_token), timeout=KEYCLOAK_TIMEOUT, **kwargs
+            )
+        return response
 
     def get_client(self, client_id: str) -> Optional[ClientDto]:
         path = self._build_path(URL_ADMIN_CLIENT.format(
             realm_id=self._realm, client_id=client_id
         ))
         try:
-            response = requests.get(
-                path,
-                auth=self._get_auth(),
-                timeout=KEYCLOAK_TIMEOUT,
-            )
+            response = self._send("GET", path)
             if response.status_code != http.client.OK:
                 error = ErrorDtoFactory.dto_from_dict(response.json())
                 raise InfrastructureServiceProblem("Keycloak", KeycloakError(error))
@@ -92,12 +121,7 @@ class KeycloakClient(AbstractKeycloakClient):
         path = self._build_path(URL_ADMIN_CLIENTS.format(realm_id=self._realm))
         data = ClientDtoFactory.dict_from_dto(client)
         try:
-            response = requests.post(
-                path,
-                auth=self._get_auth(),
-                json=data,
-                timeout=KEYCLOAK_TIMEOUT,
-            )
+            response = self._send("POST", path, json=data)
             if response.status_code != http.client.CREATED:
                 error = ErrorDtoFactory.dto_from_dict(response.json())
                 raise InfrastructureServiceProblem("Keycloak", KeycloakError(error))
@@ -109,11 +133,7 @@ class KeycloakClient(AbstractKeycloakClient):
             realm_id=self._realm, client_id=client_id
         ))
         try:
-            response = requests.post(
-                path,
-                auth=self._get_auth(),
-                timeout=KEYCLOAK_TIMEOUT,
-            )
+            response = self._send("POST", path)
             if response.status_code != http.client.OK:
                 error = ErrorDtoFactory.dto_from_dict(response.json())
                 raise InfrastructureServiceProblem("Keycloak", KeycloakError(error))
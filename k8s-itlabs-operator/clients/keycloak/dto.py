@@ -5,6 +5,9 @@ from typing import Optional
 @dataclass
 class Token:
     access_token: str
+    expires_in: Optional[int] = None
+    refresh_token: Optional[str] = None
+    refresh_expires_in: Optional[int] = None
 
 
 @dataclass
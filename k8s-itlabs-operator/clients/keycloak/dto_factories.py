@@ -4,7 +4,12 @@ from clients.keycloak.dto import Token, ClientDto, Error
 class TokenDtoFactory:
     @staticmethod
     def dto_from_dict(data: dict) -> Token:
-        return Token(access_token=data["access_token"])
+        return Token(
+            access_token=data["access_token"],
+            expires_in=data.get("expires_in"),
+            refresh_token=data.get("refresh_token"),
+            refresh_expires_in=data.get("refresh_expires_in"),
+        )
 
 
 class ClientDtoFactory:
@@ -1 +1,5 @@
+from os import getenv
+
 KEYCLOAK_TIMEOUT = 10
+# Cached admin token is refreshed this time before its expiration, seconds
+KEYCLOAK_TOKEN_EXPIRY_MARGIN = float(getenv("KEYCLOAK_TOKEN_EXPIRY_MARGIN", "10"))
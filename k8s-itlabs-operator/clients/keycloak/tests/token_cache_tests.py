@@ -0,0 +1,103 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from clients.keycloak.client import KeycloakClient
+from clients.keycloak.dto import Token
+from clients.keycloak.token_cache import KeycloakTokenCache
+from exceptions import InfrastructureServiceProblem
+
+KEY = ("http://keycloak", "master", "admin", "password-hash")
+
+
+def token(name: str = "access", expires_in: int = 60, refresh_token: str = "refresh") -> Token:
+    return Token(access_token=name, expires_in=expires_in, refresh_token=refresh_token, refresh_expires_in=1800)
+
+
+@pytest.mark.unit
+class TestKeycloakTokenCache:
+    def test_token_is_cached(self):
+        cache = KeycloakTokenCache(expiry_margin=10)
+        login = MagicMock(return_value=token())
+
+        cache.get(KEY, login=login, refresh=MagicMock())
+        cache.get(KEY, login=login, refresh=MagicMock())
+
+        assert login.call_count == 1
+
+    def test_expiring_token_is_refreshed(self):
+        cache = KeycloakTokenCache(expiry_margin=10)
+        login = MagicMock(return_value=token(expires_in=5))
+        refresh = MagicMock(return_value=token("refreshed"))
+
+        cache.get(KEY, login=login, refresh=refresh)
+
+        assert cache.get(KEY, login=login, refresh=refresh).access_token == "refreshed"
+        refresh.assert_called_once_with("refresh")
+        assert login.call_count == 1
+
+    def test_login_on_failed_refresh(self):
+        cache = KeycloakTokenCache(expiry_margin=10)
+        login = MagicMock(side_effect=[token(expires_in=5), token("new")])
+        refresh = MagicMock(side_effect=InfrastructureServiceProblem("Keycloak", Exception()))
+
+        cache.get(KEY, login=login, refresh=refresh)
+
+        assert cache.get(KEY, login=login, refresh=refresh).access_token == "new"
+        assert login.call_count == 2
+
+    def test_concurrent_callers_share_login(self):
+        cache = KeycloakTokenCache(expiry_margin=10)
+
+        def slow_login():
+            time.sleep(0.05)
+            return token()
+        login = MagicMock(side_effect=slow_login)
+
+        threads = [
+            threading.Thread(target=cache.get, args=(KEY,), kwargs={"login": login, "refresh": MagicMock()})
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert login.call_count == 1
+
+
+@pytest.mark.unit
+class TestKeycloakClientToken:
+    def test_login_again_on_unauthorized(self):
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "old", "expires_in": 60})),
+            MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "new", "expires_in": 60})),
+        ]
+        session.request.side_effect = [
+            MagicMock(status_code=401),
+            MagicMock(status_code=200, json=MagicMock(return_value=[])),
+        ]
+        client = KeycloakClient("http://keycloak", "master", "admin", "password",
+                                session=session, token_cache=KeycloakTokenCache())
+
+        assert client.get_client("client") is None
+        assert session.post.call_count == 2
+        assert session.request.call_args.kwargs["auth"].token == "new"
+
+    def test_login_again_with_changed_password(self):
+        session = MagicMock()
+        session.post.side_effect = [
+            MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "old", "expires_in": 60})),
+            MagicMock(status_code=200, json=MagicMock(return_value={"access_token": "new", "expires_in": 60})),
+        ]
+        session.request.return_value = MagicMock(status_code=200, json=MagicMock(return_value=[]))
+        cache = KeycloakTokenCache()
+
+        KeycloakClient("http://keycloak", "master", "admin", "old", session=session, token_cache=cache).get_client("a")
+        KeycloakClient("http://keycloak", "master", "admin", "new", session=session, token_cache=cache).get_client("a")
+
+        assert session.post.call_count == 2
+        assert session.request.call_args.kwargs["auth"].token == "new"
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from clients.keycloak.dto import Token
+from clients.keycloak.settings import KEYCLOAK_TOKEN_EXPIRY_MARGIN
+from exceptions import InfrastructureServiceProblem
+from observability.metrics.metrics import app_cache_events_total
+
+logger = logging.getLogger('keycloak_client')
+
+# url, realm, username and SHA-256 hash of password
+TokenKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class CachedToken:
+    token: Token
+    expires_at: float
+    refresh_expires_at: float
+
+
+class KeycloakTokenCache:
+    """
+    Admin tokens keyed by (url, realm, username, password hash), so token
+    of changed password isn't reused.
+
+    Token is refreshed `expiry_margin` seconds before its expiration with
+    refresh token grant if refresh token is still valid, otherwise with
+    full login. Concurrent callers of one key wait for single refresh.
+    """
+
+    def __init__(self, expiry_margin: float = KEYCLOAK_TOKEN_EXPIRY_MARGIN):
+        self.expiry_margin = expiry_margin
+        self._tokens: Dict[TokenKey, CachedToken] = {}
+        self._key_locks: Dict[TokenKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _get_key_lock(self, key: TokenKey) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _get_fresh(self, key: TokenKey) -> Optional[Token]:
+        cached = self._tokens.get(key)
+        if cached is not None and cached.expires_at - self.expiry_margin > time.monotonic():
+            return cached.token
+        return None
+
+    def _cache_token(self, key: TokenKey, token: Token):
+        now = time.monotonic()
+        # Token without lifetime is not cached
+        expires_at = now + token.expires_in if token.expires_in else now
+        if token.refresh_token and token.refresh_expires_in:
+            refresh_expires_at = now + token.refresh_expires_in
+        else:
+            refresh_expires_at = now
+        self._tokens[key] = CachedToken(token, expires_at, refresh_expires_at)
+
+    def get(self, key: TokenKey, login: Callable[[], Token],
+            refresh: Callable[[str], Token]) -> Token:
+        token = self._get_fresh(key)
+        if token is not None:
+            app_cache_events_total.labels(cache='keycloak_token', event='hit').inc()
+            return token
+
+        app_cache_events_total.labels(cache='keycloak_token', event='miss').inc()
+        with self._get_key_lock(key):
+            # Token could be refreshed by another caller while waiting
+            token = self._get_fresh(key)
+            if token is not None:
+                return token
+
+            cached = self._tokens.get(key)
+            if cached is not None and cached.refresh_expires_at - self.expiry_margin > time.monotonic():
+                try:
+                    token = refresh(cached.token.refresh_token)
+                except InfrastructureServiceProblem as e:
+                    logger.warning(f"Keycloak token refresh failed, login again: {e}")
+            if token is None:
+                token = login()
+            self._cache_token(key, token)
+            return token
+
+    def invalidate(self, key: TokenKey, token: Optional[Token] = None):
+        """Drops cached token, if `token` is set, only if it is still cached."""
+        with self._get_key_lock(key):
+            cached = self._tokens.get(key)
+            if cached is not None and (token is None or cached.token is token):
+                del self._tokens[key]
+
+
+keycloak_token_cache = KeycloakTokenCache()
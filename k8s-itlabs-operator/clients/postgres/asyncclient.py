@@ -0,0 +1,346 @@
+import contextvars
+import logging
+from abc import ABCMeta, abstractmethod
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterable, List, Optional, Tuple
+
+import psycopg
+from psycopg import sql
+
+from clients.postgres import settings
+from clients.postgres.asyncpool import AsyncPgPoolRegistry, async_pg_pool_registry
+from clients.postgres.catalog import PgCatalogCache, PgCatalogSnapshot, instance_key, pg_catalog_cache
+from clients.postgres.dto import PgConnectorDbSecretDto
+from clients.postgres.exceptions import PgObjectAlreadyExistsError, PgQueryValidationError
+from clients.postgres.passwords import verify_password_hash
+from clients.postgres.postgresclient import Statement, SELECT_CATALOG, SELECT_USER_GRANTEE, \
+    SELECT_CAN_READ_AUTHID, SELECT_PASSWORD_HASH, SELECT_IS_MEMBER, SELECT_IS_DIRECT_MEMBER, \
+    SELECT_DATABASE_PRIVILEGES, CREATE_USER, ALTER_USER_PASSWORD, CREATE_DATABASE, GRANT_ALL_PRIVILEGES, \
+    GRANT_ROLE, REVOKE_ROLE, SELECT_ACCESS_CHECKS, SELECT_ACCESS_STATEMENTS
+from exceptions import InfrastructureServiceProblem
+
+logger = logging.getLogger('postgresclient')
+
+
+class AbstractAsyncPostgresClient:
+    """Asyncio counterpart of `AbstractPostgresClient`, methods are coroutines."""
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    async def is_user_exist(self, user: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_user_grantee(self, database: str, user: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_database_exist(self, db_name: str) -> bool:
+        raise NotImplementedError
+
+    async def is_user_and_database_exist(self, user: str, db_name: str) -> Tuple[bool, bool]:
+        return await self.is_user_exist(user), await self.is_database_exist(db_name)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator["AbstractAsyncPostgresClient"]:
+        """All queries inside session are executed on one connection."""
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AbstractAsyncPostgresClient"]:
+        """
+        All queries inside transaction are committed together or rolled
+        back on exception. Statements that can't be run inside transaction
+        block, e.g. `CREATE DATABASE`, must be executed outside of it.
+        """
+        yield self
+
+    @abstractmethod
+    async def create_user(self, user: str, password: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def alter_user_password(self, user: str, password: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_user_password_valid(self, user: str, password: str, db_name: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_database(self, db_name: str, user: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def grant_all_privileges(self, db_name: str, user: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def grant_user_to_admin(self, user: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def grant_access_on_select(self, grantor_name: str, grantee_name: str):
+        raise NotImplementedError
+
+
+class AsyncPostgresClient(AbstractAsyncPostgresClient):
+    """
+    Postgres client of psycopg 3 for asyncio. Queries and order of checks
+    are the same as in `PostgresClient`, snapshots of catalog are shared
+    with it.
+
+    Connection of session is kept in context variable, so concurrent tasks
+    that use one client get their own sessions.
+    """
+
+    def __init__(self, pg_connector_secret_dto: PgConnectorDbSecretDto,
+                 pool_registry: Optional[AsyncPgPoolRegistry] = None,
+                 catalog_cache: Optional[PgCatalogCache] = None):
+        self.connection_data = pg_connector_secret_dto
+        self._pool_registry = pool_registry or async_pg_pool_registry
+        self._catalog_cache = catalog_cache or pg_catalog_cache
+        self._session_conn: contextvars.ContextVar[Optional[psycopg.AsyncConnection]] = \
+            contextvars.ContextVar(f'postgres_session_{id(self)}', default=None)
+        self._can_read_authid: Optional[bool] = None
+
+    @asynccontextmanager
+    async def _connection(self):
+        session_conn = self._session_conn.get()
+        if session_conn is not None:
+            yield session_conn
+            return
+        pool = await self._pool_registry.get_pool(self.connection_data)
+        async with pool.connection() as conn:
+            yield conn
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator["AsyncPostgresClient"]:
+        if self._session_conn.get() is not None:
+            yield self
+            return
+        pool = await self._pool_registry.get_pool(self.connection_data)
+        try:
+            conn = await pool.acquire()
+        except Exception as e:
+            raise InfrastructureServiceProblem('Postgres', e)
+        token = self._session_conn.set(conn)
+        try:
+            yield self
+        finally:
+            self._session_conn.reset(token)
+            await pool.release(conn)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator["AsyncPostgresClient"]:
+        async with self.session():
+            conn = self._session_conn.get()
+            if not conn.autocommit:
+                # Nested transaction is a part of outer one
+                yield self
+                return
+            await conn.set_autocommit(False)
+            try:
+                yield self
+            except BaseException:
+                await self._rollback(conn)
+                raise
+            await self._commit(conn)
+
+    @classmethod
+    async def _commit(cls, conn: psycopg.AsyncConnection):
+        try:
+            await conn.commit()
+        except Exception as e:
+            # Rollback restores autocommit if connection is not broken
+            await cls._rollback(conn)
+            raise InfrastructureServiceProblem('Postgres', e)
+        try:
+            await conn.set_autocommit(True)
+        except psycopg.Error:
+            # Broken connection is dropped by pool on checkin
+            logger.warning('Autocommit is not restored after commit.')
+
+    @staticmethod
+    async def _rollback(conn: psycopg.AsyncConnection):
+        try:
+            await conn.rollback()
+            await conn.set_autocommit(True)
+        except psycopg.Error:
+            # Broken connection is dropped by pool on checkin
+            logger.warning('Transaction rollback failed.')
+
+    async def _execute_query_v2(self, query: str, *, identifiers: Iterable[str] = None,
+                                values: Iterable[str] = None):
+        """Same as `PostgresClient._execute_query_v2`."""
+        return await self._execute(self._compose(query, identifiers), values)
+
+    @staticmethod
+    def _compose(query: str, identifiers: Iterable[str] = None) -> sql.Composable:
+        if identifiers is None:
+            return sql.SQL(query)
+        if not identifiers:
+            raise PgQueryValidationError(f'sql identifiers are mandatory but empty. '
+                                         f'Please check variables name in Vault, identifiers: {identifiers}')
+        query_identifiers = [sql.Identifier(i) for i in identifiers]
+        return sql.SQL(query).format(*query_identifiers)
+
+    async def _execute_statements(self, statements: List[Statement]):
+        """Executes statements in one round trip."""
+        if not statements:
+            return
+        query = sql.SQL(' ').join(self._compose(query, identifiers) for query, identifiers in statements)
+        await self._execute(query)
+
+    async def _execute(self, query: sql.Composable, values=None):
+        try:
+            async with self._connection() as conn, conn.cursor() as cursor:
+                await cursor.execute(query, values)
+                results = await cursor.fetchall() if cursor.description is not None else []
+        except (psycopg.errors.DuplicateObject, psycopg.errors.DuplicateDatabase) as e:
+            raise PgObjectAlreadyExistsError('Postgres', e)
+        except (Exception, psycopg.DatabaseError) as e:
+            raise InfrastructureServiceProblem('Postgres', e)
+        return results
+
+    async def _catalog(self, force: bool = False) -> PgCatalogSnapshot:
+        key = instance_key(self.connection_data)
+        snapshot = None if force else self._catalog_cache.cached(key)
+        if snapshot is None:
+            (users, databases), = await self._execute_query_v2(SELECT_CATALOG)
+            snapshot = PgCatalogSnapshot(users=frozenset(users), databases=dict(databases))
+            self._catalog_cache.put(key, snapshot)
+        return snapshot
+
+    async def _on_ddl(self, error: Optional[InfrastructureServiceProblem] = None):
+        """Same as `PostgresClient._on_ddl`."""
+        if isinstance(error, PgObjectAlreadyExistsError):
+            try:
+                await self._catalog(force=True)
+                return
+            except InfrastructureServiceProblem:
+                pass
+        self._catalog_cache.invalidate(instance_key(self.connection_data))
+
+    async def is_user_exist(self, user: str) -> bool:
+        return user in (await self._catalog()).users
+
+    async def is_user_grantee(self, database: str, user: str) -> bool:
+        """Same as `PostgresClient.is_user_grantee`."""
+        (is_grantee,), = await self._execute_query_v2(SELECT_USER_GRANTEE, values={'user': user, 'database': database})
+        return bool(is_grantee)
+
+    async def is_database_exist(self, db_name: str) -> bool:
+        return db_name in (await self._catalog()).databases
+
+    async def is_user_and_database_exist(self, user: str, db_name: str) -> Tuple[bool, bool]:
+        catalog = await self._catalog()
+        return user in catalog.users, db_name in catalog.databases
+
+    async def create_user(self, user: str, password: str):
+        try:
+            await self._execute_query_v2(CREATE_USER, identifiers=[user], values=[password])
+        except InfrastructureServiceProblem as e:
+            await self._on_ddl(e)
+            raise
+        await self._on_ddl()
+
+    async def alter_user_password(self, user: str, password: str):
+        await self._execute_query_v2(ALTER_USER_PASSWORD, identifiers=[user], values=[password])
+
+    async def is_user_password_valid(self, user: str, password: str, db_name: Optional[str] = None) -> bool:
+        """Same as `PostgresClient.is_user_password_valid`."""
+        password_hash = await self._get_password_hash(user)
+        if password_hash is not None:
+            return verify_password_hash(password_hash, user, password)
+        if db_name is None:
+            return False
+        return await self._authenticate(db_name, user, password)
+
+    async def _get_password_hash(self, user: str) -> Optional[str]:
+        if self._can_read_authid is None:
+            (self._can_read_authid,), = await self._execute_query_v2(SELECT_CAN_READ_AUTHID)
+        if not self._can_read_authid:
+            return None
+        rows = await self._execute_query_v2(SELECT_PASSWORD_HASH, values=[user])
+        return rows[0][0] if rows else None
+
+    async def _authenticate(self, db_name: str, user: str, password: str) -> bool:
+        try:
+            conn = await psycopg.AsyncConnection.connect(dbname=db_name,
+                                                         user=user,
+                                                         password=password,
+                                                         host=self.connection_data.host,
+                                                         port=self.connection_data.port,
+                                                         connect_timeout=settings.POSTGRES_AUTH_PROBE_TIMEOUT)
+        except psycopg.Error as e:
+            logger.info(f"User '{user}' is not authenticated in database '{db_name}': {e}")
+            return False
+        await conn.close()
+        return True
+
+    async def create_database(self, db_name: str, user: str):
+        """Same as `PostgresClient.create_database`."""
+        admin = self.connection_data.user
+        async with self.session():
+            is_granted = not await self._is_member(admin, user)
+            if is_granted:
+                await self._execute_query_v2(GRANT_ROLE, identifiers=[user, admin])
+            try:
+                await self._execute_query_v2(CREATE_DATABASE, identifiers=[db_name], values=[user])
+            except InfrastructureServiceProblem as e:
+                if is_granted:
+                    await self._execute_query_v2(REVOKE_ROLE, identifiers=[user, admin])
+                await self._on_ddl(e)
+                raise
+            await self._on_ddl()
+            statements = []
+            if is_granted:
+                statements.append((REVOKE_ROLE, [user, admin]))
+            if not await self._has_database_privileges(db_name, user):
+                statements.append((GRANT_ALL_PRIVILEGES, [db_name, user]))
+            if statements:
+                async with self.transaction():
+                    await self._execute_statements(statements)
+
+    async def _is_member(self, member: str, role: str) -> bool:
+        (is_member,), = await self._execute_query_v2(SELECT_IS_MEMBER, values=[member, role])
+        return is_member
+
+    async def _is_direct_member(self, member: str, role: str) -> bool:
+        (is_member,), = await self._execute_query_v2(SELECT_IS_DIRECT_MEMBER, values=[role, member])
+        return is_member
+
+    async def _has_database_privileges(self, db_name: str, user: str) -> bool:
+        (has_privileges,), = await self._execute_query_v2(SELECT_DATABASE_PRIVILEGES, values=[db_name, user])
+        return has_privileges
+
+    async def grant_all_privileges(self, db_name: str, user: str):
+        if await self._has_database_privileges(db_name, user):
+            return
+        await self._execute_query_v2(GRANT_ALL_PRIVILEGES, identifiers=[db_name, user])
+
+    async def grant_user_to_admin(self, user: str):
+        if await self._is_direct_member('postgres', user):
+            return
+        await self._execute_query_v2(GRANT_ROLE, identifiers=[user, 'postgres'])
+
+    async def grant_access_on_select(self, grantor_name: str, grantee_name: str):
+        """Same as `PostgresClient.grant_access_on_select`."""
+        admin = self.connection_data.user
+        async with self.session():
+            is_member, *checks = (await self._execute_query_v2(
+                SELECT_ACCESS_CHECKS, values={'grantor': grantor_name, 'grantee': grantee_name}
+            ))[0]
+            statements = [
+                (statement, [grantor_name, grantee_name])
+                for statement, is_granted in zip(SELECT_ACCESS_STATEMENTS, checks) if not is_granted
+            ]
+            if not statements:
+                return
+            if not is_member:
+                # Default privileges of grantor are altered by its member
+                statements.insert(0, (GRANT_ROLE, [grantor_name, admin]))
+                statements.append((REVOKE_ROLE, [grantor_name, admin]))
+            async with self.transaction():
+                await self._execute_statements(statements)
@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, List, Tuple
+
+import psycopg
+from psycopg.pq import TransactionStatus
+
+from clients.postgres import settings
+from clients.postgres.dto import PgConnectorDbSecretDto
+from clients.postgres.exceptions import PgPoolTimeoutError
+from clients.postgres.pool import PgPoolLimits, PgPoolMetrics, PoolKey, pool_key
+
+logger = logging.getLogger('postgresclient')
+
+
+class AsyncPgConnectionPool:
+    """
+    Bounded pool of autocommit asyncio connections to one database, it is
+    used by coroutines of one event loop.
+
+    Connections are reused in LIFO order, idle and health-checked as in
+    `PgConnectionPool`. Queries are bound on client side, as in psycopg2,
+    so parameters may be used in DDL and several statements may be sent
+    in one query.
+    """
+
+    def __init__(self, connection_data: PgConnectorDbSecretDto,
+                 maxsize: int = settings.POSTGRES_ASYNC_POOL_MAXSIZE,
+                 idle_timeout: float = settings.POSTGRES_POOL_IDLE_TIMEOUT,
+                 healthcheck_after: float = settings.POSTGRES_POOL_HEALTHCHECK_AFTER,
+                 checkout_timeout: float = settings.POSTGRES_POOL_CHECKOUT_TIMEOUT):
+        if maxsize <= 0:
+            raise ValueError(f"Pool size must be greater than zero '{maxsize}'")
+        self.connection_data = connection_data
+        self.limits = PgPoolLimits(maxsize, idle_timeout, healthcheck_after, checkout_timeout)
+
+        self._idle: Deque[Tuple[psycopg.AsyncConnection, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = asyncio.Condition()
+        self._metrics = PgPoolMetrics.of(connection_data)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_size(self) -> int:
+        return len(self._idle)
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[psycopg.AsyncConnection]:
+        conn = await self.acquire()
+        try:
+            yield conn
+        finally:
+            await self.release(conn)
+
+    async def reap_idle(self):
+        """Closes connections that are idle longer than `idle_timeout`."""
+        async with self._cond:
+            expired = self._pop_expired()
+        for conn in expired:
+            await self._close_connection(conn)
+
+    async def close(self):
+        """
+        Closes idle connections. Connections that are in use are closed
+        when they are returned to the pool.
+        """
+        self._closed = True
+        idle = [conn for conn, _ in self._idle]
+        self._idle.clear()
+        self._metrics.idle_connections.dec(len(idle))
+        for conn in idle:
+            await self._close_connection(conn)
+        async with self._cond:
+            self._cond.notify_all()
+
+    async def _connect(self) -> psycopg.AsyncConnection:
+        logger.info('Connecting to the PostgreSQL database...')
+        return await psycopg.AsyncConnection.connect(dbname=self.connection_data.db_name,
+                                                     user=self.connection_data.user,
+                                                     password=self.connection_data.password,
+                                                     host=self.connection_data.host,
+                                                     port=self.connection_data.port,
+                                                     autocommit=True,
+                                                     cursor_factory=psycopg.AsyncClientCursor)
+
+    async def acquire(self) -> psycopg.AsyncConnection:
+        started_at = time.monotonic()
+        deadline = started_at + self.limits.checkout_timeout
+        while True:
+            async with self._cond:
+                expired = self._pop_expired()
+                if self._idle:
+                    conn, last_used_at = self._idle.pop()
+                    self._metrics.idle_connections.dec()
+                    is_new = False
+                elif self._size < self.limits.maxsize:
+                    self._size += 1
+                    conn, last_used_at = None, None
+                    is_new = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PgPoolTimeoutError(
+                            f"No free connection to `{self.connection_data.host}` in "
+                            f"{self.limits.checkout_timeout} seconds"
+                        )
+                    try:
+                        await asyncio.wait_for(self._cond.wait(), remaining)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                self._metrics.used_connections.inc()
+
+            for expired_conn in expired:
+                await self._close_connection(expired_conn)
+            if is_new:
+                try:
+                    conn = await self._connect()
+                except BaseException:
+                    await self._discard(None)
+                    raise
+            elif not await self._is_healthy(conn, last_used_at):
+                await self._discard(conn)
+                continue
+
+            self._metrics.wait_seconds.observe(time.monotonic() - started_at)
+            return conn
+
+    async def release(self, conn: psycopg.AsyncConnection):
+        if not conn.closed and (not conn.autocommit or conn.info.transaction_status != TransactionStatus.IDLE):
+            try:
+                await conn.rollback()
+                await conn.set_autocommit(True)
+            except psycopg.Error:
+                logger.warning('Broken connection to the PostgreSQL database is dropped.')
+                await self._discard(conn)
+                return
+        if self._closed or conn.closed:
+            await self._discard(conn)
+            return
+        async with self._cond:
+            self._metrics.used_connections.dec()
+            self._idle.append((conn, time.monotonic()))
+            self._metrics.idle_connections.inc()
+            self._cond.notify()
+
+    async def _is_healthy(self, conn: psycopg.AsyncConnection, last_used_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used_at < self.limits.healthcheck_after:
+            return True
+        try:
+            await conn.execute('SELECT 1;')
+        except psycopg.Error:
+            return False
+        return True
+
+    async def _discard(self, conn):
+        self._size -= 1
+        self._metrics.used_connections.dec()
+        if conn is not None:
+            await self._close_connection(conn)
+        async with self._cond:
+            self._cond.notify()
+
+    def _pop_expired(self) -> List[psycopg.AsyncConnection]:
+        expired_at = time.monotonic() - self.limits.idle_timeout
+        expired = []
+        # The least recently used connections are at the left side
+        while self._idle and self._idle[0][1] <= expired_at:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._metrics.idle_connections.dec()
+            expired.append(conn)
+        return expired
+
+    @staticmethod
+    async def _close_connection(conn: psycopg.AsyncConnection):
+        try:
+            await conn.close()
+        except psycopg.Error:
+            pass
+        logger.info('Database connection closed.')
+
+
+class AsyncPgPoolRegistry:
+    """
+    Asyncio pools of connections keyed by (host, port, db_name, user), as
+    in `PgPoolRegistry`. Pools are used by coroutines of one event loop.
+    Idle connections of all pools are reaped on every `get_pool`.
+    """
+
+    def __init__(self, max_pools: int = settings.POSTGRES_POOL_MAX_POOLS, **pool_kwargs):
+        self.max_pools = max_pools
+        self._pool_kwargs = pool_kwargs
+        self._pools: "OrderedDict[PoolKey, AsyncPgConnectionPool]" = OrderedDict()
+
+    async def get_pool(self, connection_data: PgConnectorDbSecretDto) -> AsyncPgConnectionPool:
+        key = pool_key(connection_data)
+        closed = []
+        pool = self._pools.get(key)
+        if pool is not None and pool.connection_data.password != connection_data.password:
+            # Credentials were changed, connections with old ones are dropped
+            closed.append(self._pools.pop(key))
+            pool = None
+        if pool is None:
+            pool = AsyncPgConnectionPool(connection_data, **self._pool_kwargs)
+            self._pools[key] = pool
+        self._pools.move_to_end(key)
+        while len(self._pools) > self.max_pools:
+            _, evicted = self._pools.popitem(last=False)
+            closed.append(evicted)
+        # Pools are closed after registry is updated, so awaiting doesn't race with other coroutines
+        for evicted in closed:
+            await evicted.close()
+        for other in list(self._pools.values()):
+            await other.reap_idle()
+        return pool
+
+    async def close(self):
+        while self._pools:
+            _, pool = self._pools.popitem()
+            await pool.close()
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+
+async_pg_pool_registry = AsyncPgPoolRegistry()
@@ -0,0 +1,137 @@
+"""
+Benchmark of `PostgresClient.is_user_grantee` against the previous query
+over `information_schema.table_privileges` and text of `pg_default_acl`.
+
+Temporary database with `--tables` tables and roles are created on local
+Postgres by superuser and dropped after benchmark:
+
+    python -m clients.postgres.benchmarks.is_user_grantee --tables 10000
+
+Connection is set by `--host`, `--port`, `--user` and `--password` or by
+`PGHOST`, `PGPORT`, `PGUSER` and `PGPASSWORD` environment variables.
+"""
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, List
+
+import psycopg2
+
+from clients.postgres.dto import PgConnectorDbSecretDto
+from clients.postgres.pool import PgPoolRegistry
+from clients.postgres.postgresclient import PostgresClient
+
+DATABASE = 'is_user_grantee_benchmark'
+# Owner is named as database, as users of microservices usually are
+OWNER = DATABASE
+READER = 'benchmark_ro'
+# Name of this role contains name of reader, it is matched by text search
+SIMILAR_READER = 'benchmark_ro2'
+
+LEGACY_QUERY = """
+    SELECT 1 FROM information_schema.table_privileges WHERE
+        grantee = %s
+        AND table_catalog = %s
+        AND privilege_type = 'SELECT'
+    UNION
+    SELECT 1
+    FROM pg_default_acl acl
+    JOIN pg_namespace namespace on namespace.oid = acl.defaclnamespace
+    WHERE acl.defaclacl::text ILIKE %s
+      AND acl.defaclacl::text ILIKE %s;
+"""
+
+
+def connect(args, database: str):
+    conn = psycopg2.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                            database=database)
+    conn.autocommit = True
+    return conn
+
+
+def setup(args):
+    with connect(args, 'postgres') as conn, conn.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS {DATABASE};')
+        for role in (OWNER, READER, SIMILAR_READER):
+            cursor.execute(f'DROP ROLE IF EXISTS {role};')
+            cursor.execute(f'CREATE ROLE {role};')
+        cursor.execute(f'CREATE DATABASE {DATABASE} WITH OWNER = {OWNER};')
+    conn.close()
+
+    with connect(args, DATABASE) as conn, conn.cursor() as cursor:
+        cursor.execute(f'SET ROLE {OWNER};')
+        cursor.execute(f"""
+            DO $$
+            BEGIN
+                FOR i IN 1..{args.tables} LOOP
+                    EXECUTE format('CREATE TABLE public.t%s (id int PRIMARY KEY, value text)', i);
+                END LOOP;
+            END $$;
+        """)
+        # The last table is found by the legacy query only after full scan
+        cursor.execute(f'GRANT SELECT ON public.t{args.tables} TO {SIMILAR_READER};')
+        cursor.execute(f'ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON TABLES TO {SIMILAR_READER};')
+        cursor.execute('RESET ROLE;')
+        cursor.execute('ANALYZE;')
+    conn.close()
+
+
+def teardown(args):
+    with connect(args, 'postgres') as conn, conn.cursor() as cursor:
+        cursor.execute(f'DROP DATABASE IF EXISTS {DATABASE};')
+        for role in (OWNER, READER, SIMILAR_READER):
+            cursor.execute(f'DROP ROLE IF EXISTS {role};')
+    conn.close()
+
+
+def is_user_grantee_legacy(conn, user: str) -> bool:
+    with conn.cursor() as cursor:
+        cursor.execute(LEGACY_QUERY, [user, DATABASE, f'%{user}%', f'%{DATABASE}%'])
+        return bool(cursor.fetchall())
+
+
+def measure(name: str, call: Callable[[], bool], repeat: int):
+    timings: List[float] = []
+    result = None
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        result = call()
+        timings.append((time.perf_counter() - started_at) * 1000)
+    timings.sort()
+    p95 = timings[min(len(timings) - 1, int(len(timings) * .95))]
+    print(f'{name:<40} result={result!s:<6} median={statistics.median(timings):9.2f} ms  p95={p95:9.2f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.getenv('PGHOST', 'localhost'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('PGPORT', '5432')))
+    parser.add_argument('--user', default=os.getenv('PGUSER', 'postgres'))
+    parser.add_argument('--password', default=os.getenv('PGPASSWORD', 'postgres'))
+    parser.add_argument('--tables', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f'Creating {args.tables} tables in database {DATABASE}...')
+    setup(args)
+    registry = PgPoolRegistry()
+    # Legacy query is run on its own connection, as client keeps connection in pool
+    legacy_conn = connect(args, DATABASE)
+    try:
+        client = PostgresClient(
+            PgConnectorDbSecretDto(db_name=DATABASE, user=args.user, password=args.password,
+                                   host=args.host, port=args.port),
+            pool_registry=registry,
+        )
+        for user in (SIMILAR_READER, READER):
+            measure(f'legacy query, {user}', lambda user=user: is_user_grantee_legacy(legacy_conn, user), args.repeat)
+            measure(f'is_user_grantee, {user}', lambda user=user: client.is_user_grantee(DATABASE, user), args.repeat)
+    finally:
+        legacy_conn.close()
+        registry.close()
+        teardown(args)
+
+
+if __name__ == '__main__':
+    main()
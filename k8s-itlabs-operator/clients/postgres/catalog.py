@@ -0,0 +1,72 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+
+from clients.postgres import settings
+from clients.postgres.dto import PgConnectorDbSecretDto
+
+InstanceKey = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class PgCatalogSnapshot:
+    # Names of roles that can login, as in `pg_user`
+    users: FrozenSet[str]
+    # Owners of databases by database names
+    databases: Dict[str, str]
+    loaded_at: float = field(default_factory=time.monotonic)
+
+
+def instance_key(connection_data: PgConnectorDbSecretDto) -> InstanceKey:
+    return connection_data.host, int(connection_data.port)
+
+
+class PgCatalogCache:
+    """
+    Snapshots of users and databases of Postgres instances keyed by
+    (host, port), so existence checks are answered in memory.
+
+    Snapshot is loaded again after `refresh_interval` seconds or after it
+    is invalidated, e.g. by DDL of operator. Refresh interval 0 disables
+    cache, snapshot is loaded for every check.
+    """
+
+    def __init__(self, refresh_interval: float = settings.POSTGRES_CATALOG_REFRESH_INTERVAL):
+        self.refresh_interval = refresh_interval
+        self._snapshots: Dict[InstanceKey, PgCatalogSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: InstanceKey, load: Callable[[], PgCatalogSnapshot],
+            force: bool = False) -> PgCatalogSnapshot:
+        snapshot = None if force else self.cached(key)
+        if snapshot is None:
+            # Catalog is queried without holding the lock
+            snapshot = load()
+            self.put(key, snapshot)
+        return snapshot
+
+    def cached(self, key: InstanceKey) -> Optional[PgCatalogSnapshot]:
+        """Returns snapshot if it is not older than refresh interval."""
+        with self._lock:
+            snapshot = self._snapshots.get(key)
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.refresh_interval:
+            return snapshot
+        return None
+
+    def put(self, key: InstanceKey, snapshot: PgCatalogSnapshot):
+        with self._lock:
+            current = self._snapshots.get(key)
+            if current is None or current.loaded_at <= snapshot.loaded_at:
+                self._snapshots[key] = snapshot
+
+    def invalidate(self, key: InstanceKey):
+        with self._lock:
+            self._snapshots.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+pg_catalog_cache = PgCatalogCache()
@@ -1,2 +1,14 @@
+from exceptions import InfrastructureServiceProblem
+
+
 class PgQueryValidationError(Exception):
     ...
+
+
+class PgPoolTimeoutError(Exception):
+    ...
+
+
+# User or database is created concurrently, e.g. by another replica
+class PgObjectAlreadyExistsError(InfrastructureServiceProblem):
+    ...
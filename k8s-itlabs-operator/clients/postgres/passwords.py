@@ -0,0 +1,45 @@
+import base64
+import binascii
+import hashlib
+import hmac
+
+SCRAM_PREFIX = 'SCRAM-SHA-256$'
+MD5_PREFIX = 'md5'
+
+
+def _scram_key(salted_password: bytes, name: bytes) -> bytes:
+    return hmac.new(salted_password, name, hashlib.sha256).digest()
+
+
+def verify_scram_password(password_hash: str, password: str) -> bool:
+    """
+    Verifies password against SCRAM-SHA-256 verifier of `pg_authid`:
+    `SCRAM-SHA-256$<iterations>:<salt>$<StoredKey>:<ServerKey>`.
+    """
+    try:
+        _, iterations_salt, keys = password_hash.split('$')
+        iterations, salt = iterations_salt.split(':')
+        stored_key, server_key = keys.split(':')
+        salted_password = hashlib.pbkdf2_hmac(
+            'sha256', password.encode('utf-8'), base64.b64decode(salt), int(iterations)
+        )
+    except (ValueError, binascii.Error):
+        return False
+    client_key = _scram_key(salted_password, b'Client Key')
+    expected_stored_key = base64.b64encode(hashlib.sha256(client_key).digest()).decode()
+    expected_server_key = base64.b64encode(_scram_key(salted_password, b'Server Key')).decode()
+    return hmac.compare_digest(expected_stored_key, stored_key) \
+        and hmac.compare_digest(expected_server_key, server_key)
+
+
+def verify_password_hash(password_hash: str, user: str, password: str) -> bool:
+    """
+    Verifies password against its hash stored in `pg_authid.rolpassword`.
+    Unknown hash formats are never verified, so password is rewritten.
+    """
+    if password_hash.startswith(SCRAM_PREFIX):
+        return verify_scram_password(password_hash, password)
+    if password_hash.startswith(MD5_PREFIX):
+        expected = MD5_PREFIX + hashlib.md5((password + user).encode('utf-8')).hexdigest()
+        return hmac.compare_digest(expected, password_hash)
+    return False
@@ -0,0 +1,268 @@
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Deque, Iterator, NamedTuple, Tuple
+
+import psycopg2
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+
+from clients.postgres import settings
+from clients.postgres.dto import PgConnectorDbSecretDto
+from clients.postgres.exceptions import PgPoolTimeoutError
+from observability.metrics.metrics import app_postgres_pool_wait_seconds, app_postgres_pool_connections
+
+logger = logging.getLogger('postgresclient')
+
+PoolKey = Tuple[str, int, str, str]
+
+
+def pool_key(connection_data: PgConnectorDbSecretDto) -> PoolKey:
+    return (
+        connection_data.host,
+        int(connection_data.port),
+        connection_data.db_name,
+        connection_data.user,
+    )
+
+
+@dataclass(frozen=True)
+class PgPoolLimits:
+    maxsize: int = settings.POSTGRES_POOL_MAXSIZE
+    idle_timeout: float = settings.POSTGRES_POOL_IDLE_TIMEOUT
+    healthcheck_after: float = settings.POSTGRES_POOL_HEALTHCHECK_AFTER
+    checkout_timeout: float = settings.POSTGRES_POOL_CHECKOUT_TIMEOUT
+
+
+class PgPoolMetrics(NamedTuple):
+    wait_seconds: Any
+    idle_connections: Any
+    used_connections: Any
+
+    @classmethod
+    def of(cls, connection_data: PgConnectorDbSecretDto) -> "PgPoolMetrics":
+        labels = {'host': connection_data.host, 'database': connection_data.db_name, 'user': connection_data.user}
+        return cls(
+            wait_seconds=app_postgres_pool_wait_seconds.labels(**labels),
+            idle_connections=app_postgres_pool_connections.labels(state='idle', **labels),
+            used_connections=app_postgres_pool_connections.labels(state='used', **labels),
+        )
+
+
+class PgConnectionPool:
+    """
+    Thread-safe bounded pool of autocommit connections to one database.
+
+    Connections are reused in LIFO order, so rarely used connections
+    become idle and are closed after `idle_timeout`. Connection that was
+    idle longer than `healthcheck_after` is checked with `SELECT 1` before
+    it is given out.
+    """
+
+    def __init__(self, connection_data: PgConnectorDbSecretDto,
+                 maxsize: int = settings.POSTGRES_POOL_MAXSIZE,
+                 idle_timeout: float = settings.POSTGRES_POOL_IDLE_TIMEOUT,
+                 healthcheck_after: float = settings.POSTGRES_POOL_HEALTHCHECK_AFTER,
+                 checkout_timeout: float = settings.POSTGRES_POOL_CHECKOUT_TIMEOUT):
+        if maxsize <= 0:
+            raise ValueError(f"Pool size must be greater than zero '{maxsize}'")
+        self.connection_data = connection_data
+        self.limits = PgPoolLimits(maxsize, idle_timeout, healthcheck_after, checkout_timeout)
+
+        self._idle: Deque[Tuple[connection, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._metrics = PgPoolMetrics.of(connection_data)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def idle_size(self) -> int:
+        return len(self._idle)
+
+    @contextmanager
+    def connection(self) -> Iterator[connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def reap_idle(self):
+        """Closes connections that are idle longer than `idle_timeout`."""
+        with self._cond:
+            self._reap_idle()
+
+    def close(self):
+        """
+        Closes idle connections. Connections that are in use are closed
+        when they are returned to the pool.
+        """
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._metrics.idle_connections.dec()
+                self._close_connection(conn)
+            self._cond.notify_all()
+
+    def _connect(self) -> connection:
+        logger.info('Connecting to the PostgreSQL database...')
+        conn = psycopg2.connect(database=self.connection_data.db_name,
+                                user=self.connection_data.user,
+                                password=self.connection_data.password,
+                                host=self.connection_data.host,
+                                port=self.connection_data.port)
+        conn.autocommit = True
+        return conn
+
+    def acquire(self) -> connection:
+        started_at = time.monotonic()
+        deadline = started_at + self.limits.checkout_timeout
+        while True:
+            with self._cond:
+                self._reap_idle()
+                if self._idle:
+                    conn, last_used_at = self._idle.pop()
+                    self._metrics.idle_connections.dec()
+                    is_new = False
+                elif self._size < self.limits.maxsize:
+                    self._size += 1
+                    conn, last_used_at = None, None
+                    is_new = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PgPoolTimeoutError(
+                            f"No free connection to `{self.connection_data.host}` in "
+                            f"{self.limits.checkout_timeout} seconds"
+                        )
+                    self._cond.wait(remaining)
+                    continue
+                self._metrics.used_connections.inc()
+
+            # Network round trips are made without holding the lock
+            if is_new:
+                try:
+                    conn = self._connect()
+                except BaseException:
+                    self._discard(None)
+                    raise
+            elif not self._is_healthy(conn, last_used_at):
+                self._discard(conn)
+                continue
+
+            self._metrics.wait_seconds.observe(time.monotonic() - started_at)
+            return conn
+
+    def release(self, conn: connection):
+        if not conn.closed and (not conn.autocommit or conn.get_transaction_status() != TRANSACTION_STATUS_IDLE):
+            try:
+                conn.rollback()
+                conn.autocommit = True
+            except psycopg2.Error:
+                logger.warning('Broken connection to the PostgreSQL database is dropped.')
+                self._discard(conn)
+                return
+        with self._cond:
+            if self._closed or conn.closed:
+                self._discard_locked(conn)
+                return
+            self._metrics.used_connections.dec()
+            self._idle.append((conn, time.monotonic()))
+            self._metrics.idle_connections.inc()
+            self._cond.notify()
+
+    def _is_healthy(self, conn: connection, last_used_at: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used_at < self.limits.healthcheck_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1;')
+        except psycopg2.Error:
+            return False
+        return True
+
+    def _discard(self, conn):
+        with self._cond:
+            self._discard_locked(conn)
+
+    def _discard_locked(self, conn):
+        self._size -= 1
+        self._metrics.used_connections.dec()
+        if conn is not None:
+            self._close_connection(conn)
+        self._cond.notify()
+
+    def _reap_idle(self):
+        expired_at = time.monotonic() - self.limits.idle_timeout
+        # The least recently used connections are at the left side
+        while self._idle and self._idle[0][1] <= expired_at:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._metrics.idle_connections.dec()
+            self._close_connection(conn)
+
+    @staticmethod
+    def _close_connection(conn: connection):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        logger.info('Database connection closed.')
+
+
+class PgPoolRegistry:
+    """
+    Pools of connections keyed by (host, port, db_name, user). Number of
+    pools is bounded, the least recently used pool is closed on overflow.
+
+    Idle connections of all pools are reaped on every `get_pool`, so pools
+    that are not used anymore, e.g. of application databases, don't keep
+    connections until eviction.
+    """
+
+    def __init__(self, max_pools: int = settings.POSTGRES_POOL_MAX_POOLS, **pool_kwargs):
+        self.max_pools = max_pools
+        self._pool_kwargs = pool_kwargs
+        self._pools: "OrderedDict[PoolKey, PgConnectionPool]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_pool(self, connection_data: PgConnectorDbSecretDto) -> PgConnectionPool:
+        key = pool_key(connection_data)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None and pool.connection_data.password != connection_data.password:
+                # Credentials were changed, connections with old ones are dropped
+                self._pools.pop(key).close()
+                pool = None
+            if pool is None:
+                pool = PgConnectionPool(connection_data, **self._pool_kwargs)
+                self._pools[key] = pool
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_pools:
+                _, evicted = self._pools.popitem(last=False)
+                evicted.close()
+            pools = list(self._pools.values())
+        for other in pools:
+            other.reap_idle()
+        return pool
+
+    def close(self):
+        with self._lock:
+            while self._pools:
+                _, pool = self._pools.popitem()
+                pool.close()
+
+    def __len__(self) -> int:
+        return len(self._pools)
+
+
+pg_pool_registry = PgPoolRegistry()
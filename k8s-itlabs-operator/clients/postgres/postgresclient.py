@@ -1,16 +1,139 @@
 import logging
+import threading
 from abc import ABCMeta, abstractmethod
-from typing import Iterable
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
 
 import psycopg2
-from psycopg2 import sql
+from psycopg2 import errorcodes, errors, sql
 
+from clients.postgres import settings
+from clients.postgres.catalog import PgCatalogCache, PgCatalogSnapshot, instance_key, pg_catalog_cache
 from clients.postgres.dto import PgConnectorDbSecretDto
-from clients.postgres.exceptions import PgQueryValidationError
+from clients.postgres.exceptions import PgObjectAlreadyExistsError, PgQueryValidationError
+from clients.postgres.passwords import verify_password_hash
+from clients.postgres.pool import PgPoolRegistry, pg_pool_registry
 from exceptions import InfrastructureServiceProblem
 
 logger = logging.getLogger('postgresclient')
 
+# Error classes of psycopg2 are generated at runtime, so they are looked up by code
+DUPLICATE_OBJECT_ERRORS = (errors.lookup(errorcodes.DUPLICATE_OBJECT), errors.lookup(errorcodes.DUPLICATE_DATABASE))
+
+# Statement with {}-style placeholders of identifiers and the identifiers
+Statement = Tuple[str, List[str]]
+
+# Logins and databases with owners for snapshot of catalog
+SELECT_CATALOG = """
+    SELECT
+        ARRAY(SELECT rolname::text FROM pg_catalog.pg_roles WHERE rolcanlogin),
+        ARRAY(SELECT ARRAY[datname::text, pg_catalog.pg_get_userbyid(datdba)::text]
+              FROM pg_catalog.pg_database);
+"""
+SELECT_USER_GRANTEE = """
+    WITH grantee AS (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %(user)s)
+    SELECT current_database() = %(database)s AND (
+        EXISTS(
+            SELECT 1 FROM pg_catalog.pg_class c
+            WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND c.relnamespace NOT IN ('pg_catalog'::regnamespace, 'information_schema'::regnamespace)
+              AND EXISTS(
+                  SELECT 1 FROM aclexplode(COALESCE(c.relacl, acldefault('r', c.relowner))) a
+                  WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'SELECT'
+              )
+            LIMIT 1
+        )
+        OR EXISTS(
+            SELECT 1 FROM pg_catalog.pg_default_acl d, aclexplode(d.defaclacl) a
+            WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'SELECT'
+            LIMIT 1
+        )
+    ) AND EXISTS(SELECT 1 FROM grantee);
+"""
+SELECT_CAN_READ_AUTHID = """SELECT has_table_privilege('pg_catalog.pg_authid', 'SELECT');"""
+SELECT_PASSWORD_HASH = """SELECT rolpassword FROM pg_catalog.pg_authid WHERE rolname = %s;"""
+SELECT_IS_MEMBER = """SELECT pg_has_role(%s, %s, 'MEMBER');"""
+SELECT_IS_DIRECT_MEMBER = """
+    SELECT EXISTS(
+        SELECT 1 FROM pg_catalog.pg_auth_members m
+        WHERE m.roleid = (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %s)
+          AND m.member = (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %s)
+    );
+"""
+SELECT_DATABASE_PRIVILEGES = """
+    SELECT count(DISTINCT a.privilege_type) = 3
+    FROM pg_catalog.pg_database d, aclexplode(COALESCE(d.datacl, acldefault('d', d.datdba))) a
+    WHERE d.datname = %s
+      AND a.grantee = (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %s)
+      AND a.privilege_type IN ('CREATE', 'CONNECT', 'TEMPORARY');
+"""
+CREATE_USER = """CREATE USER {} WITH ENCRYPTED PASSWORD %s;"""
+ALTER_USER_PASSWORD = """ALTER USER {} WITH ENCRYPTED PASSWORD %s;"""
+CREATE_DATABASE = """CREATE DATABASE {} WITH OWNER = %s;"""
+GRANT_ALL_PRIVILEGES = """GRANT ALL PRIVILEGES ON DATABASE {} TO {};"""
+GRANT_ROLE = """GRANT {} TO {};"""
+REVOKE_ROLE = """REVOKE {} FROM {};"""
+
+# Checks of catalog for read access, every check is paired with statement
+# that grants missing access. {0} is grantor, {1} is grantee.
+SELECT_ACCESS_CHECKS = """
+    WITH
+        grantor AS (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %(grantor)s),
+        grantee AS (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = %(grantee)s),
+        admin AS (SELECT oid FROM pg_catalog.pg_roles WHERE rolname = current_user),
+        public_schema AS (SELECT oid, nspacl, nspowner FROM pg_catalog.pg_namespace WHERE nspname = 'public'),
+        default_acl AS (
+            SELECT d.defaclrole, d.defaclnamespace, d.defaclobjtype
+            FROM pg_catalog.pg_default_acl d, aclexplode(d.defaclacl) a
+            WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'SELECT'
+        )
+    SELECT
+        pg_has_role(current_user, %(grantor)s, 'MEMBER'),
+        EXISTS(
+            SELECT 1 FROM public_schema s, aclexplode(COALESCE(s.nspacl, acldefault('n', s.nspowner))) a
+            WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'USAGE'
+        ),
+        NOT EXISTS(
+            SELECT 1 FROM pg_catalog.pg_class c
+            WHERE c.relnamespace = (SELECT oid FROM public_schema) AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+              AND NOT EXISTS(
+                  SELECT 1 FROM aclexplode(COALESCE(c.relacl, acldefault('r', c.relowner))) a
+                  WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'SELECT'
+              )
+        ),
+        NOT EXISTS(
+            SELECT 1 FROM pg_catalog.pg_class c
+            WHERE c.relnamespace = (SELECT oid FROM public_schema) AND c.relkind = 'S'
+              AND NOT EXISTS(
+                  SELECT 1 FROM aclexplode(COALESCE(c.relacl, acldefault('s', c.relowner))) a
+                  WHERE a.grantee = (SELECT oid FROM grantee) AND a.privilege_type = 'SELECT'
+              )
+        ),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM admin)
+               AND defaclnamespace = 0 AND defaclobjtype = 'r'),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM admin)
+               AND defaclnamespace = 0 AND defaclobjtype = 'S'),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM admin)
+               AND defaclnamespace = (SELECT oid FROM public_schema) AND defaclobjtype = 'r'),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM admin)
+               AND defaclnamespace = (SELECT oid FROM public_schema) AND defaclobjtype = 'S'),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM grantor)
+               AND defaclnamespace = (SELECT oid FROM public_schema) AND defaclobjtype = 'r'),
+        EXISTS(SELECT 1 FROM default_acl WHERE defaclrole = (SELECT oid FROM grantor)
+               AND defaclnamespace = (SELECT oid FROM public_schema) AND defaclobjtype = 'S');
+"""
+SELECT_ACCESS_STATEMENTS = (
+    """GRANT USAGE ON SCHEMA public TO {1};""",
+    """GRANT SELECT ON ALL TABLES IN SCHEMA public TO {1};""",
+    """GRANT SELECT ON ALL SEQUENCES IN SCHEMA public TO {1};""",
+    """ALTER DEFAULT PRIVILEGES GRANT SELECT ON TABLES TO {1};""",
+    """ALTER DEFAULT PRIVILEGES GRANT SELECT ON SEQUENCES TO {1};""",
+    """ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON TABLES TO {1};""",
+    """ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT SELECT ON SEQUENCES TO {1};""",
+    """ALTER DEFAULT PRIVILEGES FOR USER {0} IN SCHEMA public GRANT SELECT ON TABLES TO {1};""",
+    """ALTER DEFAULT PRIVILEGES FOR USER {0} IN SCHEMA public GRANT SELECT ON SEQUENCES TO {1};""",
+)
+
 
 class AbstractPostgresClient:
     __metaclass__ = ABCMeta
@@ -27,6 +150,23 @@ class AbstractPostgresClient:
     def is_database_exist(self, db_name: str) -> bool:
         raise NotImplementedError
 
+    def is_user_and_database_exist(self, user: str, db_name: str) -> Tuple[bool, bool]:
+        return self.is_user_exist(user), self.is_database_exist(db_name)
+
+    @contextmanager
+    def session(self) -> Iterator["AbstractPostgresClient"]:
+        """All queries inside session are executed on one connection."""
+        yield self
+
+    @contextmanager
+    def transaction(self) -> Iterator["AbstractPostgresClient"]:
+        """
+        All queries inside transaction are committed together or rolled
+        back on exception. Statements that can't be run inside transaction
+        block, e.g. `CREATE DATABASE`, must be executed outside of it.
+        """
+        yield self
+
     @abstractmethod
     def create_user(self, user: str, password: str):
         raise NotImplementedError
@@ -35,6 +175,10 @@ class AbstractPostgresClient:
     def alter_user_password(self, user: str, password: str):
         raise NotImplementedError
 
+    @abstractmethod
+    def is_user_password_valid(self, user: str, password: str, db_name: Optional[str] = None) -> bool:
+        raise NotImplementedError
+
     @abstractmethod
     def create_database(self, db_name: str, user: str):
         raise NotImplementedError
@@ -54,8 +198,80 @@ class AbstractPostgresClient:
 
 class PostgresClient(AbstractPostgresClient):
 
-    def __init__(self, pg_connector_secret_dto: PgConnectorDbSecretDto):
+    def __init__(self, pg_connector_secret_dto: PgConnectorDbSecretDto,
+                 pool_registry: Optional[PgPoolRegistry] = None,
+                 catalog_cache: Optional[PgCatalogCache] = None):
         self.connection_data = pg_connector_secret_dto
+        self._pool_registry = pool_registry or pg_pool_registry
+        self._catalog_cache = catalog_cache or pg_catalog_cache
+        self._local = threading.local()
+        self._can_read_authid: Optional[bool] = None
+
+    @contextmanager
+    def _connection(self):
+        session_conn = getattr(self._local, 'conn', None)
+        if session_conn is not None:
+            yield session_conn
+            return
+        pool = self._pool_registry.get_pool(self.connection_data)
+        with pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def session(self) -> Iterator["PostgresClient"]:
+        if getattr(self._local, 'conn', None) is not None:
+            yield self
+            return
+        pool = self._pool_registry.get_pool(self.connection_data)
+        try:
+            conn = pool.acquire()
+        except Exception as e:
+            raise InfrastructureServiceProblem('Postgres', e)
+        self._local.conn = conn
+        try:
+            yield self
+        finally:
+            self._local.conn = None
+            pool.release(conn)
+
+    @contextmanager
+    def transaction(self) -> Iterator["PostgresClient"]:
+        with self.session():
+            conn = self._local.conn
+            if not conn.autocommit:
+                # Nested transaction is a part of outer one
+                yield self
+                return
+            conn.autocommit = False
+            try:
+                yield self
+            except BaseException:
+                self._rollback(conn)
+                raise
+            self._commit(conn)
+
+    @classmethod
+    def _commit(cls, conn):
+        try:
+            conn.commit()
+        except Exception as e:
+            # Rollback restores autocommit if connection is not broken
+            cls._rollback(conn)
+            raise InfrastructureServiceProblem('Postgres', e)
+        try:
+            conn.autocommit = True
+        except psycopg2.Error:
+            # Broken connection is dropped by pool on checkin
+            logger.warning('Autocommit is not restored after commit.')
+
+    @staticmethod
+    def _rollback(conn):
+        try:
+            conn.rollback()
+            conn.autocommit = True
+        except psycopg2.Error:
+            # Broken connection is dropped by pool on checkin
+            logger.warning('Transaction rollback failed.')
 
     def _execute_query_v2(self, query: str, *, identifiers: Iterable[str] = None,
                           values: Iterable[str] = None):
@@ -73,130 +289,209 @@ class PostgresClient(AbstractPostgresClient):
 
         :return: Returns list of values.
         """
-        conn = None
+        return self._execute(self._compose(query, identifiers), values)
+
+    @staticmethod
+    def _compose(query: str, identifiers: Iterable[str] = None) -> sql.Composable:
+        if identifiers is None:
+            return sql.SQL(query)
+        if not identifiers:
+            raise PgQueryValidationError(f'sql identifiers are mandatory but empty. '
+                                         f'Please check variables name in Vault, identifiers: {identifiers}')
+        query_identifiers = [sql.Identifier(i) for i in identifiers]
+        return sql.SQL(query).format(*query_identifiers)
+
+    def _execute_statements(self, statements: List[Statement]):
+        """Executes statements in one round trip."""
+        if not statements:
+            return
+        query = sql.SQL(' ').join(self._compose(query, identifiers) for query, identifiers in statements)
+        self._execute(query)
+
+    def _execute(self, query: sql.Composable, values=None):
         if values is None:
             values = []
-        if identifiers is None:
-            query = sql.SQL(query)
-        else:
-            if not identifiers:
-                raise PgQueryValidationError(f'sql identifiers are mandatory but empty. '
-                                             f'Please check variables name in Vault, identifiers: {identifiers}')
-            query_identifiers = [sql.Identifier(i) for i in identifiers]
-            query = sql.SQL(query).format(*query_identifiers)
         try:
-            logger.info('Connecting to the PostgreSQL database...')
-            conn = psycopg2.connect(database=self.connection_data.db_name,
-                                    user=self.connection_data.user,
-                                    password=self.connection_data.password,
-                                    host=self.connection_data.host,
-                                    port=self.connection_data.port)
-            conn.autocommit = True
-            cursor = conn.cursor()
+            with self._connection() as conn, conn.cursor() as cursor:
+                cursor.execute(query, values)
+
+                try:
+                    results = cursor.fetchall()
+                except psycopg2.ProgrammingError:
+                    results = []
+        except DUPLICATE_OBJECT_ERRORS as e:
+            raise PgObjectAlreadyExistsError('Postgres', e)
+        except (Exception, psycopg2.DatabaseError) as e:
+            raise InfrastructureServiceProblem('Postgres', e)
+        return results
+
+    def _catalog(self, force: bool = False) -> PgCatalogSnapshot:
+        return self._catalog_cache.get(instance_key(self.connection_data), self._load_catalog, force=force)
 
-            cursor.execute(query, values)
+    def _load_catalog(self) -> PgCatalogSnapshot:
+        (users, databases), = self._execute_query_v2(SELECT_CATALOG)
+        return PgCatalogSnapshot(users=frozenset(users), databases=dict(databases))
 
+    def _on_ddl(self, error: Optional[InfrastructureServiceProblem] = None):
+        """
+        Snapshot of catalog is changed by DDL of operator. If object
+        already exists, snapshot was stale and it is loaded again at once.
+        """
+        if isinstance(error, PgObjectAlreadyExistsError):
             try:
-                results = cursor.fetchall()
-            except psycopg2.ProgrammingError:
-                results = []
-        except (Exception, psycopg2.DatabaseError) as e:
-            raise InfrastructureServiceProblem('Postgres', e)
-        else:
-            return results
-        finally:
-            if conn is not None:
-                conn.close()
-                logger.info('Database connection closed.')
+                self._catalog(force=True)
+                return
+            except InfrastructureServiceProblem:
+                pass
+        self._catalog_cache.invalidate(instance_key(self.connection_data))
 
     def is_user_exist(self, user: str) -> bool:
-        query = """SELECT * FROM pg_catalog.pg_user u WHERE u.usename = %s;"""
-        return bool(self._execute_query_v2(query, values=[user]))
+        return user in self._catalog().users
 
     def is_user_grantee(self, database: str, user: str) -> bool:
-        query = """
-            SELECT 1 FROM information_schema.table_privileges WHERE
-                grantee = %s
-                AND table_catalog = %s
-                AND privilege_type = 'SELECT'
-            UNION
-            SELECT 1
-            FROM pg_default_acl acl
-            JOIN pg_namespace namespace on namespace.oid = acl.defaclnamespace
-            WHERE acl.defaclacl::text ILIKE %s
-              AND acl.defaclacl::text ILIKE %s;
         """
-        return bool(self._execute_query_v2(
-            query,
-            values=[user, database, f"%{user}%", f"%{database}%"],
-        ))
+        Checks that user may read any table of database, either by grant
+        on existing table or by default privileges for new tables. Client
+        must be connected to this database.
+
+        Grants are compared with role oid, as `information_schema` does, but
+        without its views, and every branch stops on the first row found.
+        """
+        (is_grantee,), = self._execute_query_v2(SELECT_USER_GRANTEE, values={'user': user, 'database': database})
+        return bool(is_grantee)
 
     def is_database_exist(self, db_name: str) -> bool:
-        query = """SELECT * FROM pg_catalog.pg_database db WHERE db.datname = %s;"""
-        return bool(self._execute_query_v2(query, values=[db_name]))
+        return db_name in self._catalog().databases
+
+    def is_user_and_database_exist(self, user: str, db_name: str) -> Tuple[bool, bool]:
+        catalog = self._catalog()
+        return user in catalog.users, db_name in catalog.databases
 
     def create_user(self, user: str, password: str):
-        query = """CREATE USER {} WITH ENCRYPTED PASSWORD %s;"""
-        self._execute_query_v2(query, identifiers=[user], values=[password])
+        try:
+            self._execute_query_v2(CREATE_USER, identifiers=[user], values=[password])
+        except InfrastructureServiceProblem as e:
+            self._on_ddl(e)
+            raise
+        self._on_ddl()
 
     def alter_user_password(self, user: str, password: str):
-        query = """ALTER USER {} WITH ENCRYPTED PASSWORD %s;"""
-        self._execute_query_v2(query, identifiers=[user], values=[password])
+        self._execute_query_v2(ALTER_USER_PASSWORD, identifiers=[user], values=[password])
+
+    def is_user_password_valid(self, user: str, password: str, db_name: Optional[str] = None) -> bool:
+        """
+        Checks password of existing user without rewriting it. Password hash
+        is compared with `pg_authid` if operator may read it, otherwise user
+        is authenticated in database `db_name`. Password is considered
+        invalid if it can't be checked.
+        """
+        password_hash = self._get_password_hash(user)
+        if password_hash is not None:
+            return verify_password_hash(password_hash, user, password)
+        if db_name is None:
+            return False
+        return self._authenticate(db_name, user, password)
+
+    def _get_password_hash(self, user: str) -> Optional[str]:
+        if self._can_read_authid is None:
+            (self._can_read_authid,), = self._execute_query_v2(SELECT_CAN_READ_AUTHID)
+        if not self._can_read_authid:
+            return None
+        rows = self._execute_query_v2(SELECT_PASSWORD_HASH, values=[user])
+        return rows[0][0] if rows else None
+
+    def _authenticate(self, db_name: str, user: str, password: str) -> bool:
+        try:
+            conn = psycopg2.connect(database=db_name,
+                                    user=user,
+                                    password=password,
+                                    host=self.connection_data.host,
+                                    port=self.connection_data.port,
+                                    connect_timeout=settings.POSTGRES_AUTH_PROBE_TIMEOUT)
+        except psycopg2.Error as e:
+            logger.info(f"User '{user}' is not authenticated in database '{db_name}': {e}")
+            return False
+        conn.close()
+        return True
 
     def create_database(self, db_name: str, user: str):
-        self._grant_user_to_another(
-            user=user, another_user=self.connection_data.user
-        )
-        self._create_database(db_name=db_name, owner=user)
-        self._revoke_user_from_another(
-            user=user, another_user=self.connection_data.user
-        )
-        self.grant_all_privileges(db_name=db_name, user=user)
+        admin = self.connection_data.user
+        with self.session():
+            # CREATE DATABASE can't be executed inside transaction block,
+            # so membership needed for it is granted in autocommit mode.
+            # Membership is granted and revoked only if admin is not member yet.
+            is_granted = not self._is_member(admin, user)
+            if is_granted:
+                self._grant_user_to_another(user=user, another_user=admin)
+            try:
+                self._create_database(db_name=db_name, owner=user)
+            except InfrastructureServiceProblem as e:
+                if is_granted:
+                    self._revoke_user_from_another(user=user, another_user=admin)
+                self._on_ddl(e)
+                raise
+            self._on_ddl()
+            statements = []
+            if is_granted:
+                statements.append((REVOKE_ROLE, [user, admin]))
+            if not self._has_database_privileges(db_name, user):
+                statements.append((GRANT_ALL_PRIVILEGES, [db_name, user]))
+            if statements:
+                with self.transaction():
+                    self._execute_statements(statements)
+
+    def _is_member(self, member: str, role: str) -> bool:
+        """Superuser is member of every role."""
+        (is_member,), = self._execute_query_v2(SELECT_IS_MEMBER, values=[member, role])
+        return is_member
+
+    def _is_direct_member(self, member: str, role: str) -> bool:
+        (is_member,), = self._execute_query_v2(SELECT_IS_DIRECT_MEMBER, values=[role, member])
+        return is_member
+
+    def _has_database_privileges(self, db_name: str, user: str) -> bool:
+        """Checks that user has all privileges on database, e.g. as its owner."""
+        (has_privileges,), = self._execute_query_v2(SELECT_DATABASE_PRIVILEGES, values=[db_name, user])
+        return has_privileges
 
     def _create_database(self, db_name: str, owner: str):
-        query = """CREATE DATABASE {} WITH OWNER = %s;"""
-        self._execute_query_v2(query, identifiers=[db_name], values=[owner])
+        self._execute_query_v2(CREATE_DATABASE, identifiers=[db_name], values=[owner])
 
     def grant_all_privileges(self, db_name: str, user: str):
-        query = """GRANT ALL PRIVILEGES ON DATABASE {} TO {};"""
-        self._execute_query_v2(query, identifiers=[db_name, user])
+        if self._has_database_privileges(db_name, user):
+            return
+        self._execute_query_v2(GRANT_ALL_PRIVILEGES, identifiers=[db_name, user])
 
     def grant_user_to_admin(self, user: str):
+        if self._is_direct_member('postgres', user):
+            return
         self._grant_user_to_another(user=user, another_user='postgres')
 
     def _grant_user_to_another(self, user: str, another_user: str):
-        query = """GRANT {} TO {};"""
-        self._execute_query_v2(query, identifiers=[user, another_user])
+        self._execute_query_v2(GRANT_ROLE, identifiers=[user, another_user])
 
     def _revoke_user_from_another(self, user: str, another_user: str):
-        query = """REVOKE {} FROM {};"""
-        self._execute_query_v2(query, identifiers=[user, another_user])
+        self._execute_query_v2(REVOKE_ROLE, identifiers=[user, another_user])
 
     def grant_access_on_select(self, grantor_name: str, grantee_name: str):
-        self._grant_user_to_another(grantor_name, self.connection_data.user)
-        self._grant_access_on_select(grantor_name, grantee_name)
-        self._revoke_user_from_another(
-            user=grantor_name, another_user=self.connection_data.user
-        )
-
-    def _grant_access_on_select(self, grantor_name: str, grantee_name: str):
-        query = """
-            GRANT USAGE ON SCHEMA public TO {1};
-
-            GRANT SELECT ON ALL TABLES IN SCHEMA public TO {1};
-            GRANT SELECT ON ALL SEQUENCES IN SCHEMA public TO {1};
-
-            ALTER DEFAULT PRIVILEGES GRANT SELECT ON TABLES TO {1};
-            ALTER DEFAULT PRIVILEGES GRANT SELECT ON SEQUENCES TO {1};
-
-            ALTER DEFAULT PRIVILEGES IN SCHEMA public
-                GRANT SELECT ON TABLES TO {1};
-            ALTER DEFAULT PRIVILEGES IN SCHEMA public
-                GRANT SELECT ON SEQUENCES TO {1};
-
-            ALTER DEFAULT PRIVILEGES FOR USER {0} IN SCHEMA public
-                GRANT SELECT ON TABLES TO {1};
-            ALTER DEFAULT PRIVILEGES FOR USER {0} IN SCHEMA public
-                GRANT SELECT ON SEQUENCES TO {1};
         """
-        self._execute_query_v2(query, identifiers=[grantor_name, grantee_name])
+        Grants read access to tables of grantor that is missing in catalog.
+        Missing grants are issued in one transaction and one round trip.
+        """
+        admin = self.connection_data.user
+        with self.session():
+            is_member, *checks = self._execute_query_v2(
+                SELECT_ACCESS_CHECKS, values={'grantor': grantor_name, 'grantee': grantee_name}
+            )[0]
+            statements = [
+                (statement, [grantor_name, grantee_name])
+                for statement, is_granted in zip(SELECT_ACCESS_STATEMENTS, checks) if not is_granted
+            ]
+            if not statements:
+                return
+            if not is_member:
+                # Default privileges of grantor are altered by its member
+                statements.insert(0, (GRANT_ROLE, [grantor_name, admin]))
+                statements.append((REVOKE_ROLE, [grantor_name, admin]))
+            with self.transaction():
+                self._execute_statements(statements)
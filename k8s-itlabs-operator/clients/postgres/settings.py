@@ -0,0 +1,22 @@
+from os import getenv
+
+# Max number of connections in pool of one (host, port, db_name, user)
+POSTGRES_POOL_MAXSIZE = int(getenv("POSTGRES_POOL_MAXSIZE", "4"))
+# Max number of pools, least recently used pool is closed above the limit
+POSTGRES_POOL_MAX_POOLS = int(getenv("POSTGRES_POOL_MAX_POOLS", "32"))
+# Idle connections are closed after this time, seconds
+POSTGRES_POOL_IDLE_TIMEOUT = float(getenv("POSTGRES_POOL_IDLE_TIMEOUT", "300"))
+# Connection idle longer than this time is checked with `SELECT 1` on checkout, seconds
+POSTGRES_POOL_HEALTHCHECK_AFTER = float(getenv("POSTGRES_POOL_HEALTHCHECK_AFTER", "5"))
+# Max time of waiting for free connection, seconds
+POSTGRES_POOL_CHECKOUT_TIMEOUT = float(getenv("POSTGRES_POOL_CHECKOUT_TIMEOUT", "30"))
+# Timeout of authentication of existing user with its password, seconds
+POSTGRES_AUTH_PROBE_TIMEOUT = int(getenv("POSTGRES_AUTH_PROBE_TIMEOUT", "5"))
+# Users and databases of Postgres instance are loaded again after this time or
+# after DDL of operator, seconds. Set 0 to query catalog for every check
+POSTGRES_CATALOG_REFRESH_INTERVAL = float(getenv("POSTGRES_CATALOG_REFRESH_INTERVAL", "30"))
+# Client of Postgres for background provisioning: `sync` (psycopg2 in worker
+# threads) or `async` (psycopg 3 on event loop, many databases at once)
+POSTGRES_CLIENT = getenv("POSTGRES_CLIENT", "sync")
+# Max number of connections in asyncio pool of one (host, port, db_name, user)
+POSTGRES_ASYNC_POOL_MAXSIZE = int(getenv("POSTGRES_ASYNC_POOL_MAXSIZE", "16"))
@@ -0,0 +1,129 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import psycopg
+import pytest
+
+from clients.postgres.asyncclient import AsyncPostgresClient
+from clients.postgres.catalog import PgCatalogCache
+from clients.postgres.exceptions import PgObjectAlreadyExistsError
+from clients.postgres.tests.factories import PgConnectorDbSecretDtoTestFactory
+from exceptions import InfrastructureServiceProblem
+
+
+@pytest.fixture
+def connection():
+    conn = MagicMock()
+    conn.autocommit = True
+
+    async def set_autocommit(value):
+        conn.autocommit = value
+    conn.set_autocommit = AsyncMock(side_effect=set_autocommit)
+    conn.commit = AsyncMock()
+    conn.rollback = AsyncMock()
+    cursor = conn.cursor.return_value.__aenter__.return_value
+    cursor.execute = AsyncMock()
+    cursor.fetchall = AsyncMock(return_value=[])
+    return conn
+
+
+@pytest.fixture
+def pool(connection):
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value=connection)
+    pool.release = AsyncMock()
+    pool.connection.return_value.__aenter__.return_value = connection
+    return pool
+
+
+@pytest.fixture
+def pg_client(pool):
+    registry = MagicMock()
+    registry.get_pool = AsyncMock(return_value=pool)
+    return AsyncPostgresClient(PgConnectorDbSecretDtoTestFactory(), pool_registry=registry,
+                               catalog_cache=PgCatalogCache(refresh_interval=60))
+
+
+def cursor_of(connection):
+    return connection.cursor.return_value.__aenter__.return_value
+
+
+def executed_queries(connection):
+    return [call.args[0] for call in cursor_of(connection).execute.call_args_list]
+
+
+@pytest.mark.unit
+class TestAsyncPostgresClient:
+    @pytest.mark.asyncio
+    async def test_existence_is_checked_in_snapshot(self, pg_client, connection):
+        cursor_of(connection).fetchall.return_value = [(['user'], [['db', 'user']])]
+
+        assert await pg_client.is_user_and_database_exist(user='user', db_name='another') == (True, False)
+        assert await pg_client.is_database_exist('db')
+        assert len(executed_queries(connection)) == 1
+
+    @pytest.mark.asyncio
+    async def test_snapshot_is_refreshed_if_object_already_exists(self, pg_client, connection):
+        cursor = cursor_of(connection)
+        cursor.fetchall.side_effect = [[([], [])], [(['user'], [])]]
+        cursor.execute.side_effect = [None, psycopg.errors.DuplicateObject(), None]
+
+        assert not await pg_client.is_user_exist('user')
+        with pytest.raises(PgObjectAlreadyExistsError):
+            await pg_client.create_user('user', 'secret')
+        assert await pg_client.is_user_exist('user')
+        assert len(executed_queries(connection)) == 3
+
+    @pytest.mark.asyncio
+    async def test_session_uses_one_connection(self, pg_client, pool, connection):
+        cursor_of(connection).fetchall.return_value = [(True,)]
+
+        async with pg_client.session():
+            await pg_client.grant_user_to_admin('user')
+            await pg_client.grant_all_privileges('db', 'user')
+
+        pool.acquire.assert_awaited_once()
+        pool.release.assert_awaited_once_with(connection)
+        pool.connection.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_missing_grants_are_committed_together(self, pg_client, connection):
+        cursor_of(connection).fetchall.return_value = [(True,) + (False,) * 9]
+
+        await pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        queries = executed_queries(connection)
+        assert len(queries) == 2
+        assert 'ON ALL TABLES' in repr(queries[1])
+        connection.commit.assert_awaited_once()
+        assert connection.autocommit
+
+    @pytest.mark.asyncio
+    async def test_transaction_rollback_on_error(self, pg_client, connection):
+        cursor = cursor_of(connection)
+        cursor.fetchall.return_value = [(False,) * 10]
+        cursor.execute.side_effect = [None, psycopg.OperationalError()]
+
+        with pytest.raises(InfrastructureServiceProblem):
+            await pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        connection.rollback.assert_awaited_once()
+        connection.commit.assert_not_called()
+        assert connection.autocommit
+
+    @pytest.mark.asyncio
+    async def test_failed_commit_on_broken_connection(self, pg_client, pool, connection):
+        cursor_of(connection).fetchall.return_value = [(False,) * 10]
+        connection.commit.side_effect = psycopg.OperationalError()
+        connection.rollback.side_effect = psycopg.InterfaceError()
+
+        async def set_autocommit(value):
+            if value:
+                # Connection is broken after transaction is started
+                raise psycopg.InterfaceError()
+            connection.autocommit = value
+        connection.set_autocommit.side_effect = set_autocommit
+
+        with pytest.raises(InfrastructureServiceProblem):
+            await pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        pool.release.assert_awaited_once_with(connection)
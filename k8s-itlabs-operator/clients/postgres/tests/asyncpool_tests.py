@@ -0,0 +1,122 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import psycopg
+import pytest
+from psycopg.pq import TransactionStatus
+
+from clients.postgres.asyncpool import AsyncPgConnectionPool, AsyncPgPoolRegistry
+from clients.postgres.exceptions import PgPoolTimeoutError
+from clients.postgres.tests.factories import PgConnectorDbSecretDtoTestFactory
+
+
+def fake_connection():
+    conn = MagicMock()
+    conn.closed = False
+    conn.autocommit = True
+    conn.info.transaction_status = TransactionStatus.IDLE
+    conn.execute = AsyncMock()
+
+    async def close():
+        conn.closed = True
+    conn.close = AsyncMock(side_effect=close)
+    return conn
+
+
+@pytest.fixture
+def connect_mock(mocker):
+    async def connect(**_):
+        return fake_connection()
+    return mocker.patch('clients.postgres.asyncpool.psycopg.AsyncConnection.connect', side_effect=connect)
+
+
+@pytest.mark.unit
+class TestAsyncPgConnectionPool:
+    @pytest.mark.asyncio
+    async def test_connection_is_reused(self, connect_mock):
+        pool = AsyncPgConnectionPool(PgConnectorDbSecretDtoTestFactory())
+
+        async with pool.connection() as first:
+            pass
+        async with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert connect_mock.call_count == 1
+        assert pool.size == 1
+        assert pool.idle_size == 1
+
+    @pytest.mark.asyncio
+    async def test_checkout_timeout(self, connect_mock):
+        pool = AsyncPgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1, checkout_timeout=0.01)
+
+        async with pool.connection():
+            with pytest.raises(PgPoolTimeoutError):
+                async with pool.connection():
+                    pass
+
+    @pytest.mark.asyncio
+    async def test_waiting_for_free_connection(self, connect_mock):
+        pool = AsyncPgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1, checkout_timeout=5)
+
+        async def hold_connection():
+            async with pool.connection():
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(hold_connection(), hold_connection(), hold_connection())
+
+        assert connect_mock.call_count == 1
+        assert pool.idle_size == 1
+
+    @pytest.mark.asyncio
+    async def test_unhealthy_connection_is_replaced(self, connect_mock):
+        pool = AsyncPgConnectionPool(PgConnectorDbSecretDtoTestFactory(), healthcheck_after=0)
+
+        async with pool.connection() as first:
+            pass
+        first.execute.side_effect = psycopg.OperationalError()
+        async with pool.connection() as second:
+            pass
+
+        assert first is not second
+        assert first.closed
+        assert pool.size == 1
+
+    @pytest.mark.asyncio
+    async def test_failed_connect_releases_slot(self, connect_mock):
+        pool = AsyncPgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1)
+        connect_mock.side_effect = psycopg.OperationalError()
+
+        with pytest.raises(psycopg.OperationalError):
+            async with pool.connection():
+                pass
+
+        assert pool.size == 0
+
+
+@pytest.mark.unit
+class TestAsyncPgPoolRegistry:
+    @pytest.mark.asyncio
+    async def test_least_recently_used_pool_is_closed(self, connect_mock):
+        registry = AsyncPgPoolRegistry(max_pools=1)
+        first = await registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+        async with first.connection() as conn:
+            pass
+
+        await registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+
+        assert len(registry) == 1
+        assert conn.closed
+
+    @pytest.mark.asyncio
+    async def test_idle_connections_of_other_pools_are_reaped(self, connect_mock):
+        registry = AsyncPgPoolRegistry(idle_timeout=0)
+        first = await registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+        async with first.connection() as conn:
+            pass
+
+        await registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+
+        assert len(registry) == 2
+        assert conn.closed
+        assert first.size == 0
@@ -1,10 +1,17 @@
+from typing import Optional
+
+from clients.postgres.exceptions import PgObjectAlreadyExistsError
 from clients.postgres.postgresclient import AbstractPostgresClient
 
 
 class MockedPostgresClient(AbstractPostgresClient):
-    def __init__(self, db_exist: bool, user_exist: bool):
+    def __init__(self, db_exist: bool, user_exist: bool, password_valid: bool = False,
+                 created_concurrently: bool = False):
         self.db_exist = db_exist
         self.user_exist = user_exist
+        # User and database are created by another replica after existence check
+        self.created_concurrently = created_concurrently
+        self.password_valid = password_valid
         self.db_create_call_count = 0
         self.user_create_call_count = 0
         self.user_alter_password_call_count = 0
@@ -19,12 +26,19 @@ class MockedPostgresClient(AbstractPostgresClient):
 
     def create_user(self, user: str, password: str):
         self.user_create_call_count += 1
+        if self.created_concurrently:
+            raise PgObjectAlreadyExistsError('Postgres', Exception(f'role "{user}" already exists'))
 
     def alter_user_password(self, user: str, password: str):
         self.user_alter_password_call_count += 1
 
+    def is_user_password_valid(self, user: str, password: str, db_name: Optional[str] = None) -> bool:
+        return self.password_valid
+
     def create_database(self, db_name: str, user: str):
         self.db_create_call_count += 1
+        if self.created_concurrently:
+            raise PgObjectAlreadyExistsError('Postgres', Exception(f'database "{db_name}" already exists'))
 
     def grant_all_privileges(self, db_name: str, user: str):
         self.grant_call_count += 1
@@ -0,0 +1,41 @@
+import base64
+import hashlib
+import hmac
+
+import pytest
+
+from clients.postgres.passwords import verify_password_hash
+
+
+def scram_hash(password: str, salt: bytes = b'0123456789abcdef', iterations: int = 4096) -> str:
+    salted_password = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    client_key = hmac.new(salted_password, b'Client Key', hashlib.sha256).digest()
+    server_key = hmac.new(salted_password, b'Server Key', hashlib.sha256).digest()
+    stored_key = hashlib.sha256(client_key).digest()
+    b64 = lambda value: base64.b64encode(value).decode()
+    return f'SCRAM-SHA-256${iterations}:{b64(salt)}${b64(stored_key)}:{b64(server_key)}'
+
+
+@pytest.mark.unit
+class TestVerifyPasswordHash:
+    def test_scram_password(self):
+        password_hash = scram_hash('secret')
+
+        assert verify_password_hash(password_hash, 'user', 'secret')
+        assert not verify_password_hash(password_hash, 'user', 'another')
+
+    def test_md5_password(self):
+        # md5 hash of password concatenated with user name, as Postgres stores it
+        password_hash = 'md5' + hashlib.md5(b'secretuser').hexdigest()
+
+        assert verify_password_hash(password_hash, 'user', 'secret')
+        assert not verify_password_hash(password_hash, 'another', 'secret')
+
+    @pytest.mark.parametrize('password_hash', [
+        'SCRAM-SHA-256$4096:not-base64$key:key',
+        'SCRAM-SHA-256$broken',
+        'secret',
+        '',
+    ])
+    def test_unknown_hash_is_not_verified(self, password_hash):
+        assert not verify_password_hash(password_hash, 'user', 'secret')
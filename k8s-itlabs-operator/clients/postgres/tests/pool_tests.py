@@ -0,0 +1,136 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from clients.postgres.exceptions import PgPoolTimeoutError
+from clients.postgres.pool import PgConnectionPool, PgPoolRegistry
+from clients.postgres.tests.factories import PgConnectorDbSecretDtoTestFactory
+
+
+def fake_connection():
+    conn = MagicMock()
+    conn.closed = 0
+    conn.get_transaction_status.return_value = TRANSACTION_STATUS_IDLE
+
+    def close():
+        conn.closed = 1
+    conn.close.side_effect = close
+    return conn
+
+
+@pytest.fixture
+def connect_mock(mocker):
+    return mocker.patch('clients.postgres.pool.psycopg2.connect', side_effect=lambda **_: fake_connection())
+
+
+@pytest.mark.unit
+class TestPgConnectionPool:
+    def test_connection_is_reused(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory())
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is second
+        assert connect_mock.call_count == 1
+        assert pool.size == 1
+        assert pool.idle_size == 1
+
+    def test_checkout_timeout(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1, checkout_timeout=0.01)
+
+        with pool.connection():
+            with pytest.raises(PgPoolTimeoutError):
+                with pool.connection():
+                    pass
+
+    def test_waiting_for_free_connection(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1, checkout_timeout=5)
+        checked_out = threading.Event()
+
+        def hold_connection():
+            with pool.connection():
+                checked_out.set()
+                time.sleep(0.05)
+
+        thread = threading.Thread(target=hold_connection)
+        thread.start()
+        checked_out.wait()
+        with pool.connection():
+            pass
+        thread.join()
+
+        assert connect_mock.call_count == 1
+
+    def test_idle_connection_is_reaped(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory(), idle_timeout=0)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        assert first.closed
+        assert pool.size == 1
+
+    def test_unhealthy_connection_is_replaced(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory(), healthcheck_after=0)
+
+        with pool.connection() as first:
+            pass
+        first.cursor.return_value.__enter__.return_value.execute.side_effect = psycopg2.OperationalError()
+        with pool.connection() as second:
+            pass
+
+        assert first is not second
+        assert first.closed
+        assert pool.size == 1
+
+    def test_failed_connect_releases_slot(self, connect_mock):
+        pool = PgConnectionPool(PgConnectorDbSecretDtoTestFactory(), maxsize=1)
+        connect_mock.side_effect = psycopg2.OperationalError()
+
+        with pytest.raises(psycopg2.OperationalError):
+            with pool.connection():
+                pass
+
+        assert pool.size == 0
+
+
+@pytest.mark.unit
+class TestPgPoolRegistry:
+    def test_same_pool_for_same_key(self):
+        registry = PgPoolRegistry()
+        connection_data = PgConnectorDbSecretDtoTestFactory()
+
+        assert registry.get_pool(connection_data) is registry.get_pool(connection_data)
+
+    def test_least_recently_used_pool_is_closed(self, connect_mock):
+        registry = PgPoolRegistry(max_pools=1)
+        first = registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+        with first.connection() as conn:
+            pass
+
+        registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+
+        assert len(registry) == 1
+        assert conn.closed
+
+    def test_idle_connections_of_other_pools_are_reaped(self, connect_mock):
+        registry = PgPoolRegistry(idle_timeout=0)
+        first = registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+        with first.connection() as conn:
+            pass
+
+        registry.get_pool(PgConnectorDbSecretDtoTestFactory())
+
+        assert len(registry) == 2
+        assert conn.closed
+        assert first.size == 0
@@ -0,0 +1,270 @@
+import hashlib
+from unittest.mock import MagicMock, PropertyMock
+
+import psycopg2
+import pytest
+
+from clients.postgres.catalog import PgCatalogCache
+from clients.postgres.exceptions import PgObjectAlreadyExistsError
+from clients.postgres.postgresclient import PostgresClient
+from clients.postgres.tests.factories import PgConnectorDbSecretDtoTestFactory
+from exceptions import InfrastructureServiceProblem
+
+
+@pytest.fixture
+def connection():
+    conn = MagicMock()
+    conn.autocommit = True
+    return conn
+
+
+@pytest.fixture
+def pool(connection):
+    pool = MagicMock()
+    pool.acquire.return_value = connection
+    pool.connection.return_value.__enter__.return_value = connection
+    return pool
+
+
+@pytest.fixture
+def pg_client(pool):
+    registry = MagicMock()
+    registry.get_pool.return_value = pool
+    return PostgresClient(PgConnectorDbSecretDtoTestFactory(), pool_registry=registry,
+                          catalog_cache=PgCatalogCache(refresh_interval=60))
+
+
+def executed_queries(connection):
+    cursor = connection.cursor.return_value.__enter__.return_value
+    return [call.args[0] for call in cursor.execute.call_args_list]
+
+
+@pytest.mark.unit
+class TestPostgresClientSession:
+    def test_create_database_on_one_connection(self, pg_client, pool, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        # Admin is not member of user, user has no privileges on database
+        cursor.fetchall.side_effect = [[(False,)], [], [], [(False,)], []]
+
+        pg_client.create_database(db_name='db', user='user')
+
+        assert pool.acquire.call_count == 1
+        pool.connection.assert_not_called()
+        pool.release.assert_called_once_with(connection)
+        # Membership and privileges checks, grant, create and one batch of revoke and grant
+        assert len(executed_queries(connection)) == 5
+        connection.commit.assert_called_once()
+        assert connection.autocommit is True
+
+    def test_transaction_rollback_on_error(self, pg_client, pool, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.execute.side_effect = [None, psycopg2.ProgrammingError()]
+        cursor.fetchall.return_value = [(False,) * 10]
+
+        with pytest.raises(InfrastructureServiceProblem):
+            pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        connection.rollback.assert_called_once()
+        connection.commit.assert_not_called()
+        pool.release.assert_called_once_with(connection)
+
+    def test_failed_commit_on_broken_connection(self, pg_client, pool, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(False,) * 10]
+        connection.commit.side_effect = psycopg2.OperationalError()
+        connection.rollback.side_effect = psycopg2.InterfaceError()
+
+        state = {'autocommit': True}
+
+        def autocommit(*value):
+            if not value:
+                return state['autocommit']
+            if value[0]:
+                # Connection is broken after transaction is started
+                raise psycopg2.InterfaceError()
+            state['autocommit'] = False
+            return None
+        type(connection).autocommit = PropertyMock(side_effect=autocommit)
+
+        with pytest.raises(InfrastructureServiceProblem):
+            pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        pool.release.assert_called_once_with(connection)
+
+    def test_existence_in_one_query(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(['user'], [['another', 'user']])]
+
+        assert pg_client.is_user_and_database_exist(user='user', db_name='db') == (True, False)
+        assert len(executed_queries(connection)) == 1
+
+    def test_query_without_session_uses_pool_connection(self, pg_client, pool, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [([], [])]
+        pg_client.is_user_exist('user')
+
+        pool.acquire.assert_not_called()
+        pool.connection.assert_called_once()
+
+
+@pytest.mark.unit
+class TestPostgresClientCatalog:
+    def test_existence_is_checked_in_snapshot(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(['user'], [['db', 'user']])]
+
+        assert pg_client.is_user_exist('user')
+        assert not pg_client.is_user_exist('another')
+        assert pg_client.is_database_exist('db')
+        assert pg_client.is_user_and_database_exist(user='another', db_name='db') == (False, True)
+        assert len(executed_queries(connection)) == 1
+
+    def test_snapshot_is_loaded_again_after_refresh_interval(self, pool, connection):
+        registry = MagicMock()
+        registry.get_pool.return_value = pool
+        pg_client = PostgresClient(PgConnectorDbSecretDtoTestFactory(), pool_registry=registry,
+                                   catalog_cache=PgCatalogCache(refresh_interval=0))
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[([], [])], [(['user'], [])]]
+
+        assert not pg_client.is_user_exist('user')
+        assert pg_client.is_user_exist('user')
+
+    def test_snapshot_is_invalidated_by_ddl(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[([], [])], [], [(['user'], [])]]
+
+        assert not pg_client.is_user_exist('user')
+        pg_client.create_user('user', 'secret')
+        assert pg_client.is_user_exist('user')
+        assert len(executed_queries(connection)) == 3
+
+    def test_snapshot_is_refreshed_if_object_already_exists(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[([], [])], [(['user'], [])]]
+        cursor.execute.side_effect = [None, psycopg2.errors.DuplicateObject(), None]
+
+        assert not pg_client.is_user_exist('user')
+        with pytest.raises(PgObjectAlreadyExistsError):
+            pg_client.create_user('user', 'secret')
+        assert len(executed_queries(connection)) == 3
+        # Snapshot is already refreshed
+        assert pg_client.is_user_exist('user')
+        assert len(executed_queries(connection)) == 3
+
+    def test_snapshots_are_kept_per_instance(self):
+        cache = PgCatalogCache(refresh_interval=60)
+        load = MagicMock(side_effect=lambda: MagicMock(loaded_at=float('inf')))
+
+        cache.get(('host', 5432), load)
+        cache.get(('host', 5432), load)
+        cache.get(('another', 5432), load)
+        assert load.call_count == 2
+
+        cache.invalidate(('host', 5432))
+        cache.get(('host', 5432), load)
+        assert load.call_count == 3
+
+
+@pytest.mark.unit
+class TestPostgresClientPasswordCheck:
+    def test_password_hash_is_compared_with_catalog(self, pg_client, connection, mocker):
+        connect = mocker.patch('clients.postgres.postgresclient.psycopg2.connect')
+        cursor = connection.cursor.return_value.__enter__.return_value
+        password_hash = 'md5' + hashlib.md5(b'secretuser').hexdigest()
+        cursor.fetchall.side_effect = [[(True,)], [(password_hash,)], [(password_hash,)]]
+
+        assert pg_client.is_user_password_valid('user', 'secret', db_name='db')
+        assert not pg_client.is_user_password_valid('user', 'another', db_name='db')
+        # Rights to read catalog are checked once
+        assert len(executed_queries(connection)) == 3
+        connect.assert_not_called()
+
+    def test_user_is_authenticated_without_catalog_rights(self, pg_client, connection, mocker):
+        connect = mocker.patch('clients.postgres.postgresclient.psycopg2.connect')
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(False,)]
+
+        assert pg_client.is_user_password_valid('user', 'secret', db_name='db')
+        connect.return_value.close.assert_called_once()
+        assert connect.call_args.kwargs['user'] == 'user'
+        assert connect.call_args.kwargs['password'] == 'secret'
+
+        connect.side_effect = psycopg2.OperationalError('password authentication failed')
+        assert not pg_client.is_user_password_valid('user', 'another', db_name='db')
+
+    def test_password_is_invalid_if_it_cant_be_checked(self, pg_client, connection, mocker):
+        connect = mocker.patch('clients.postgres.postgresclient.psycopg2.connect')
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(False,)]
+
+        assert not pg_client.is_user_password_valid('user', 'secret', db_name=None)
+        connect.assert_not_called()
+
+
+@pytest.mark.unit
+class TestPostgresClientGrants:
+    def test_create_database_without_missing_grants(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.side_effect = [[(True,)], [], [(True,)]]
+
+        pg_client.create_database(db_name='db', user='user')
+
+        queries = executed_queries(connection)
+        assert len(queries) == 3
+        assert 'CREATE DATABASE' in repr(queries[1])
+        connection.commit.assert_not_called()
+
+    def test_existing_admin_membership_is_not_granted(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(True,)]
+
+        pg_client.grant_user_to_admin('user')
+
+        assert len(executed_queries(connection)) == 1
+
+    def test_all_select_grants_exist(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(True,) * 10]
+
+        pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        assert len(executed_queries(connection)) == 1
+        connection.commit.assert_not_called()
+
+    def test_only_missing_select_grants_are_issued(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        # Admin is member of grantor, only usage on schema and default
+        # privileges of grantor on sequences are missing
+        cursor.fetchall.return_value = [(True, False) + (True,) * 7 + (False,)]
+
+        pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        queries = executed_queries(connection)
+        assert len(queries) == 2
+        statements = repr(queries[1])
+        assert 'GRANT USAGE ON SCHEMA' in statements
+        assert 'FOR USER' in statements and 'ON SEQUENCES' in statements
+        assert 'ON ALL TABLES' not in statements
+        assert 'REVOKE' not in statements
+        connection.commit.assert_called_once()
+
+    def test_membership_is_granted_for_missing_grants(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(False,) + (True,) * 8 + (False,)]
+
+        pg_client.grant_access_on_select(grantor_name='grantor', grantee_name='grantee')
+
+        statements = repr(executed_queries(connection)[1])
+        assert statements.index("SQL('GRANT ')") < statements.index('ALTER DEFAULT') < statements.index("SQL('REVOKE ')")
+
+    def test_user_grantee_in_one_query(self, pg_client, connection):
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = [(True,)]
+
+        assert pg_client.is_user_grantee(database='db', user='app')
+
+        assert len(executed_queries(connection)) == 1
+        values = cursor.execute.call_args.args[1]
+        # Role is compared by name in catalog, not by substring of ACL text
+        assert values == {'user': 'app', 'database': 'db'}
@@ -1,6 +1,8 @@
 from abc import ABCMeta, abstractmethod
 import base64
 import logging
+from typing import Optional
+
 import requests
 
 import ujson
@@ -9,6 +11,7 @@ from clients.rabbit.settings import RABBIT_TIMEOUT
 from clients.rabbit.exceptions import RabbitClientError
 from exceptions import InfrastructureServiceProblem
 from utils.common import join
+from utils.http import get_session
 
 app_logger = logging.getLogger('rabbit_logger')
 
@@ -51,10 +54,12 @@ class AbstractRabbitClient:
 
 class RabbitClient(AbstractRabbitClient):
 
-    def __init__(self, url: str, user: str, password: str):
+    def __init__(self, url: str, user: str, password: str,
+                 session: Optional[requests.Session] = None):
         self.url = url
         self.user = user
         self.password = password
+        self._session = session or get_session('rabbit')
 
     def get_rabbit_user(self, user: str):
         return self._send_rabbit_request(endpoint=f'/users/{user}')
@@ -96,7 +101,7 @@ class RabbitClient(AbstractRabbitClient):
             "content-type": "application/json"
         }
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=endpoint,
                 data=ujson.dumps(data),
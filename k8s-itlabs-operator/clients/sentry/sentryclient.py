@@ -6,6 +6,7 @@ import ujson
 
 from exceptions import InfrastructureServiceProblem
 from utils.common import join
+from utils.http import get_session
 from clients.sentry.settings import SENTRY_TIMEOUT
 from clients.sentry.exceptions import SentryClientError
 from clients.sentry.dto import SentryTeam, SentryProject, SentryProjectKey
@@ -50,10 +51,12 @@ class AbstractSentryClient:
 
 
 class SentryClient(AbstractSentryClient):
-    def __init__(self, url: str, token: str, organization: str):
+    def __init__(self, url: str, token: str, organization: str,
+                 session: Optional[requests.Session] = None):
         self.url = url
         self.token = token
         self.organization = organization
+        self._session = session or get_session('sentry')
 
     def _send_request(self, endpoint: str, data: Optional[dict] = None, method: str = "GET"):
         endpoint = join(self.url, f'/api/0{endpoint}')
@@ -62,7 +65,7 @@ class SentryClient(AbstractSentryClient):
             "content-type": "application/json"
         }
         try:
-            response = requests.request(
+            response = self._session.request(
                 method=method,
                 url=endpoint,
                 headers=headers,
@@ -0,0 +1,158 @@
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import hvac
+
+from observability.metrics.metrics import app_vault_auth_total
+
+logger = logging.getLogger('vault_auth')
+
+
+@dataclass(frozen=True)
+class KubernetesAuthConfig:
+    role: str
+    mount_point: str
+    jwt_path: str
+    renew_threshold: float
+    retry_interval: float
+
+
+@dataclass
+class VaultTokenState:
+    # Number of successful logins, it identifies token
+    generation: int = 0
+    is_logged_in: bool = False
+    expires_at: float = 0.0
+    renew_at: float = 0.0
+    renewable: bool = False
+
+
+class VaultKubernetesAuth:
+    """
+    Keeps hvac client authenticated with Kubernetes auth method.
+
+    Login is done once and the token is renewed in background thread after
+    `renew_threshold` share of its TTL is passed. The client re-logins only
+    if token is expired, could not be renewed or Vault answered with 403.
+    Concurrent callers rejected with the same token re-login only once.
+    """
+
+    def __init__(self, client: hvac.Client, role: str, mount_point: str, jwt_path: str,
+                 renew_threshold: float = 0.5, retry_interval: float = 5):
+        self.client = client
+        self._config = KubernetesAuthConfig(role, mount_point, jwt_path, renew_threshold, retry_interval)
+
+        self._lock = threading.RLock()
+        self._token = VaultTokenState()
+
+        self._stop_event = threading.Event()
+        self._renewal_thread: Optional[threading.Thread] = None
+
+    @property
+    def is_token_valid(self) -> bool:
+        return self._token.is_logged_in and time.monotonic() < self._token.expires_at
+
+    @property
+    def generation(self) -> int:
+        """Generation of current token, it is passed to `relogin`."""
+        return self._token.generation
+
+    def _read_jwt(self) -> str:
+        with open(self._config.jwt_path) as f:
+            return f.read()
+
+    def _set_lease(self, lease_duration: int, renewable: bool):
+        now = time.monotonic()
+        if lease_duration:
+            self._token.expires_at = now + lease_duration
+            self._token.renew_at = now + lease_duration * self._config.renew_threshold
+        else:
+            # Token without TTL never expires and doesn't need renewal
+            self._token.expires_at = math.inf
+            self._token.renew_at = math.inf
+        self._token.renewable = renewable
+
+    def login(self):
+        with self._lock:
+            try:
+                auth = self.client.auth.kubernetes.login(
+                    self._config.role, self._read_jwt(), use_token=True, mount_point=self._config.mount_point
+                )['auth']
+            except Exception:
+                self._token.is_logged_in = False
+                app_vault_auth_total.labels(operation='login', status='failure').inc()
+                raise
+            self.client.token = auth['client_token']
+            self._set_lease(auth.get('lease_duration', 0), auth.get('renewable', False))
+            self._token.is_logged_in = True
+            self._token.generation += 1
+            app_vault_auth_total.labels(operation='login', status='success').inc()
+            logger.info(f"Logged in to Vault, token TTL is {auth.get('lease_duration', 0)}s")
+
+    def renew(self):
+        with self._lock:
+            if not (self.is_token_valid and self._token.renewable):
+                self.login()
+                return
+            try:
+                auth = self.client.auth.token.renew_self()['auth']
+            except Exception as e:
+                app_vault_auth_total.labels(operation='renew', status='failure').inc()
+                logger.warning(f"Vault token renewal failed, login again: {e}")
+                self.login()
+                return
+            app_vault_auth_total.labels(operation='renew', status='success').inc()
+            self._set_lease(auth.get('lease_duration', 0), auth.get('renewable', False))
+            logger.debug(f"Vault token renewed, token TTL is {auth.get('lease_duration', 0)}s")
+
+    def ensure_authenticated(self) -> hvac.Client:
+        if not self.is_token_valid:
+            with self._lock:
+                if not self.is_token_valid:
+                    self.login()
+            self.start_renewal()
+        return self.client
+
+    def relogin(self, generation: Optional[int] = None):
+        """
+        Called when Vault rejected the token, e.g. it was revoked. If
+        `generation` of rejected token is given, login is skipped when
+        another caller has already replaced that token.
+        """
+        with self._lock:
+            if generation is not None and generation != self._token.generation and self.is_token_valid:
+                return
+            self.login()
+
+    def _seconds_until_renewal(self) -> float:
+        return max(self._token.renew_at - time.monotonic(), 0)
+
+    def _renewal_loop(self):
+        while not self._stop_event.wait(min(self._seconds_until_renewal(), 3600)):
+            if self._seconds_until_renewal() > 0:
+                continue
+            try:
+                self.renew()
+            except Exception as e:
+                logger.error("Could not renew Vault token", exc_info=e)
+                self._stop_event.wait(self._config.retry_interval)
+
+    def start_renewal(self):
+        with self._lock:
+            if self._renewal_thread and self._renewal_thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._renewal_thread = threading.Thread(
+                target=self._renewal_loop, name='vault-token-renewal', daemon=True
+            )
+            self._renewal_thread.start()
+
+    def stop_renewal(self):
+        self._stop_event.set()
+        if self._renewal_thread:
+            self._renewal_thread.join()
+            self._renewal_thread = None
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from clients.vault.vault_path import VaultPath
+from utils.cache import TTLCache
+
+
+class VaultSecretCache(TTLCache):
+    """
+    Cache of raw Vault kv2 responses keyed by (mount_point, path).
+
+    Absent secrets are cached as `None` with separate `negative_ttl`.
+
+    Every invalidation gets the next generation. Value read from Vault is
+    stored by `set_if_current` only if its key was not invalidated after
+    reading started, so secret written during reading is not shadowed by
+    the stale value.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, negative_ttl: float):
+        super().__init__(name='vault_secret', maxsize=maxsize, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self._generation = 0
+        # Generations of the latest invalidations, bounded as cache itself
+        self._invalidated: "OrderedDict[Hashable, int]" = OrderedDict()
+        # The latest generation among invalidations dropped from `_invalidated`
+        self._forgotten_generation = -1
+
+    @staticmethod
+    def key(vault_path: VaultPath) -> Tuple[str, str]:
+        return vault_path.mount_point, vault_path.path
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        if ttl is None and value is None:
+            ttl = self.negative_ttl
+        super().set(key, value, ttl)
+
+    @property
+    def generation(self) -> int:
+        """Generation is taken before reading Vault and passed to `set_if_current`."""
+        with self._lock:
+            return self._generation
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._generation += 1
+            self._data.pop(key, None)
+            self._invalidated[key] = self._generation
+            self._invalidated.move_to_end(key)
+            while len(self._invalidated) > self.maxsize:
+                _, generation = self._invalidated.popitem(last=False)
+                self._forgotten_generation = max(self._forgotten_generation, generation)
+
+    def set_if_current(self, key: Hashable, value: Any, generation: int) -> bool:
+        """Returns False if key was invalidated after `generation`, value is not stored then."""
+        with self._lock:
+            invalidated = max(self._invalidated.get(key, -1), self._forgotten_generation)
+            if invalidated > generation:
+                return False
+            self._set_locked(key, value, self.negative_ttl if value is None else None)
+            return True
@@ -1,23 +1,71 @@
 import logging
+import threading
+from typing import Optional
 
 import hvac
+import requests
+from requests.adapters import HTTPAdapter
 
 from clients.vault import settings
+from clients.vault.auth import VaultKubernetesAuth
+from clients.vault.cache import VaultSecretCache
 from clients.vault.vaultclient import VaultClient, AbstractVaultClient
 
 logger = logging.getLogger("vault_client")
 
 
 class VaultClientFactory:
+    _auth: Optional[VaultKubernetesAuth] = None
+    _cache: Optional[VaultSecretCache] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _create_session(cls) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.VAULT_HTTP_POOL_MAXSIZE,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    @classmethod
+    def get_auth(cls) -> VaultKubernetesAuth:
+        """
+        Returns process-wide Vault auth, that shares one authenticated
+        hvac client with pooled http session between all connectors.
+        """
+        if cls._auth is None:
+            with cls._lock:
+                if cls._auth is None:
+                    client = hvac.Client(url=settings.VAULT_URL, session=cls._create_session())
+                    cls._auth = VaultKubernetesAuth(
+                        client=client,
+                        role=settings.VAULT_K8S_ROLE,
+                        mount_point=settings.VAULT_K8S_AUTH_METHOD,
+                        jwt_path=settings.VAULT_K8S_TOKEN_PATH,
+                        renew_threshold=settings.VAULT_TOKEN_RENEW_THRESHOLD,
+                        retry_interval=settings.VAULT_TOKEN_RETRY_INTERVAL,
+                    )
+        return cls._auth
+
+    @classmethod
+    def get_cache(cls) -> Optional[VaultSecretCache]:
+        if not settings.VAULT_CACHE_ENABLED:
+            return None
+        if cls._cache is None:
+            with cls._lock:
+                if cls._cache is None:
+                    cls._cache = VaultSecretCache(
+                        maxsize=settings.VAULT_CACHE_MAXSIZE,
+                        ttl=settings.VAULT_CACHE_TTL,
+                        negative_ttl=settings.VAULT_CACHE_NEGATIVE_TTL,
+                    )
+        return cls._cache
+
     @classmethod
     def create_vault_client(cls) -> AbstractVaultClient:
-        with open('/var/run/secrets/kubernetes.io/serviceaccount/token') as f:
-            jwt = f.read()
-        role = settings.VAULT_K8S_ROLE
-        client = hvac.Client(url=settings.VAULT_URL)
-        client.token = client.auth.kubernetes.login(
-            role, jwt, use_token=True, mount_point=settings.VAULT_K8S_AUTH_METHOD
-        )['auth']['client_token']
-        if not client.is_authenticated():
-            logger.error("Vault auth failed ")
-        return VaultClient(client)
+        auth = cls.get_auth()
+        client = auth.ensure_authenticated()
+        return VaultClient(client, auth=auth, cache=cls.get_cache())
@@ -1,5 +1,24 @@
 from os import getenv
 
+from utils.common import strtobool
+
 VAULT_URL = getenv("VAULT_URL", "http://localhost:8200")
 VAULT_K8S_AUTH_METHOD = getenv("VAULT_K8S_AUTH_METHOD", "kube-dev")
 VAULT_K8S_ROLE = getenv("VAULT_K8S_ROLE", "k8s-itlabs-operator")
+VAULT_K8S_TOKEN_PATH = getenv("VAULT_K8S_TOKEN_PATH", "/var/run/secrets/kubernetes.io/serviceaccount/token")
+
+# Share of token TTL after which the token is renewed in background
+VAULT_TOKEN_RENEW_THRESHOLD = float(getenv("VAULT_TOKEN_RENEW_THRESHOLD", "0.5"))
+# Delay before next attempt if renewal and re-login were failed, seconds
+VAULT_TOKEN_RETRY_INTERVAL = float(getenv("VAULT_TOKEN_RETRY_INTERVAL", "5"))
+VAULT_HTTP_POOL_MAXSIZE = int(getenv("VAULT_HTTP_POOL_MAXSIZE", "10"))
+
+# Cache of read secrets, disabled by default
+VAULT_CACHE_ENABLED = bool(strtobool(getenv("VAULT_CACHE_ENABLED", "false")))
+VAULT_CACHE_MAXSIZE = int(getenv("VAULT_CACHE_MAXSIZE", "256"))
+VAULT_CACHE_TTL = float(getenv("VAULT_CACHE_TTL", "60"))
+# TTL of cached absence of secret
+VAULT_CACHE_NEGATIVE_TTL = float(getenv("VAULT_CACHE_NEGATIVE_TTL", "5"))
+
+# Max number of secrets read concurrently while unvaulting one object
+VAULT_READ_MAX_WORKERS = int(getenv("VAULT_READ_MAX_WORKERS", "4"))
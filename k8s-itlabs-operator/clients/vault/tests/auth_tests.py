@@ -0,0 +1,90 @@
+from unittest.mock import MagicMock
+
+import hvac
+import pytest
+
+from clients.vault.auth import VaultKubernetesAuth
+from clients.vault.vaultclient import VaultClient
+
+
+@pytest.fixture
+def jwt_path(tmp_path):
+    path = tmp_path / "token"
+    path.write_text("jwt")
+    return str(path)
+
+
+@pytest.fixture
+def hvac_client():
+    client = MagicMock()
+    client.auth.kubernetes.login.return_value = {
+        "auth": {"client_token": "token", "lease_duration": 3600, "renewable": True}
+    }
+    client.auth.token.renew_self.return_value = {
+        "auth": {"client_token": "token", "lease_duration": 3600, "renewable": True}
+    }
+    return client
+
+
+@pytest.mark.unit
+class TestVaultKubernetesAuth:
+    def test_login_once_for_valid_token(self, hvac_client, jwt_path):
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+        auth.start_renewal = MagicMock()
+
+        auth.ensure_authenticated()
+        auth.ensure_authenticated()
+
+        assert hvac_client.auth.kubernetes.login.call_count == 1
+        assert hvac_client.token == "token"
+        assert auth.is_token_valid
+
+    def test_login_again_on_expired_token(self, hvac_client, jwt_path):
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+        auth.start_renewal = MagicMock()
+
+        auth.ensure_authenticated()
+        auth._token.expires_at = 0
+        auth.ensure_authenticated()
+
+        assert hvac_client.auth.kubernetes.login.call_count == 2
+
+    def test_renew_renewable_token(self, hvac_client, jwt_path):
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+        auth.login()
+        auth.renew()
+
+        assert hvac_client.auth.kubernetes.login.call_count == 1
+        assert hvac_client.auth.token.renew_self.call_count == 1
+
+    def test_login_on_failed_renewal(self, hvac_client, jwt_path):
+        hvac_client.auth.token.renew_self.side_effect = hvac.exceptions.Forbidden()
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+        auth.login()
+        auth.renew()
+
+        assert hvac_client.auth.kubernetes.login.call_count == 2
+
+
+@pytest.mark.unit
+class TestVaultClientRelogin:
+    def test_relogin_on_forbidden(self, hvac_client, jwt_path):
+        value = {"data": {"data": {"KEY": "value"}}}
+        hvac_client.secrets.kv.v2.read_secret_version.side_effect = [hvac.exceptions.Forbidden(), value]
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+
+        client = VaultClient(hvac_client, auth=auth)
+
+        assert client.read_secret("vault:secret/data/path") == {"KEY": "value"}
+        assert hvac_client.auth.kubernetes.login.call_count == 1
+
+    def test_relogin_once_for_the_same_token(self, hvac_client, jwt_path):
+        auth = VaultKubernetesAuth(hvac_client, role="role", mount_point="kube", jwt_path=jwt_path)
+        auth.login()
+        rejected = auth.generation
+
+        auth.relogin(rejected)
+        auth.relogin(rejected)
+
+        assert hvac_client.auth.kubernetes.login.call_count == 2
+        assert auth.generation == rejected + 1
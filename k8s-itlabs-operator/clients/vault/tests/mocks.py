@@ -28,6 +28,9 @@ class MockedVaultClient(AbstractVaultClient):
     def delete_secret(self, path: str):
         pass
 
+    def get_secret_version(self, path: str) -> Optional[int]:
+        return None
+
     def read_secret_key(self, path: str) -> Optional[str]:
         pass
 
@@ -0,0 +1,108 @@
+from unittest.mock import MagicMock
+
+import hvac
+import pytest
+
+from clients.vault.cache import VaultSecretCache
+from clients.vault.vaultclient import VaultClient
+
+
+@pytest.fixture
+def cache():
+    return VaultSecretCache(maxsize=10, ttl=60, negative_ttl=60)
+
+
+@pytest.mark.unit
+class TestVaultClientCache:
+    path = "vault:secret/data/application/credentials"
+
+    def test_read_secret_once(self, cache):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_version.return_value = {"data": {"data": {"KEY": "value"}}}
+        client = VaultClient(hvac_client, cache=cache)
+
+        assert client.read_secret(self.path) == {"KEY": "value"}
+        assert client.read_secret(self.path) == {"KEY": "value"}
+        assert hvac_client.secrets.kv.v2.read_secret_version.call_count == 1
+
+    def test_cache_non_exist_secret(self, cache):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_version.side_effect = hvac.exceptions.InvalidPath()
+        client = VaultClient(hvac_client, cache=cache)
+
+        assert client.read_secret(self.path) is None
+        assert client.read_secret(self.path) is None
+        assert hvac_client.secrets.kv.v2.read_secret_version.call_count == 1
+
+    def test_create_secret_invalidates_cache(self, cache):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_version.side_effect = [
+            hvac.exceptions.InvalidPath(),
+            {"data": {"data": {"KEY": "value"}}},
+        ]
+        client = VaultClient(hvac_client, cache=cache)
+
+        assert client.read_secret(self.path) is None
+        client.create_secret(self.path, {"KEY": "value"})
+        assert client.read_secret(self.path) == {"KEY": "value"}
+
+    def test_delete_secret_invalidates_cache(self, cache):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_version.side_effect = [
+            {"data": {"data": {"KEY": "value"}}},
+            hvac.exceptions.InvalidPath(),
+        ]
+        client = VaultClient(hvac_client, cache=cache)
+
+        assert client.read_secret(self.path) == {"KEY": "value"}
+        client.delete_secret(self.path)
+        assert client.read_secret(self.path) is None
+
+
+    def test_value_read_before_create_is_not_cached(self, cache):
+        hvac_client = MagicMock()
+        client = VaultClient(hvac_client, cache=cache)
+
+        def read_secret_version(**_):
+            if hvac_client.secrets.kv.v2.read_secret_version.call_count > 1:
+                return {"data": {"data": {"KEY": "value"}}}
+            # Secret is written by another thread while it is read
+            client.create_secret(self.path, {"KEY": "value"})
+            raise hvac.exceptions.InvalidPath()
+        hvac_client.secrets.kv.v2.read_secret_version.side_effect = read_secret_version
+
+        assert client.read_secret(self.path) is None
+        assert client.read_secret(self.path) == {"KEY": "value"}
+
+
+@pytest.mark.unit
+class TestVaultClientSecretVersion:
+    path = "vault:secret/data/application/credentials"
+
+    def test_current_version(self):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_metadata.return_value = {"data": {
+            "current_version": 2,
+            "versions": {"1": {"deletion_time": "", "destroyed": False},
+                         "2": {"deletion_time": "", "destroyed": False}},
+        }}
+        client = VaultClient(hvac_client)
+
+        assert client.get_secret_version(self.path) == 2
+
+    def test_deleted_current_version(self):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_metadata.return_value = {"data": {
+            "current_version": 1,
+            "versions": {"1": {"deletion_time": "2022-01-01T00:00:00Z", "destroyed": False}},
+        }}
+        client = VaultClient(hvac_client)
+
+        assert client.get_secret_version(self.path) is None
+
+    def test_non_exist_secret(self):
+        hvac_client = MagicMock()
+        hvac_client.secrets.kv.v2.read_secret_metadata.side_effect = hvac.exceptions.InvalidPath()
+        client = VaultClient(hvac_client)
+
+        assert client.get_secret_version(self.path) is None
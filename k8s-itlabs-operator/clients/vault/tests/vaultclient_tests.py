@@ -1,26 +1,58 @@
+from dataclasses import dataclass, fields
+
 import pytest
 
 from clients.vault.tests.mocks import VaultClientMocker
 from clients.vault.vaultclient import VaultClient
 
 
+@dataclass
+class SimpleObject:
+    a: str = 'vault'
+    b: str = 'vault:mount/asd'
+    c: str = 'vault:mount/data/asd'
+    d: str = 'vault:mount/data/asd#ASD'
+    e: int = 1
+
+
 @pytest.mark.unit
 class TestVaultClient:
     def test_unvault_object(self, mocker):
         value = {'data': {'data': {'ASD': 'greate_secret'}}}
         with VaultClientMocker.mock_hvac_vault_client(mocker, value) as hvac_mocked:
             client = VaultClient(hvac_mocked)
-            attr_dict = {
-                'a': 'vault',
-                'b': 'vault:mount/asd',
-                'c': 'vault:mount/data/asd',
-                'd': 'vault:mount/data/asd#ASD',
-            }
-            SimpleObject = type('SimpleObject', (object,), attr_dict)
             obj = SimpleObject()
             new_obj = client.unvault_object(obj)
-            assert attr_dict.get('a') == new_obj.a
-            assert attr_dict.get('b') == new_obj.b
-            assert attr_dict.get('c') == new_obj.c
-            assert attr_dict.get('d') != new_obj.d
+            assert SimpleObject.a == new_obj.a
+            assert SimpleObject.b == new_obj.b
+            assert SimpleObject.c == new_obj.c
+            assert SimpleObject.d != new_obj.d
+            assert SimpleObject.e == new_obj.e
             assert value['data']['data']['ASD'] == new_obj.d
+
+    def test_unvault_object_reads_every_secret_once(self, mocker):
+        @dataclass
+        class Connector:
+            host: str = 'vault:secret/data/instance#HOST'
+            username: str = 'vault:secret/data/instance#USERNAME'
+            password: str = 'vault:secret/data/instance#PASSWORD'
+            token: str = 'vault:secret/data/other#TOKEN'
+
+        value = {'data': {'data': {'HOST': 'host', 'USERNAME': 'user', 'PASSWORD': 'pass', 'TOKEN': 'token'}}}
+        read_mock = VaultClientMocker.mock_hvac_vault_client(mocker, value)
+        client = VaultClient(mocker.MagicMock())
+
+        obj = client.unvault_object(Connector())
+
+        assert read_mock.call_count == 2
+        assert [getattr(obj, f.name) for f in fields(obj)] == ['host', 'user', 'pass', 'token']
+
+    def test_unvault_object_with_non_exist_secret(self, mocker):
+        @dataclass
+        class Connector:
+            host: str = 'vault:secret/data/instance#HOST'
+
+        VaultClientMocker.mock_hvac_vault_client(mocker, None)
+        client = VaultClient(mocker.MagicMock())
+
+        assert client.unvault_object(Connector()).host is None
@@ -1,13 +1,21 @@
+import copy
+import dataclasses
 import logging
 from abc import ABCMeta, abstractmethod
-from typing import Optional, TypeVar, Union
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union
 
 import hvac
 
+from clients.vault import settings
+from clients.vault.auth import VaultKubernetesAuth
+from clients.vault.cache import VaultSecretCache
 from clients.vault.exceptions import IncorrectPath
 from clients.vault.factories.vault_path import VaultPathFactory, CandidateVaultPathFactory
 from clients.vault.vault_path import VaultPath
 from exceptions import InfrastructureServiceProblem
+from utils.cache import MISSING
 
 AnyObject = TypeVar('AnyObject')
 VaultValue = Union[int, str, bool, float, None, dict, list,]
@@ -29,6 +37,10 @@ class AbstractVaultClient:
     def delete_secret(self, path: str):
         raise NotImplementedError
 
+    @abstractmethod
+    def get_secret_version(self, path: str) -> Optional[int]:
+        raise NotImplementedError
+
     @abstractmethod
     def unvault_object(self, obj: AnyObject) -> AnyObject:
         raise NotImplementedError
@@ -38,8 +50,30 @@ class VaultClient(AbstractVaultClient):
     _SECURED_VALUE = "******"
     _SECURED_KEYS = ["pass", "token", "dsn"]
 
-    def __init__(self, hvac_vault_client: hvac.Client):
+    def __init__(self, hvac_vault_client: hvac.Client, auth: Optional[VaultKubernetesAuth] = None,
+                 cache: Optional[VaultSecretCache] = None):
         self.client = hvac_vault_client
+        self._auth = auth
+        self._cache = cache
+
+    def _invalidate_cache(self, vault_path: VaultPath):
+        if self._cache is not None:
+            self._cache.invalidate(self._cache.key(vault_path))
+
+    def _call_vault(self, method: Callable, **kwargs):
+        """
+        Calls Vault api method, token is re-logged in once if Vault rejected it.
+        Callers rejected with the same token share one login.
+        """
+        generation = self._auth.generation if self._auth else None
+        try:
+            return method(**kwargs)
+        except hvac.exceptions.Forbidden:
+            if not self._auth:
+                raise
+            logger.warning("Vault token was rejected, login again")
+            self._auth.relogin(generation)
+            return method(**kwargs)
 
     def _get_secured_value(self, key: str, value: str) -> str:
         """
@@ -54,21 +88,39 @@ class VaultClient(AbstractVaultClient):
         logger.info(f"Write secret '{vault_path}' to Vault: {secured_data}")
         try:
             cas = None if update_allowed else 0
-            result = self.client.secrets.kv.v2.create_or_update_secret(
+            result = self._call_vault(
+                self.client.secrets.kv.v2.create_or_update_secret,
                 path=vault_path.path, secret=data, cas=cas, mount_point=vault_path.mount_point
             )
             return result
         except Exception as e:
             raise InfrastructureServiceProblem('Vault', e)
+        finally:
+            self._invalidate_cache(vault_path)
 
     def _read_secret_version(self, vault_path: VaultPath) -> dict:
         """
         Get last secret version from Vault (kv2) by path /{mount_point}/data/{path}.
+
+        If cache is set, response is read from cache while it is not expired.
         """
+        if self._cache is None:
+            return self._fetch_secret_version(vault_path)
+
+        cache_key = self._cache.key(vault_path)
+        result = self._cache.get(cache_key)
+        if result is MISSING:
+            generation = self._cache.generation
+            result = self._fetch_secret_version(vault_path)
+            self._cache.set_if_current(cache_key, result, generation)
+        return copy.deepcopy(result)
+
+    def _fetch_secret_version(self, vault_path: VaultPath) -> Optional[dict]:
         logger.info(f"Started reading Vault secret version: {vault_path}")
         result = None
         try:
-            result = self.client.secrets.kv.v2.read_secret_version(
+            result = self._call_vault(
+                self.client.secrets.kv.v2.read_secret_version,
                 path=vault_path.path, mount_point=vault_path.mount_point
             )
         except hvac.v1.exceptions.InvalidPath:
@@ -84,11 +136,15 @@ class VaultClient(AbstractVaultClient):
             return raw_response["data"]["data"]
         return None
 
-    def _read_secret_key(self, vault_path: VaultPath) -> Optional[VaultValue]:
-        secret = self._read_secret(vault_path)
-        if secret:
-            return secret.get(vault_path.key, None)
-        return None
+    def _read_secrets(self, vault_paths: List[VaultPath]) -> List[Optional[dict]]:
+        """
+        Read several secrets, concurrently if there are more than one.
+        """
+        if len(vault_paths) == 1:
+            return [self._read_secret(vault_paths[0])]
+        max_workers = min(len(vault_paths), settings.VAULT_READ_MAX_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='vault-read') as executor:
+            return list(executor.map(self._read_secret, vault_paths))
 
     def read_secret(self, path: str) -> Optional[dict]:
         try:
@@ -106,17 +162,58 @@ class VaultClient(AbstractVaultClient):
         try:
             logger.info(f"Delete secret'{path}' from Vault")
             vault_path = VaultPathFactory.path_from_str(vault_path=path)
-            self.client.secrets.kv.v2.delete_metadata_and_all_versions(path=vault_path.path,
-                                                                       mount_point=vault_path.mount_point)
+            self._call_vault(self.client.secrets.kv.v2.delete_metadata_and_all_versions,
+                             path=vault_path.path, mount_point=vault_path.mount_point)
+            self._invalidate_cache(vault_path)
+        except Exception as e:
+            raise InfrastructureServiceProblem('Vault', e)
+
+    def get_secret_version(self, path: str) -> Optional[int]:
+        """
+        Returns current version of kv2 secret from its metadata, None if
+        secret doesn't exist or its current version is deleted.
+        """
+        try:
+            vault_path = VaultPathFactory.path_from_str(vault_path=path)
+        except IncorrectPath as e:
+            logger.info(e)
+            return None
+        try:
+            metadata = self._call_vault(
+                self.client.secrets.kv.v2.read_secret_metadata,
+                path=vault_path.path, mount_point=vault_path.mount_point
+            )["data"]
+        except hvac.v1.exceptions.InvalidPath:
+            return None
         except Exception as e:
             raise InfrastructureServiceProblem('Vault', e)
+        current_version = metadata.get("current_version")
+        version = metadata.get("versions", {}).get(str(current_version), {})
+        if not current_version or version.get("deletion_time") or version.get("destroyed"):
+            return None
+        return current_version
 
     def unvault_object(self, obj: AnyObject) -> AnyObject:
-        attrs = dir(obj)
-        for attr in attrs:
-            if isinstance(getattr(obj, attr), str):
-                candidate_vault_path = CandidateVaultPathFactory.candidate_from_str(vault_path=getattr(obj, attr))
-                if candidate_vault_path.is_vaulted_value:
-                    value = self._read_secret_key(candidate_vault_path.vault_path)
-                    setattr(obj, attr, value)
+        """
+        Replace vaulted values of dataclass fields with values from Vault.
+
+        Fields are grouped by secret, so every secret is read only once.
+        """
+        vaulted_fields: Dict[Tuple[str, str], List[Tuple[str, VaultPath]]] = defaultdict(list)
+        for field in dataclasses.fields(obj):
+            value = getattr(obj, field.name)
+            if not isinstance(value, str):
+                continue
+            candidate_vault_path = CandidateVaultPathFactory.candidate_from_str(vault_path=value)
+            if candidate_vault_path.is_vaulted_value:
+                vault_path = candidate_vault_path.vault_path
+                vaulted_fields[(vault_path.mount_point, vault_path.path)].append((field.name, vault_path))
+
+        if not vaulted_fields:
+            return obj
+
+        secrets = self._read_secrets([fields[0][1] for fields in vaulted_fields.values()])
+        for fields, secret in zip(vaulted_fields.values(), secrets):
+            for field_name, vault_path in fields:
+                setattr(obj, field_name, secret.get(vault_path.key, None) if secret else None)
         return obj
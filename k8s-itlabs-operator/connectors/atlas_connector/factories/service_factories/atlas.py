@@ -1,9 +1,12 @@
+from functools import lru_cache
+
 from connectors.atlas_connector.services.atlas import AtlasService, AbstractAtlasService
 
 
 class AtlasServiceFactory:
-    @classmethod
-    def create_atlas_service(cls, atlas_url: str, atlas_token: str) -> AbstractAtlasService:
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def create_atlas_service(atlas_url: str, atlas_token: str) -> AbstractAtlasService:
         return AtlasService(
             atlas_url=atlas_url,
             atlas_token=atlas_token
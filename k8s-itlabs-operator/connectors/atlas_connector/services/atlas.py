@@ -1,5 +1,5 @@
 from abc import ABCMeta, abstractmethod
-from typing import Dict
+from typing import Dict, Optional
 
 import requests
 
@@ -7,6 +7,7 @@ from connectors.atlas_connector.specifications import ATLAS_TIMEOUT
 from connectors.atlas_connector.dto import AtlasMicroserviceDto
 from connectors.atlas_connector.presenters import AtlasMicroserviceDtoPresenter
 from exceptions import InfrastructureServiceProblem
+from utils.http import get_session
 
 
 class AbstractAtlasService:
@@ -18,9 +19,11 @@ class AbstractAtlasService:
 
 
 class AtlasService(AbstractAtlasService):
-    def __init__(self, atlas_url: str, atlas_token: str):
+    def __init__(self, atlas_url: str, atlas_token: str,
+                 session: Optional[requests.Session] = None):
         self._atlas_url = atlas_url
         self._atlas_token = atlas_token
+        self._session = session or get_session('atlas')
 
     def _get_headers(self) -> Dict[str, str]:
         return {"Authorization": f"Bearer {self._atlas_token}"}
@@ -29,7 +32,7 @@ class AtlasService(AbstractAtlasService):
         url = f'{self._atlas_url}/private/api/1/atlas-connector'
         data = AtlasMicroserviceDtoPresenter.atlas_dict_from_dto(atlas_ms_dto=atlas_microservice_dto)
         try:
-            requests.post(
+            self._session.post(
                 url=url,
                 json=data,
                 headers=self._get_headers(),
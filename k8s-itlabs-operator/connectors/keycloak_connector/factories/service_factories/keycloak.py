@@ -1,9 +1,16 @@
+from functools import lru_cache
+
 from clients.keycloak.client import KeycloakClient
 from connectors.keycloak_connector.services.keycloak import KeycloakService
 
 
 class KeycloakServiceFactory:
     @staticmethod
-    def create(url: str, realm: str, username: str, password: str) -> KeycloakService:
-        client = KeycloakClient(url, realm, username, password)
+    @lru_cache(maxsize=32)
+    def _get_client(url: str, realm: str, username: str, password: str) -> KeycloakClient:
+        return KeycloakClient(url, realm, username, password)
+
+    @classmethod
+    def create(cls, url: str, realm: str, username: str, password: str) -> KeycloakService:
+        client = cls._get_client(url, realm, username, password)
         return KeycloakService(client)
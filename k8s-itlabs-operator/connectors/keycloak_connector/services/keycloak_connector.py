@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from itertools import chain
 
 from connectors.keycloak_connector import specifications
@@ -6,13 +7,18 @@ from connectors.keycloak_connector.dto import KeycloakConnectorMicroserviceDto
 from connectors.keycloak_connector.exceptions import KeycloakConnectorCrdDoesNotExist, \
     NonExistSecretForKeycloakConnector
 from connectors.keycloak_connector.factories.service_factories.keycloak import KeycloakServiceFactory
+from connectors.keycloak_connector.services.keycloak import KeycloakService
 from connectors.keycloak_connector.services.kubernetes import KubernetesService
 from connectors.keycloak_connector.services.vault import VaultService
+from provisioning.memo import provisioning_memo
 from utils.concurrency import ConnectorSourceLock
+from utils.singleflight import SingleFlight
 from utils.hashing import generate_hash
 
 
 class KeycloakConnectorService:
+    _flight = SingleFlight('keycloak_connector')
+
     def __init__(self, vault_service: VaultService):
         self.vault_service = vault_service
 
@@ -32,6 +38,7 @@ class KeycloakConnectorService:
         return False
 
     def on_create_deployment(self, ms_kk_conn: KeycloakConnectorMicroserviceDto):
+        source = provisioning_memo.source('keycloak_connector', ms_kk_conn)
         kk_connector = KubernetesService.get_keycloak_connector(ms_kk_conn.keycloak_instance_name)
         if not kk_connector:
             raise KeycloakConnectorCrdDoesNotExist(
@@ -39,6 +46,11 @@ class KeycloakConnectorService:
                 " does not exist"
             )
 
+        fingerprint = provisioning_memo.fingerprint(kk_connector, ms_kk_conn)
+        get_secret_version = partial(self.vault_service.get_secret_version, ms_kk_conn.vault_path)
+        if provisioning_memo.is_provisioned('keycloak_connector', fingerprint, get_secret_version, source):
+            return
+
         kk_api_cred = self.vault_service.unvault_keycloak_connector(kk_connector)
         if not kk_api_cred:
             raise NonExistSecretForKeycloakConnector(
@@ -49,14 +61,22 @@ class KeycloakConnectorService:
             url=kk_api_cred.url, realm=kk_api_cred.realm,
             username=kk_api_cred.username, password=kk_api_cred.password
         )
-        kk_ms_cred = self.vault_service.get_kk_ms_secret(ms_kk_conn.vault_path)
-
         source_hash = self.generate_source_hash(
             url=kk_api_cred.url,
             realm=kk_api_cred.realm,
             client_id=ms_kk_conn.client_id,
         )
-        with ConnectorSourceLock(source_hash):
+        # Concurrent admissions of the same microservice share provisioning
+        self._flight.do(
+            generate_hash(source_hash, repr(ms_kk_conn)),
+            lambda: self._provision(source_hash, ms_kk_conn, kk_service),
+        )
+        provisioning_memo.mark_provisioned('keycloak_connector', fingerprint, get_secret_version, source)
+
+    def _provision(self, source_hash: str, ms_kk_conn: KeycloakConnectorMicroserviceDto,
+                   kk_service: KeycloakService):
+        kk_ms_cred = self.vault_service.get_kk_ms_secret(ms_kk_conn.vault_path)
+        with ConnectorSourceLock(source_hash, connector_type='keycloak_connector'):
             if kk_ms_cred and kk_service.is_kk_client_exist(client_id=ms_kk_conn.client_id):
                 logging.info("Keycloak client already exist")
                 return
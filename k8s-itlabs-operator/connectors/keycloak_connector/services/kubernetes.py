@@ -30,11 +30,8 @@ class KubernetesService(AbstractKubernetesService):
 
     @classmethod
     def get_keycloak_connector(cls, name: str) -> Optional[KeycloakConnector]:
-        kk_connector_obj = cls._k8s_client.get_cluster_custom_object(
-            group="itlabs.io",
-            version="v1",
-            plural="keycloakconnectors",
-            name=name
+        kk_connector_obj = cls._k8s_client.get_connector_custom_object(
+            plural="keycloakconnectors", name=name
         )
         if not kk_connector_obj:
             return None
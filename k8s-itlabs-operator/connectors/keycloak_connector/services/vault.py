@@ -34,3 +34,6 @@ class VaultService:
         ):
             return None
         return KeycloakApiSecretDtoFactory.api_secret_dto_from_connector(kk_connector)
+
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return self.client.get_secret_version(vault_path)
@@ -1,7 +1,9 @@
+from clients.postgres.asyncclient import AsyncPostgresClient
 from clients.postgres.postgresclient import PostgresClient
 from connectors.postgres_connector.dto import PgConnectorInstanceSecretDto
 from connectors.postgres_connector.factories.dto_factory import PgConnectorDbSecretDtoFactory
-from connectors.postgres_connector.services.postgres import AbstractPostgresService, PostgresService
+from connectors.postgres_connector.services.postgres import AbstractPostgresService, PostgresService, \
+    AbstractAsyncPostgresService, AsyncPostgresService
 
 
 class PostgresServiceFactory:
@@ -10,3 +12,9 @@ class PostgresServiceFactory:
         pg_con_secret_dto = PgConnectorDbSecretDtoFactory.dto_from_pg_instance_cred(pg_instance_cred=pg_instance_cred)
         pg_client = PostgresClient(pg_connector_secret_dto=pg_con_secret_dto)
         return PostgresService(pg_client=pg_client)
+
+    @classmethod
+    def create_async_pg_service(cls, pg_instance_cred: PgConnectorInstanceSecretDto) -> AbstractAsyncPostgresService:
+        pg_con_secret_dto = PgConnectorDbSecretDtoFactory.dto_from_pg_instance_cred(pg_instance_cred=pg_instance_cred)
+        pg_client = AsyncPostgresClient(pg_connector_secret_dto=pg_con_secret_dto)
+        return AsyncPostgresService(pg_client=pg_client)
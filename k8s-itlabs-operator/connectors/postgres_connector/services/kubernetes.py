@@ -25,11 +25,8 @@ class KubernetesService(AbstractKubernetesService):
 
     @classmethod
     def get_pg_connector(cls, name: str) -> Optional[PgConnector]:
-        pg_conn_obj = cls._k8s_client.get_cluster_custom_object(
-            group="itlabs.io",
-            version="v1",
-            plural="postgresconnectors",
-            name=name,
+        pg_conn_obj = cls._k8s_client.get_connector_custom_object(
+            plural="postgresconnectors", name=name
         )
         if not pg_conn_obj:
             return None
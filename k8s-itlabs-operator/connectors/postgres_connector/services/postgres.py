@@ -1,8 +1,11 @@
 import logging
 from abc import ABCMeta, abstractmethod
 
+from clients.postgres.asyncclient import AbstractAsyncPostgresClient
 from clients.postgres.dto import PgConnectorDbSecretDto
+from clients.postgres.exceptions import PgObjectAlreadyExistsError
 from clients.postgres.postgresclient import AbstractPostgresClient
+from observability.metrics.metrics import app_postgres_user_password_total
 
 logger = logging.getLogger('pg_connector_postgres_service')
 
@@ -32,17 +35,41 @@ class PostgresService(AbstractPostgresService):
         self.pg_client = pg_client
 
     def create_database(self, db_cred: PgConnectorDbSecretDto):
-        if self.pg_client.is_user_exist(user=db_cred.user):
-            self.pg_client.alter_user_password(user=db_cred.user, password=db_cred.password)
-            logger.warning(f"User '{db_cred.user}' already exist, password set from credentials.")
-        else:
-            self.pg_client.create_user(user=db_cred.user, password=db_cred.password)
+        with self.pg_client.session():
+            user_exist, database_exist = self.pg_client.is_user_and_database_exist(
+                user=db_cred.user, db_name=db_cred.db_name
+            )
+            if user_exist:
+                self._update_user_password(db_cred, database_exist)
+            else:
+                try:
+                    self.pg_client.create_user(user=db_cred.user, password=db_cred.password)
+                except PgObjectAlreadyExistsError:
+                    # Existence was checked with stale snapshot of catalog
+                    self._update_user_password(db_cred, database_exist)
+
+            if database_exist:
+                logger.warning(f"Database '{db_cred.db_name}' already exist.")
+            else:
+                try:
+                    self.pg_client.create_database(db_name=db_cred.db_name, user=db_cred.user)
+                except PgObjectAlreadyExistsError:
+                    logger.warning(f"Database '{db_cred.db_name}' already exist.")
+            self.pg_client.grant_user_to_admin(user=db_cred.user)
 
-        if self.pg_client.is_database_exist(db_name=db_cred.db_name):
-            logger.warning(f"Database '{db_cred.db_name}' already exist.")
+    def _update_user_password(self, db_cred: PgConnectorDbSecretDto, database_exist: bool):
+        # Rewriting of password hashes it and writes catalog, so it is
+        # done only if password from credentials doesn't work
+        if self.pg_client.is_user_password_valid(
+            user=db_cred.user, password=db_cred.password,
+            db_name=db_cred.db_name if database_exist else None,
+        ):
+            app_postgres_user_password_total.labels(host=db_cred.host, action='skipped').inc()
+            logger.info(f"User '{db_cred.user}' already exist, password is actual.")
         else:
-            self.pg_client.create_database(db_name=db_cred.db_name, user=db_cred.user)
-        self.pg_client.grant_user_to_admin(user=db_cred.user)
+            self.pg_client.alter_user_password(user=db_cred.user, password=db_cred.password)
+            app_postgres_user_password_total.labels(host=db_cred.host, action='rewritten').inc()
+            logger.warning(f"User '{db_cred.user}' already exist, password set from credentials.")
 
     def is_user_exist(self, username: str) -> bool:
         return self.pg_client.is_user_exist(username)
@@ -52,3 +79,72 @@ class PostgresService(AbstractPostgresService):
 
     def grant_access_on_select(self, grantor_name: str, grantee_name: str):
         self.pg_client.grant_access_on_select(grantor_name, grantee_name)
+
+
+class AbstractAsyncPostgresService:
+    __metaclass__ = ABCMeta
+
+    @abstractmethod
+    async def create_database(self, db_cred: PgConnectorDbSecretDto):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_user_exist(self, username: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def is_user_grantee(self, database: str, username: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def grant_access_on_select(self, grantor_name: str, grantee_name: str):
+        raise NotImplementedError
+
+
+class AsyncPostgresService(AbstractAsyncPostgresService):
+    def __init__(self, pg_client: AbstractAsyncPostgresClient):
+        self.pg_client = pg_client
+
+    async def create_database(self, db_cred: PgConnectorDbSecretDto):
+        async with self.pg_client.session():
+            user_exist, database_exist = await self.pg_client.is_user_and_database_exist(
+                user=db_cred.user, db_name=db_cred.db_name
+            )
+            if user_exist:
+                await self._update_user_password(db_cred, database_exist)
+            else:
+                try:
+                    await self.pg_client.create_user(user=db_cred.user, password=db_cred.password)
+                except PgObjectAlreadyExistsError:
+                    # Existence was checked with stale snapshot of catalog
+                    await self._update_user_password(db_cred, database_exist)
+
+            if database_exist:
+                logger.warning(f"Database '{db_cred.db_name}' already exist.")
+            else:
+                try:
+                    await self.pg_client.create_database(db_name=db_cred.db_name, user=db_cred.user)
+                except PgObjectAlreadyExistsError:
+                    logger.warning(f"Database '{db_cred.db_name}' already exist.")
+            await self.pg_client.grant_user_to_admin(user=db_cred.user)
+
+    async def _update_user_password(self, db_cred: PgConnectorDbSecretDto, database_exist: bool):
+        if await self.pg_client.is_user_password_valid(
+            user=db_cred.user, password=db_cred.password,
+            db_name=db_cred.db_name if database_exist else None,
+        ):
+            app_postgres_user_password_total.labels(host=db_cred.host, action='skipped').inc()
+            logger.info(f"User '{db_cred.user}' already exist, password is actual.")
+        else:
+            await self.pg_client.alter_user_password(user=db_cred.user, password=db_cred.password)
+            app_postgres_user_password_total.labels(host=db_cred.host, action='rewritten').inc()
+            logger.warning(f"User '{db_cred.user}' already exist, password set from credentials.")
+
+    async def is_user_exist(self, username: str) -> bool:
+        return await self.pg_client.is_user_exist(username)
+
+    async def is_user_grantee(self, database: str, username: str) -> bool:
+        return await self.pg_client.is_user_grantee(database, username)
+
+    async def grant_access_on_select(self, grantor_name: str, grantee_name: str):
+        await self.pg_client.grant_access_on_select(grantor_name, grantee_name)
@@ -1,6 +1,9 @@
+import asyncio
 import dataclasses
 
+from functools import partial
 from itertools import chain
+from typing import Callable, NamedTuple, Optional
 
 from clients.postgres.dto import PgConnectorDbSecretDto
 from connectors.postgres_connector import specifications
@@ -12,16 +15,46 @@ from connectors.postgres_connector.exceptions import PgConnectorCrdDoesNotExist,
 from connectors.postgres_connector.factories.dto_factory import PgConnectorDbSecretDtoFactory
 from connectors.postgres_connector.factories.service_factories.postgres import PostgresServiceFactory
 from connectors.postgres_connector.services.kubernetes import KubernetesService
+from connectors.postgres_connector.services.postgres import AbstractPostgresService, AbstractAsyncPostgresService
 from connectors.postgres_connector.services.vault import AbstractVaultService
+from provisioning.memo import MicroserviceSource, provisioning_memo
 from utils.concurrency import ConnectorSourceLock
+from utils.singleflight import SingleFlight
 from utils.hashing import generate_hash
 
 
+class PgProvisioning(NamedTuple):
+    pg_instance_cred: PgConnectorInstanceSecretDto
+    source_hash: str
+    # Memo key of microservice and reader of its Vault secret version
+    fingerprint: str
+    get_secret_version: Callable
+    source: MicroserviceSource
+
+
 class PostgresConnectorService:
+    _flight = SingleFlight('postgres_connector')
+
     def __init__(self, vault_service: AbstractVaultService):
         self.vault_service = vault_service
 
     def on_create_deployment(self, ms_pg_con: PgConnectorMicroserviceDto):
+        provisioning = self._prepare(ms_pg_con)
+        if provisioning is None:
+            return
+
+        pg_service = PostgresServiceFactory.create_pg_service(provisioning.pg_instance_cred)
+        # Concurrent admissions of the same microservice share provisioning
+        self._flight.do(
+            generate_hash(provisioning.source_hash, repr(ms_pg_con)),
+            lambda: self._provision(provisioning.source_hash, provisioning.pg_instance_cred, ms_pg_con, pg_service),
+        )
+        provisioning_memo.mark_provisioned('postgres_connector', provisioning.fingerprint,
+                                           provisioning.get_secret_version, provisioning.source)
+
+    def _prepare(self, ms_pg_con: PgConnectorMicroserviceDto) -> Optional[PgProvisioning]:
+        """Returns None if microservice is already provisioned."""
+        source = provisioning_memo.source('postgres_connector', ms_pg_con)
         pg_connector = KubernetesService.get_pg_connector(ms_pg_con.pg_instance_name)
         if not pg_connector:
             raise PgConnectorCrdDoesNotExist(
@@ -29,52 +62,103 @@ class PostgresConnectorService:
                 " does not exist"
             )
 
+        fingerprint = provisioning_memo.fingerprint(pg_connector, ms_pg_con)
+        get_secret_version = partial(self.vault_service.get_secret_version, ms_pg_con.vault_path)
+        if provisioning_memo.is_provisioned('postgres_connector', fingerprint, get_secret_version, source):
+            return None
+
         pg_instance_cred = self.vault_service.unvault_pg_connector(pg_connector)
         if not pg_instance_cred:
             raise UnknownVaultPathInPgConnector(
                 "Couldn't getting root credentials for connecting to Postgres"
             )
 
-        pg_service = PostgresServiceFactory.create_pg_service(pg_instance_cred)
         source_hash = self.generate_source_hash(
             host=pg_instance_cred.host,
             port=pg_instance_cred.port,
             database=ms_pg_con.db_name,
             username=ms_pg_con.db_username,
         )
-        with ConnectorSourceLock(source_hash):
+        return PgProvisioning(pg_instance_cred, source_hash, fingerprint, get_secret_version, source)
+
+    def _provision(self, source_hash: str, pg_instance_cred: PgConnectorInstanceSecretDto,
+                   ms_pg_con: PgConnectorMicroserviceDto, pg_service: AbstractPostgresService):
+        with ConnectorSourceLock(source_hash, connector_type='postgres_connector'):
             db_creds = self.get_or_create_db_credentials(pg_instance_cred, ms_pg_con)
             pg_service.create_database(db_creds)
 
-            if ms_pg_con.grant_access_for_readonly_user:
-                if not pg_instance_cred.readonly_username:
-                    raise PgConnectorReadonlyUsernameIsNotSet(
-                        f"`readonly` username is not set in Custom Resource "
-                        f"{ms_pg_con.pg_instance_name}"
-                    )
-
-                if not pg_service.is_user_exist(pg_instance_cred.readonly_username):
-                    raise PgConnectorReadonlyUsernameDoesNotExist(
-                        f"{pg_instance_cred.readonly_username} does not exist "
-                        f"in {ms_pg_con.pg_instance_name}"
-                    )
-
-                # Switch connection to application database for grant access
-                pg_access_cred = dataclasses.replace(
-                    pg_instance_cred, db_name=db_creds.db_name
-                )
-                pg_access_service = PostgresServiceFactory.create_pg_service(
-                    pg_access_cred
+            if not ms_pg_con.grant_access_for_readonly_user:
+                return
+            readonly_username = self._readonly_username(pg_instance_cred, ms_pg_con)
+            if not pg_service.is_user_exist(readonly_username):
+                raise PgConnectorReadonlyUsernameDoesNotExist(
+                    f"{readonly_username} does not exist in {ms_pg_con.pg_instance_name}"
                 )
 
-                if pg_access_service.is_user_grantee(
-                        db_creds.db_name, pg_instance_cred.readonly_username
-                ):
-                    return
+            # Switch connection to application database for grant access
+            pg_access_cred = dataclasses.replace(pg_instance_cred, db_name=db_creds.db_name)
+            pg_access_service = PostgresServiceFactory.create_pg_service(pg_access_cred)
+            if pg_access_service.is_user_grantee(db_creds.db_name, readonly_username):
+                return
+            pg_access_service.grant_access_on_select(db_creds.user, readonly_username)
+
+    async def on_create_deployment_async(self, ms_pg_con: PgConnectorMicroserviceDto):
+        """
+        Same as `on_create_deployment`, but Postgres is provisioned by asyncio
+        client, so many databases are provisioned at once on one event loop.
+        Kubernetes, Vault and source lock are blocking, they are run in threads.
+
+        Calls are not coalesced by single flight, as it blocks waiting thread
+        for the whole provisioning. This path is run by provisioning queue,
+        which keeps only one job of microservice, and provisioning of the same
+        source on admission is serialized by source lock, so the next one
+        only checks catalog.
+        """
+        provisioning = await asyncio.to_thread(self._prepare, ms_pg_con)
+        if provisioning is None:
+            return
+
+        pg_service = PostgresServiceFactory.create_async_pg_service(provisioning.pg_instance_cred)
+        lock = ConnectorSourceLock(provisioning.source_hash, connector_type='postgres_connector')
+        await asyncio.to_thread(lock.acquire)
+        try:
+            await self._provision_async(provisioning.pg_instance_cred, ms_pg_con, pg_service)
+        finally:
+            await asyncio.to_thread(lock.release)
+        await asyncio.to_thread(
+            provisioning_memo.mark_provisioned, 'postgres_connector', provisioning.fingerprint,
+            provisioning.get_secret_version, provisioning.source
+        )
 
-                pg_access_service.grant_access_on_select(
-                    db_creds.user, pg_instance_cred.readonly_username
-                )
+    async def _provision_async(self, pg_instance_cred: PgConnectorInstanceSecretDto,
+                               ms_pg_con: PgConnectorMicroserviceDto, pg_service: AbstractAsyncPostgresService):
+        db_creds = await asyncio.to_thread(self.get_or_create_db_credentials, pg_instance_cred, ms_pg_con)
+        await pg_service.create_database(db_creds)
+
+        if not ms_pg_con.grant_access_for_readonly_user:
+            return
+        readonly_username = self._readonly_username(pg_instance_cred, ms_pg_con)
+        if not await pg_service.is_user_exist(readonly_username):
+            raise PgConnectorReadonlyUsernameDoesNotExist(
+                f"{readonly_username} does not exist in {ms_pg_con.pg_instance_name}"
+            )
+
+        # Switch connection to application database for grant access
+        pg_access_cred = dataclasses.replace(pg_instance_cred, db_name=db_creds.db_name)
+        pg_access_service = PostgresServiceFactory.create_async_pg_service(pg_access_cred)
+        if await pg_access_service.is_user_grantee(db_creds.db_name, readonly_username):
+            return
+        await pg_access_service.grant_access_on_select(db_creds.user, readonly_username)
+
+    @staticmethod
+    def _readonly_username(pg_instance_cred: PgConnectorInstanceSecretDto,
+                           ms_pg_con: PgConnectorMicroserviceDto) -> str:
+        if not pg_instance_cred.readonly_username:
+            raise PgConnectorReadonlyUsernameIsNotSet(
+                f"`readonly` username is not set in Custom Resource "
+                f"{ms_pg_con.pg_instance_name}"
+            )
+        return pg_instance_cred.readonly_username
 
     @staticmethod
     def generate_source_hash(
@@ -1,11 +1,11 @@
 import dataclasses
 
-from typing import List
+from typing import List, Optional
 
 from clients.vault.exceptions import IncorrectPath
 from clients.vault.factories.vault_path import VaultPathFactory
 from clients.vault.vaultclient import AbstractVaultClient
-from connectors.postgres_connector.dto import PgConnectorMicroserviceDto
+from connectors.postgres_connector.dto import PgConnectorMicroserviceDto, PgConnector
 from connectors.postgres_connector.exceptions import PostgresConnectorInfrastructureError, \
     PostgresConnectorApplicationError
 from connectors.postgres_connector.factories.service_factories.postgres import \
@@ -32,11 +32,12 @@ class PostgresConnectorValidationService(ConnectorValidationService):
     def validate(self, postgres_connector_dto: PgConnectorMicroserviceDto) -> List[ConnectorError]:
         self.errors = []
 
-        self._check_instance(postgres_connector_dto.pg_instance_name)
+        instance_connector = self._check_instance(postgres_connector_dto.pg_instance_name)
         self._check_vault_secret(postgres_connector_dto.vault_path)
 
         if not self.errors:
             self._check_readonly_user(
+                instance_connector,
                 postgres_connector_dto.pg_instance_name,
                 postgres_connector_dto.db_name,
                 postgres_connector_dto.grant_access_for_readonly_user,
@@ -44,12 +45,13 @@ class PostgresConnectorValidationService(ConnectorValidationService):
 
         return self.errors
 
-    def _check_instance(self, instance_name: str):
+    def _check_instance(self, instance_name: str) -> Optional[PgConnector]:
         instance_connector = self._kube_service.get_pg_connector(instance_name)
         if not instance_connector:
             self.errors.append(PostgresConnectorInfrastructureError(
                 f"Postgres Custom Resource `{instance_name}` does not exist"
             ))
+        return instance_connector
 
     def _check_vault_secret(self, secret_path: str):
         try:
@@ -81,11 +83,11 @@ class PostgresConnectorValidationService(ConnectorValidationService):
                 f"{', '.join(unset_keys)} for Postgres"
             ))
 
-    def _check_readonly_user(self, instance_name: str, database: str, is_grant_access: bool):
+    def _check_readonly_user(self, instance_connector: PgConnector, instance_name: str,
+                             database: str, is_grant_access: bool):
         if not is_grant_access:
             return
 
-        instance_connector = self._kube_service.get_pg_connector(instance_name)
         if not instance_connector.readonly_username:
             self.errors.append(PostgresConnectorInfrastructureError(
                 f"Username for readonly access to the database is not set in "
@@ -27,6 +27,10 @@ class AbstractVaultService:
     def unvault_pg_connector(self, pg_connector: PgConnector) -> Optional[PgConnectorInstanceSecretDto]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        raise NotImplementedError
+
 
 class VaultService(AbstractVaultService):
 
@@ -55,3 +59,6 @@ class VaultService(AbstractVaultService):
         ):
             return None
         return PgConnectorInstanceSecretDtoFactory.api_secret_dto_from_connector(pg_connector)
+
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return self.vault_client.get_secret_version(vault_path)
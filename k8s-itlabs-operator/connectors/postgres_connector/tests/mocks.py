@@ -31,6 +31,9 @@ class MockedVaultService(AbstractVaultService):
     def unvault_pg_connector(self, pg_connector: PgConnector) -> Optional[PgConnectorInstanceSecretDto]:
         return self.pg_instance_cred
 
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return None
+
 
 class MockedPostgresService(AbstractPostgresService):
     def __init__(self):
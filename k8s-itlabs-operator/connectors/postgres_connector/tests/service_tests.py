@@ -1,3 +1,5 @@
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
 from clients.postgres.dto import PgConnectorDbSecretDto
@@ -10,7 +12,7 @@ from connectors.postgres_connector.exceptions import PgConnectorCrdDoesNotExist,
     UnknownVaultPathInPgConnector, PostgresConnectorInfrastructureError
 from connectors.postgres_connector.factories.dto_factory import \
     PgConnectorDbSecretDtoFactory, PgConnectorMicroserviceDtoFactory
-from connectors.postgres_connector.services.postgres import PostgresService
+from connectors.postgres_connector.services.postgres import PostgresService, AsyncPostgresService
 from connectors.postgres_connector.services.postgres_connector import PostgresConnectorService
 from connectors.postgres_connector.services.validation import \
     PostgresConnectorValidationService, PostgresConnectorApplicationError
@@ -20,6 +22,8 @@ from connectors.postgres_connector.tests.factories import PgConnectorInstanceSec
 from connectors.postgres_connector.tests.mocks import MockedVaultService, \
     KubernetesServiceMocker, \
     PostgresServiceFactoryMocker, MockedPostgresService, MockKubernetesService
+from provisioning.memo import ProvisioningMemo
+from utils.singleflight import SingleFlight
 
 
 @pytest.mark.unit
@@ -87,6 +91,14 @@ class TestPostgresConnectorService:
         with pytest.raises(UnknownVaultPathInPgConnector):
             pg_con_service.on_create_deployment(ms_pg_con=ms_pg_con)
 
+    @pytest.mark.asyncio
+    async def test_on_create_deployment_async_no_crds(self, mocker):
+        KubernetesServiceMocker.mock_get_pg_connector(mocker)
+        pg_con_service = PostgresConnectorService(vault_service=MockedVaultService())
+        ms_pg_con: PgConnectorMicroserviceDto = PgConnectorMicroserviceDtoTestFactory()
+        with pytest.raises(PgConnectorCrdDoesNotExist):
+            await pg_con_service.on_create_deployment_async(ms_pg_con=ms_pg_con)
+
     def test_on_create_deployment(self, mocker):
         pg_instance_cred: PgConnectorInstanceSecretDto = PgConnectorInstanceSecretDtoTestFactory()
         ms_pg_con: PgConnectorMicroserviceDto = PgConnectorMicroserviceDtoTestFactory(
@@ -118,6 +130,40 @@ class TestPostgresConnectorService:
         assert mocked_vault_service.create_pg_ms_credentials_call_count == 0
         assert mocked_pg_service.create_database_call_count == 1
 
+    def test_rotated_secret_is_provisioned_again(self, mocker):
+        pg_instance_cred: PgConnectorInstanceSecretDto = PgConnectorInstanceSecretDtoTestFactory()
+        ms_pg_con: PgConnectorMicroserviceDto = PgConnectorMicroserviceDtoTestFactory(
+            db_name=pg_instance_cred.db_name,
+            db_username=pg_instance_cred.user
+        )
+        pg_connector = PgConnector(
+            host=pg_instance_cred.host,
+            port=pg_instance_cred.port,
+            database=ms_pg_con.db_name,
+            username=ms_pg_con.vault_path,
+            password=ms_pg_con.vault_path,
+        )
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        mocker.patch('connectors.postgres_connector.services.postgres_connector.provisioning_memo', memo)
+        # Result of the previous provisioning is not shared
+        mocker.patch.object(PostgresConnectorService, '_flight', SingleFlight('postgres_connector', share_window=0))
+        KubernetesServiceMocker.mock_get_pg_connector(mocker, pg_connector)
+        mocked_pg_service = MockedPostgresService()
+        PostgresServiceFactoryMocker.mock_create_pg_service(mocker, mocked_pg_service)
+        mocked_vault_service = MockedVaultService(pg_instance_cred=pg_instance_cred)
+        mocked_vault_service.get_secret_version = MagicMock(return_value=1)
+        pg_con_service = PostgresConnectorService(vault_service=mocked_vault_service)
+
+        pg_con_service.on_create_deployment(ms_pg_con=ms_pg_con)
+        assert memo.is_ready('postgres_connector', ms_pg_con)
+        pg_con_service.on_create_deployment(ms_pg_con=ms_pg_con)
+        assert mocked_pg_service.create_database_call_count == 1
+
+        mocked_vault_service.get_secret_version.return_value = 2
+        assert not memo.is_ready('postgres_connector', ms_pg_con)
+        pg_con_service.on_create_deployment(ms_pg_con=ms_pg_con)
+        assert mocked_pg_service.create_database_call_count == 2
+
     def test_mutate_containers_variables_already_in_container(self):
         ms_pg_con: PgConnectorMicroserviceDto = PgConnectorMicroserviceDtoTestFactory()
         mocked_vault_service = MockedVaultService()
@@ -186,6 +232,15 @@ class TestPostgresService:
         assert pg_service.pg_client.user_alter_password_call_count == 1
         assert pg_service.pg_client.grant_user_to_admin_call_count == 1
 
+    def test_create_database_user_exists_with_actual_password(self):
+        pg_client = MockedPostgresClient(db_exist=True, user_exist=True, password_valid=True)
+        pg_service = PostgresService(pg_client=pg_client)
+        db_cred = PgConnectorDbSecretDtoTestFactory()
+        pg_service.create_database(db_cred=db_cred)
+        assert pg_service.pg_client.user_create_call_count == 0
+        assert pg_service.pg_client.user_alter_password_call_count == 0
+        assert pg_service.pg_client.grant_user_to_admin_call_count == 1
+
     def test_create_database_no_db_exists_no_user_exists(self):
         pg_client = MockedPostgresClient(db_exist=False, user_exist=False)
         pg_service = PostgresService(pg_client=pg_client)
@@ -196,6 +251,33 @@ class TestPostgresService:
         assert pg_service.pg_client.user_alter_password_call_count == 0
         assert pg_service.pg_client.grant_user_to_admin_call_count == 1
 
+    def test_create_database_created_concurrently(self):
+        pg_client = MockedPostgresClient(db_exist=False, user_exist=False, created_concurrently=True)
+        pg_service = PostgresService(pg_client=pg_client)
+        db_cred = PgConnectorDbSecretDtoTestFactory()
+        pg_service.create_database(db_cred=db_cred)
+        assert pg_service.pg_client.db_create_call_count == 1
+        assert pg_service.pg_client.user_create_call_count == 1
+        # Password of user created by another replica may differ
+        assert pg_service.pg_client.user_alter_password_call_count == 1
+        assert pg_service.pg_client.grant_user_to_admin_call_count == 1
+
+
+@pytest.mark.unit
+class TestAsyncPostgresService:
+    @pytest.mark.asyncio
+    async def test_create_database_no_db_exists_no_user_exists(self):
+        pg_client = AsyncMock()
+        pg_client.session = MagicMock()
+        pg_client.is_user_and_database_exist.return_value = (False, False)
+        pg_service = AsyncPostgresService(pg_client=pg_client)
+        db_cred = PgConnectorDbSecretDtoTestFactory()
+        await pg_service.create_database(db_cred=db_cred)
+        pg_client.create_user.assert_awaited_once_with(user=db_cred.user, password=db_cred.password)
+        pg_client.create_database.assert_awaited_once_with(db_name=db_cred.db_name, user=db_cred.user)
+        pg_client.alter_user_password.assert_not_called()
+        pg_client.grant_user_to_admin.assert_awaited_once_with(user=db_cred.user)
+
 
 @pytest.mark.unit
 class TestVaultService:
@@ -1,12 +1,19 @@
+from functools import lru_cache
+
 from clients.rabbit.rabbitclient import RabbitClient
 from connectors.rabbit_connector.dto import RabbitApiSecretDto
 from connectors.rabbit_connector.services.rabbit import AbstractRabbitService, RabbitService
 
 
 class RabbitServiceFactory:
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _get_rabbit_client(url: str, user: str, password: str) -> RabbitClient:
+        return RabbitClient(url=url, user=user, password=password)
+
     @classmethod
     def create_rabbit_service(cls, rabbit_api_cred: RabbitApiSecretDto) -> AbstractRabbitService:
-        rabbit_client = RabbitClient(
+        rabbit_client = cls._get_rabbit_client(
             url=rabbit_api_cred.api_url,
             user=rabbit_api_cred.api_user,
             password=rabbit_api_cred.api_password
@@ -22,11 +22,8 @@ class KubernetesService(AbstractKubernetesService):
 
     @classmethod
     def get_rabbit_connector(cls, name: str) -> Optional[RabbitConnector]:
-        rabbit_conn_obj = cls._k8s_client.get_cluster_custom_object(
-            group='itlabs.io',
-            version='v1',
-            plural='rabbitconnectors',
-            name=name,
+        rabbit_conn_obj = cls._k8s_client.get_connector_custom_object(
+            plural="rabbitconnectors", name=name
         )
         if not rabbit_conn_obj:
             return None
@@ -1,3 +1,4 @@
+from functools import partial
 from itertools import chain
 
 from connectors.rabbit_connector import specifications
@@ -7,16 +8,22 @@ from connectors.rabbit_connector.exceptions import RabbitConnectorCrdDoesNotExis
 from connectors.rabbit_connector.factories.dto_factory import RabbitMsSecretDtoFactory
 from connectors.rabbit_connector.factories.service_factories.rabbit import RabbitServiceFactory
 from connectors.rabbit_connector.services.kubernetes import KubernetesService
+from connectors.rabbit_connector.services.rabbit import AbstractRabbitService
 from connectors.rabbit_connector.services.vault import AbstractVaultService
+from provisioning.memo import provisioning_memo
 from utils.concurrency import ConnectorSourceLock
+from utils.singleflight import SingleFlight
 from utils.hashing import generate_hash
 
 
 class RabbitConnectorService:
+    _flight = SingleFlight('rabbit_connector')
+
     def __init__(self, vault_service: AbstractVaultService):
         self.vault_service = vault_service
 
     def on_create_deployment(self, ms_rabbit_con: RabbitConnectorMicroserviceDto):
+        source = provisioning_memo.source('rabbit_connector', ms_rabbit_con)
         rabbit_connector = KubernetesService.get_rabbit_connector(ms_rabbit_con.rabbit_instance_name)
         if not rabbit_connector:
             raise RabbitConnectorCrdDoesNotExist(
@@ -24,6 +31,11 @@ class RabbitConnectorService:
                 " does not exist"
             )
 
+        fingerprint = provisioning_memo.fingerprint(rabbit_connector, ms_rabbit_con)
+        get_secret_version = partial(self.vault_service.get_secret_version, ms_rabbit_con.vault_path)
+        if provisioning_memo.is_provisioned('rabbit_connector', fingerprint, get_secret_version, source):
+            return
+
         rabbit_instance_cred = self.vault_service.unvault_rabbit_connector(rabbit_connector)
         if not rabbit_instance_cred:
             raise UnknownVaultPathInRabbitConnector(
@@ -38,7 +50,16 @@ class RabbitConnectorService:
             username=ms_rabbit_con.username,
             vhost=ms_rabbit_con.vhost,
         )
-        with ConnectorSourceLock(source_hash):
+        # Concurrent admissions of the same microservice share provisioning
+        self._flight.do(
+            generate_hash(source_hash, repr(ms_rabbit_con)),
+            lambda: self._provision(source_hash, rabbit_instance_cred, ms_rabbit_con, rabbit_service),
+        )
+        provisioning_memo.mark_provisioned('rabbit_connector', fingerprint, get_secret_version, source)
+
+    def _provision(self, source_hash: str, rabbit_instance_cred: RabbitApiSecretDto,
+                   ms_rabbit_con: RabbitConnectorMicroserviceDto, rabbit_service: AbstractRabbitService):
+        with ConnectorSourceLock(source_hash, connector_type='rabbit_connector'):
             rabbit_ms_creds = self.get_or_create_rabbit_credentials(rabbit_instance_cred, ms_rabbit_con)
             rabbit_service.configure_rabbit(rabbit_ms_creds)
 
@@ -46,6 +46,9 @@ class MockedVaultService(AbstractVaultService):
     def unvault_rabbit_connector(self, rabbit_connector: RabbitConnector) -> Optional[RabbitApiSecretDto]:
         return self.rabbit_api_cred
 
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return None
+
 
 class KubernetesServiceMocker:
     @staticmethod
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 from clients.sentry.sentryclient import SentryClient
 from connectors.sentry_connector.dto import SentryApiSecretDto
 from connectors.sentry_connector.services.sentry import AbstractSentryService, SentryService
@@ -5,8 +7,13 @@ from connectors.sentry_connector.services.sentry import AbstractSentryService, S
 
 class SentryServiceFactory:
     @staticmethod
-    def create_sentry_service(sentry_api_cred: SentryApiSecretDto) -> AbstractSentryService:
-        sentry_client = SentryClient(
+    @lru_cache(maxsize=32)
+    def _get_sentry_client(url: str, token: str, organization: str) -> SentryClient:
+        return SentryClient(url=url, token=token, organization=organization)
+
+    @classmethod
+    def create_sentry_service(cls, sentry_api_cred: SentryApiSecretDto) -> AbstractSentryService:
+        sentry_client = cls._get_sentry_client(
             url=sentry_api_cred.api_url,
             token=sentry_api_cred.api_token,
             organization=sentry_api_cred.api_organization
@@ -30,8 +30,8 @@ class KubernetesService(AbstractKubernetesService):
 
     @classmethod
     def get_sentry_connector(cls, name: str) -> Optional[SentryConnector]:
-        sentry_connector_obj = cls._k8s_client.get_cluster_custom_object(
-            group="itlabs.io", version="v1", plural="sentryconnectors", name=name
+        sentry_connector_obj = cls._k8s_client.get_connector_custom_object(
+            plural="sentryconnectors", name=name
         )
         if not sentry_connector_obj:
             return None
@@ -1,4 +1,5 @@
 import logging
+from functools import partial
 from itertools import chain
 
 from connectors.sentry_connector import specifications
@@ -6,12 +7,17 @@ from connectors.sentry_connector.dto import SentryConnectorMicroserviceDto
 from connectors.sentry_connector.exceptions import SentryConnectorCrdDoesNotExist, NonExistSecretForSentryConnector
 from connectors.sentry_connector.factories.service_factories.sentry import SentryServiceFactory
 from connectors.sentry_connector.services.kubernetes import KubernetesService
+from connectors.sentry_connector.services.sentry import AbstractSentryService
 from connectors.sentry_connector.services.vault import AbstractVaultService
+from provisioning.memo import provisioning_memo
 from utils.concurrency import ConnectorSourceLock
+from utils.singleflight import SingleFlight
 from utils.hashing import generate_hash
 
 
 class SentryConnectorService:
+    _flight = SingleFlight('sentry_connector')
+
     def __init__(self, vault_service: AbstractVaultService):
         self.vault_service = vault_service
 
@@ -43,6 +49,7 @@ class SentryConnectorService:
         return False
 
     def on_create_deployment(self, ms_sentry_conn: SentryConnectorMicroserviceDto):
+        source = provisioning_memo.source('sentry_connector', ms_sentry_conn)
         sentry_connector = KubernetesService.get_sentry_connector(ms_sentry_conn.sentry_instance_name)
         if not sentry_connector:
             raise SentryConnectorCrdDoesNotExist(
@@ -50,6 +57,11 @@ class SentryConnectorService:
                 " does not exist"
             )
 
+        fingerprint = provisioning_memo.fingerprint(sentry_connector, ms_sentry_conn)
+        get_secret_version = partial(self.vault_service.get_secret_version, ms_sentry_conn.vault_path)
+        if provisioning_memo.is_provisioned('sentry_connector', fingerprint, get_secret_version, source):
+            return
+
         sentry_api_cred = self.vault_service.unvault_sentry_connector(sentry_connector)
         if not sentry_api_cred:
             raise NonExistSecretForSentryConnector(
@@ -57,8 +69,6 @@ class SentryConnectorService:
             )
 
         sentry_service = SentryServiceFactory.create_sentry_service(sentry_api_cred)
-        sentry_ms_cred = self.vault_service.get_sentry_ms_credentials(ms_sentry_conn.vault_path)
-
         source_hash = self.generate_source_hash(
             url=sentry_api_cred.api_url,
             organization=sentry_api_cred.api_organization,
@@ -66,7 +76,17 @@ class SentryConnectorService:
             project=ms_sentry_conn.project,
             env=ms_sentry_conn.environment,
         )
-        with ConnectorSourceLock(source_hash):
+        # Concurrent admissions of the same microservice share provisioning
+        self._flight.do(
+            generate_hash(source_hash, repr(ms_sentry_conn)),
+            lambda: self._provision(source_hash, ms_sentry_conn, sentry_service),
+        )
+        provisioning_memo.mark_provisioned('sentry_connector', fingerprint, get_secret_version, source)
+
+    def _provision(self, source_hash: str, ms_sentry_conn: SentryConnectorMicroserviceDto,
+                   sentry_service: AbstractSentryService):
+        sentry_ms_cred = self.vault_service.get_sentry_ms_credentials(ms_sentry_conn.vault_path)
+        with ConnectorSourceLock(source_hash, connector_type='sentry_connector'):
             if sentry_ms_cred and \
                     sentry_service.is_sentry_dsn_exist(
                         project_slug=sentry_ms_cred.project_slug,
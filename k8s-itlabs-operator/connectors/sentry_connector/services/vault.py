@@ -25,6 +25,10 @@ class AbstractVaultService:
     def unvault_sentry_connector(self, sentry_connector: SentryConnector) -> Optional[SentryApiSecretDto]:
         raise NotImplementedError
 
+    @abstractmethod
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        raise NotImplementedError
+
 
 class VaultService(AbstractVaultService):
     def __init__(self, vault_client: AbstractVaultClient):
@@ -51,3 +55,6 @@ class VaultService(AbstractVaultService):
         ):
             return None
         return SentryApiSecretDtoFactory.api_secret_dto_from_connector(sentry_connector)
+
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return self.vault_client.get_secret_version(vault_path)
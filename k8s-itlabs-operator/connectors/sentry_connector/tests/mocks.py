@@ -39,6 +39,9 @@ class MockedVaultService(AbstractVaultService):
     def unvault_sentry_connector(self, sentry_connector: SentryConnector) -> Optional[SentryApiSecretDto]:
         pass
 
+    def get_secret_version(self, vault_path: str) -> Optional[int]:
+        return None
+
 
 class MockKubernetesService(AbstractKubernetesService):
     @classmethod
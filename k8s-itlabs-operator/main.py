@@ -11,8 +11,8 @@ import settings as operator_settings
 from observability.metrics.metrics import app_up
 from observability.metrics.request_wrapper import wrap_request
 
-from operators import atlasconnector, postgresconnector, rabbitconnector, \
-    monitoringconnector, sentry, keycloak, healthz  # pylint: disable=unused-import
+from operators import atlasconnector, postgresconnector, rabbitconnector, monitoringconnector, sentry, keycloak, \
+    healthz, connectorstore, provisioningledger, provisioningqueue, podconnectors, workloads  # pylint: disable=unused-import
 
 if operator_settings.SENTRY_DSN:
     sentry_sdk.init(
@@ -1,4 +1,4 @@
-from prometheus_client import Histogram, Gauge
+from prometheus_client import Counter, Histogram, Gauge
 from prometheus_client.utils import INF
 
 app_http_request_operator_latency_seconds = Histogram(
@@ -44,3 +44,135 @@ app_mutation_admission_hook_latency_seconds = Histogram(
     labelnames=('connector_type', 'used', 'success', 'owner'),
     buckets=(.005, .01, .025, .05, .075, .1, .25, .5, .75, 1.0, 2.5, 5.0, 7.5, 10.0, INF)
 )
+
+app_vault_auth_total = Counter(
+    name='app_vault_auth_total',
+    documentation='Данная метрика содержит количество операций аутентификации оператора в Vault. '
+                  'Метка operation ДОЛЖНА содержать тип операции (login, renew), '
+                  'метка status ДОЛЖНА содержать результат выполнения операции (success, failure).',
+    labelnames=('operation', 'status')
+)
+
+app_cache_events_total = Counter(
+    name='app_cache_events_total',
+    documentation='Данная метрика содержит количество обращений к внутренним кэшам оператора. '
+                  'Метка cache ДОЛЖНА содержать название кэша, '
+                  'метка event ДОЛЖНА содержать тип события (hit, miss, expired, eviction).',
+    labelnames=('cache', 'event')
+)
+
+app_postgres_pool_wait_seconds = Histogram(
+    name='app_postgres_pool_wait_seconds',
+    documentation='Данная метрика содержит время ожидания свободного соединения из пула соединений с Postgres, '
+                  'разделенное на интервалы [0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, +Inf]. '
+                  'Метка host ДОЛЖНА содержать адрес сервера Postgres, '
+                  'метка database ДОЛЖНА содержать название базы данных, '
+                  'метка user ДОЛЖНА содержать имя пользователя соединений.',
+    labelnames=('host', 'database', 'user'),
+    buckets=(.001, .005, .01, .05, .1, .5, 1.0, 5.0, 10.0, 30.0, INF)
+)
+
+app_postgres_pool_connections = Gauge(
+    name='app_postgres_pool_connections',
+    documentation='Данная метрика содержит количество открытых соединений в пуле соединений с Postgres. '
+                  'Метка host ДОЛЖНА содержать адрес сервера Postgres, '
+                  'метка database ДОЛЖНА содержать название базы данных, '
+                  'метка user ДОЛЖНА содержать имя пользователя соединений, '
+                  'метка state ДОЛЖНА содержать состояние соединения (idle, used).',
+    labelnames=('host', 'database', 'user', 'state')
+)
+
+app_postgres_user_password_total = Counter(
+    name='app_postgres_user_password_total',
+    documentation='Данная метрика содержит количество проверок пароля существующего пользователя Postgres. '
+                  'Метка host ДОЛЖНА содержать адрес сервера Postgres, '
+                  'метка action ДОЛЖНА содержать результат проверки: skipped - пароль актуален и не изменялся, '
+                  'rewritten - пароль перезаписан.',
+    labelnames=('host', 'action')
+)
+
+app_http_client_requests_total = Counter(
+    name='app_http_client_requests_total',
+    documentation='Данная метрика содержит количество исходящих HTTP запросов к инфраструктурным сервисам. '
+                  'Метка client ДОЛЖНА содержать название клиента (rabbit, sentry, keycloak, atlas). '
+                  'Доля переиспользованных соединений вычисляется как '
+                  '1 - app_http_client_connections_total / app_http_client_requests_total.',
+    labelnames=('client',)
+)
+
+app_http_client_connections_total = Counter(
+    name='app_http_client_connections_total',
+    documentation='Данная метрика содержит количество открытых HTTP соединений с инфраструктурными сервисами. '
+                  'Метка client ДОЛЖНА содержать название клиента (rabbit, sentry, keycloak, atlas).',
+    labelnames=('client',)
+)
+
+app_connector_source_lock_wait_seconds = Histogram(
+    name='app_connector_source_lock_wait_seconds',
+    documentation='Данная метрика содержит время ожидания блокировки источника коннектора, разделенное на интервалы '
+                  '[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, +Inf]. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak).',
+    labelnames=('connector_type',),
+    buckets=(.001, .005, .01, .05, .1, .5, 1.0, 5.0, 10.0, 30.0, INF)
+)
+
+app_connector_source_lock_hold_seconds = Histogram(
+    name='app_connector_source_lock_hold_seconds',
+    documentation='Данная метрика содержит время удержания блокировки источника коннектора, разделенное на интервалы '
+                  '[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, +Inf]. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak).',
+    labelnames=('connector_type',),
+    buckets=(.001, .005, .01, .05, .1, .5, 1.0, 5.0, 10.0, 30.0, INF)
+)
+
+app_lease_lost_total = Counter(
+    name='app_lease_lost_total',
+    documentation='Данная метрика содержит количество блокировок Lease, перехваченных другой репликой оператора '
+                  'во время удержания. Ненулевое значение означает, что работа под блокировкой могла выполняться '
+                  'несколькими репликами одновременно.',
+)
+
+app_single_flight_calls_total = Counter(
+    name='app_single_flight_calls_total',
+    documentation='Данная метрика содержит количество вызовов, объединенных по ключу источника коннектора. '
+                  'Метка name ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak), '
+                  'метка role ДОЛЖНА содержать роль вызова: leader - вызов выполнил работу, '
+                  'shared - вызов получил результат другого вызова.',
+    labelnames=('name', 'role')
+)
+
+app_admission_deferred_total = Counter(
+    name='app_admission_deferred_total',
+    documentation='Данная метрика содержит количество подключений коннекторов, подготовка инфраструктуры которых '
+                  'не завершилась до истечения времени допуска пода и продолжена в фоне. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak).',
+    labelnames=('connector_type',)
+)
+
+app_provisioning_jobs_total = Counter(
+    name='app_provisioning_jobs_total',
+    documentation='Данная метрика содержит количество попыток фоновой подготовки инфраструктуры коннекторов. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak), '
+                  'метка result ДОЛЖНА содержать результат попытки: succeeded - успешно, '
+                  'retried - ошибка, попытка будет повторена, failed - ошибка, попытки исчерпаны, '
+                  'deduplicated - задача отброшена, так как задача того же источника уже в очереди.',
+    labelnames=('connector_type', 'result')
+)
+
+app_provisioning_queue_depth = Gauge(
+    name='app_provisioning_queue_depth',
+    documentation='Данная метрика содержит количество задач фоновой подготовки инфраструктуры коннекторов, '
+                  'ожидающих выполнения или выполняемых. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak).',
+    labelnames=('connector_type',)
+)
+
+app_provisioning_job_age_seconds = Histogram(
+    name='app_provisioning_job_age_seconds',
+    documentation='Данная метрика содержит время от постановки задачи фоновой подготовки инфраструктуры в очередь '
+                  'до начала попытки ее выполнения, разделенное на интервалы '
+                  '[0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, +Inf]. '
+                  'Метка connector_type ДОЛЖНА содержать тип коннектора (postgres, rabbit, sentry, keycloak).',
+    labelnames=('connector_type',),
+    buckets=(.1, .5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, INF)
+)
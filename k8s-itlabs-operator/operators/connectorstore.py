@@ -0,0 +1,61 @@
+import logging
+
+import kopf
+
+from clients.k8s.custom_object_store import connectors_store, CONNECTORS_GROUP, CONNECTORS_VERSION, \
+    CONNECTORS_PLURALS
+from clients.k8s.k8s_client import KubernetesClient
+from provisioning.memo import provisioning_memo
+from utils.cache import MISSING
+
+# Connector type of microservices provisioned by connector custom resources
+CONNECTOR_TYPES = {
+    "keycloakconnectors": "keycloak_connector",
+    "postgresconnectors": "postgres_connector",
+    "rabbitconnectors": "rabbit_connector",
+    "sentryconnectors": "sentry_connector",
+}
+
+
+@kopf.on.startup()
+def sync_connectors_store(**_):
+    # Startup handlers are completed before admission webhook server is
+    # started, so mutation handlers are never called with empty store.
+    for plural in CONNECTORS_PLURALS:
+        objects = KubernetesClient.list_cluster_custom_objects(
+            group=CONNECTORS_GROUP, version=CONNECTORS_VERSION, plural=plural
+        )
+        connectors_store.replace(plural, objects)
+        logging.info(f"Connectors store is synced for {plural}: {len(objects)} objects")
+
+
+def _on_connector_event(plural: str):
+    def handler(event, **_):
+        obj = event.get('object') or {}
+        name = obj.get('metadata', {}).get('name')
+        if not name:
+            return
+        previous = connectors_store.get(plural, name)
+        if event.get('type') == 'DELETED':
+            connectors_store.delete(plural, name)
+        else:
+            connectors_store.upsert(plural, obj)
+        # Objects of initial listing are already in store with the same version
+        if previous is not MISSING and previous is not None and (
+                event.get('type') == 'DELETED'
+                or previous['metadata'].get('resourceVersion') != obj['metadata'].get('resourceVersion')):
+            provisioning_memo.source_changed(CONNECTOR_TYPES[plural])
+    return handler
+
+
+for _plural in CONNECTORS_PLURALS:
+    kopf.on.event(CONNECTORS_GROUP, CONNECTORS_VERSION, _plural, id=f'{_plural}-store')(
+        _on_connector_event(_plural)
+    )
+
+
+@kopf.on.probe(id='connectors_store')
+def connectors_store_ready(**_):
+    # Informational value of /healthz, it doesn't gate readiness of
+    # operator: admission is served only after store is synced on startup.
+    return connectors_store.is_ready()
@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 
 
 class EnabledLabelValues(str, Enum):
@@ -96,3 +96,13 @@ class MutationHookStatus:
         if self.owner is None:
             return ""
         return self.owner
+
+
+@dataclass
+class PodConnectorContext:
+    """State of connector shared by handler and dispatcher during pod admission."""
+    # Microservice DTO parsed from annotations, it is provisioned again in
+    # background if provisioning failed with infrastructure problem
+    microservice: Any = None
+    # Exception of provisioning, containers are not mutated if it is set
+    exception: Optional[Exception] = None
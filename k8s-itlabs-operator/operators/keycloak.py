@@ -4,7 +4,8 @@ import kopf
 
 from exceptions import InfrastructureServiceProblem
 from observability.metrics.decorator import monitoring, mutation_hook_monitoring
-from operators.dto import ConnectorStatus, MutationHookStatus
+from operators.dto import ConnectorStatus, MutationHookStatus, PodConnectorContext
+from connectors.keycloak_connector.dto import KeycloakConnectorMicroserviceDto
 from connectors.keycloak_connector.services.keycloak_connector import \
     KeycloakConnectorService
 from connectors.keycloak_connector.exceptions import KeycloakConnectorError, \
@@ -15,12 +16,25 @@ from connectors.keycloak_connector.factories.service_factories.keycloak_connecto
     KeycloakConnectorServiceFactory
 from connectors.keycloak_connector.factories.service_factories.validation import \
     KeycloakConnectorValidationServiceFactory
+from provisioning.memo import provisioning_memo
 from utils.common import OwnerReferenceDto, get_owner_reference
 
 
-@kopf.on.mutate("pods.v1", id="kk-con-on-createpods")
+def provision(ms_keycloak_conn: KeycloakConnectorMicroserviceDto):
+    """Provisions connector in infrastructure without pod, e.g. in background."""
+    KeycloakConnectorServiceFactory.create().on_create_deployment(ms_keycloak_conn)
+
+
+def mutate_containers(spec: dict, ms_keycloak_conn: KeycloakConnectorMicroserviceDto) -> bool:
+    """
+    Appends env vars of connector to containers of pod. Env vars are
+    references to Vault secret that don't depend on result of provisioning.
+    """
+    return KeycloakConnectorServiceFactory.create().mutate_containers(spec, ms_keycloak_conn)
+
+
 @monitoring(connector_type='keycloak_connector')
-def create_pods(body, patch, spec, annotations, **_):
+def create_pods(body, annotations, context: PodConnectorContext, **_):
     # At the time of the creation of Pod, the name and uid were not yet
     # set in the manifest, so in the logs we refer to its owner.
     owner_ref: OwnerReferenceDto = get_owner_reference(body)
@@ -42,6 +56,12 @@ def create_pods(body, patch, spec, annotations, **_):
     status.is_used = True
     kk_conn_service = KeycloakConnectorServiceFactory.create()
     logging.info(f"[{owner_fmt}] Keycloak connector service is created")
+    context.microservice = ms_keycloak_conn
+    if provisioning_memo.is_ready('keycloak_connector', ms_keycloak_conn):
+        # Connector was provisioned in advance, e.g. on creation of Deployment
+        logging.info(f"[{owner_fmt}] Keycloak connector is already provisioned")
+        status.is_enabled = True
+        return status
     try:
         kk_conn_service.on_create_deployment(ms_keycloak_conn)
         logging.info(f"[{owner_fmt}] Keycloak connector service was processed in infrastructure")
@@ -49,19 +69,16 @@ def create_pods(body, patch, spec, annotations, **_):
         logging.error(f"[{owner_fmt}] Problem with Keycloak connector", exc_info=e)
         status.is_enabled = False
         status.exception = e
+        context.exception = e
     except InfrastructureServiceProblem as e:
         logging.error(f"[{owner_fmt}] Problem with infrastructure, "
                       "some changes couldn't be applied",
                       exc_info=e)
         status.is_enabled = True
         status.exception = e
+        context.exception = e
     else:
         status.is_enabled = True
-        if kk_conn_service.mutate_containers(spec, ms_keycloak_conn):
-            patch.spec["containers"] = spec.get("containers", [])
-            patch.spec["initContainers"] = spec.get("initContainers", [])
-            logging.info(f"[{owner_fmt}] Keycloak connector service patched containers, "
-                         f"patch.spec: {patch.spec}")
     return status
 
 
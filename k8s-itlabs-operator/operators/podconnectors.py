@@ -0,0 +1,371 @@
+import contextvars
+import logging
+from copy import deepcopy
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple, Type
+
+import kopf
+
+import settings as operator_settings
+from clients.postgres import settings as pg_settings
+from exceptions import InfrastructureServiceProblem
+from observability.metrics.metrics import app_admission_deferred_total
+from connectors.keycloak_connector.dto import KeycloakConnectorMicroserviceDto
+from connectors.keycloak_connector.factories.dto_factory import KeycloakConnectorMicroserviceDtoFactory
+from connectors.postgres_connector.dto import PgConnectorMicroserviceDto
+from connectors.postgres_connector.factories.dto_factory import PgConnectorMicroserviceDtoFactory
+from connectors.rabbit_connector.dto import RabbitConnectorMicroserviceDto
+from connectors.rabbit_connector.factories.dto_factory import RabbitConnectorMicroserviceDtoFactory
+from connectors.sentry_connector.dto import SentryConnectorMicroserviceDto
+from connectors.sentry_connector.factories.dto_factory import SentryConnectorMicroserviceDtoFactory
+from operators import postgresconnector, rabbitconnector, sentry, keycloak
+from operators.dto import PodConnectorContext
+from operators.webhookconfig import POD_CONNECTORS_HANDLER_ID
+from provisioning.memo import provisioning_memo
+from provisioning.queue import ProvisioningJob, ProvisioningQueue, provisioning_queue
+from utils.cache import MISSING, TTLCache
+from utils.common import OwnerReferenceDto, get_owner_reference, get_owner_object
+from utils.concurrency import BoundedExecutor
+from utils.hashing import generate_hash
+
+# Common part of annotation keys of all connectors
+CONNECTOR_ANNOTATION_MARKER = '.connector.itlabs.io/'
+CONTAINER_KINDS = ('containers', 'initContainers')
+
+
+class PodConnector(NamedTuple):
+    connector_type: str
+    # Domain of connector annotations, e.g. `<domain>/instance-name`
+    annotation_domain: str
+    handler: Callable
+    # Microservice DTO and its provisioning without pod, used by background queue
+    dto_class: Type
+    provision: Callable
+    # Parses microservice DTO from annotations and labels of pod template
+    parse: Callable
+    # Appends env vars of microservice to containers of pod spec, returns
+    # True if containers were changed
+    mutate: Callable
+
+
+class PodPatch(NamedTuple):
+    # Microservices of connectors, patch is valid while their provisioning is current
+    microservices: Dict[str, Any]
+    # Env vars appended to every container by container kind
+    added_env: Dict[str, List[List[dict]]]
+    statuses: Dict
+    mutated: bool
+
+
+class ConnectorCall(NamedTuple):
+    connector: PodConnector
+    # Microservice parsed by dispatcher, None if annotations are incorrect
+    microservice: Any
+    context: PodConnectorContext
+    # Handler submitted to executor, None if backlog of executor is full
+    future: Optional[Future]
+
+
+# Containers are mutated in order of connectors, so patch doesn't depend
+# on which connector was provisioned first.
+POD_CONNECTORS = (
+    PodConnector('postgres_connector', 'postgres.connector.itlabs.io', postgresconnector.create_pods,
+                 PgConnectorMicroserviceDto,
+                 postgresconnector.provision_async if pg_settings.POSTGRES_CLIENT == 'async'
+                 else postgresconnector.provision,
+                 PgConnectorMicroserviceDtoFactory.dto_from_annotations, postgresconnector.mutate_containers),
+    PodConnector('rabbit_connector', 'rabbit.connector.itlabs.io', rabbitconnector.create_pods,
+                 RabbitConnectorMicroserviceDto, rabbitconnector.provision,
+                 RabbitConnectorMicroserviceDtoFactory.dto_from_annotations, rabbitconnector.mutate_containers),
+    PodConnector('sentry_connector', 'sentry.connector.itlabs.io', sentry.create_pods,
+                 SentryConnectorMicroserviceDto, sentry.provision,
+                 SentryConnectorMicroserviceDtoFactory.dto_from_annotations, sentry.mutate_containers),
+    PodConnector('keycloak_connector', 'keycloak.connector.itlabs.io', keycloak.create_pods,
+                 KeycloakConnectorMicroserviceDto, keycloak.provision,
+                 lambda annotations, labels: KeycloakConnectorMicroserviceDtoFactory.dto_from_metadata(annotations),
+                 keycloak.mutate_containers),
+)
+
+
+class PodConnectorsDispatcher:
+    """
+    Provisions connectors of pod concurrently and then mutates its
+    containers.
+
+    Annotations of pod are split by connectors in one pass with index by
+    annotation domain. Every connector gets only its own annotations and
+    connectors without annotations are not called at all.
+
+    Microservices are parsed and containers are mutated by dispatcher
+    itself, handlers only provision connectors in `executor`. Admission
+    waits for provisioning no longer than `deadline` seconds. Containers
+    are mutated for connectors that are still provisioned after it, their
+    provisioning is finished in background. Provisioning that failed with
+    infrastructure problem is also repeated in background. No more than
+    `backlog` handlers wait for free thread of executor, provisioning of
+    connectors over it is passed to background queue at once.
+
+    Connectors of pod template are provisioned in background on creation of
+    workload, so its pods are only checked for readiness on admission.
+
+    Pods of the same ReplicaSet have the same connector annotations, labels
+    and env names of containers, so their patch is cached by them. Cached
+    patch is applied without handlers while provisioning of microservices of
+    all its connectors is current, see `ProvisioningMemo.is_current`.
+    """
+
+    def __init__(self, connectors: Sequence[PodConnector], executor: Executor,
+                 queue: ProvisioningQueue, deadline: float, patches: Optional[TTLCache] = None,
+                 backlog: Optional[int] = None):
+        self.connectors = connectors
+        self.deadline = deadline
+        self._executor = BoundedExecutor(executor, backlog)
+        self._queue = queue
+        self._patches = patches
+        self._index = {connector.annotation_domain: connector for connector in connectors}
+        for connector in connectors:
+            queue.register(connector.connector_type, connector.dto_class, connector.provision)
+
+    def classify(self, annotations: Mapping[str, str]) -> Dict[str, Dict[str, str]]:
+        """
+        Returns connector annotations by connector type. Pod without
+        connector annotations is recognized by substring search in its keys,
+        nothing else is done for it.
+        """
+        classified = {}
+        for key in annotations:
+            if CONNECTOR_ANNOTATION_MARKER not in key:
+                continue
+            connector = self._index.get(key[:key.index('/')])
+            if connector is not None:
+                classified.setdefault(connector.connector_type, {})[key] = annotations[key]
+        return classified
+
+    def dispatch(self, body, spec, annotations, labels) -> Tuple[Dict, bool]:
+        """Returns statuses of connectors and whether containers were changed."""
+        classified = self.classify(annotations)
+        if not classified:
+            return {}, False
+
+        patch_key = None
+        if self._patches is not None and provisioning_memo.enabled:
+            patch_key = self.patch_key(classified, labels, spec)
+            patch = self._cached_patch(patch_key)
+            if patch is not None:
+                return self._apply_patch(patch, spec)
+
+        calls = self._submit_all(classified, body, labels)
+        wait([call.future for call in calls if call.future is not None],
+             timeout=self.deadline if self.deadline > 0 else None)
+        statuses, mutations, cacheable = self._collect(calls, body)
+
+        env_sizes = self._env_sizes(spec)
+        mutated, is_mutation_failed = self._mutate(mutations, spec)
+
+        # Patch is cached only if all connectors are provisioned successfully
+        if patch_key is not None and cacheable and not is_mutation_failed:
+            self._patches.set(patch_key, PodPatch(
+                microservices={call.connector.connector_type: call.context.microservice for call in calls},
+                added_env=self._added_env(spec, env_sizes),
+                statuses=deepcopy(statuses),
+                mutated=mutated,
+            ))
+        return statuses, mutated
+
+    def _cached_patch(self, patch_key: str) -> Optional[PodPatch]:
+        patch = self._patches.get(patch_key)
+        if patch is MISSING:
+            return None
+        # Provisioning of every connector is still valid for its CR and Vault secret
+        if all(provisioning_memo.is_current(connector_type, microservice)
+               for connector_type, microservice in patch.microservices.items()):
+            return patch
+        self._patches.pop(patch_key)
+        return None
+
+    def _submit_all(self, classified: Mapping[str, Mapping[str, str]], body, labels) -> List[ConnectorCall]:
+        calls = []
+        for connector in self.connectors:
+            connector_annotations = classified.get(connector.connector_type)
+            if connector_annotations is None:
+                continue
+            context = PodConnectorContext()
+            calls.append(ConnectorCall(
+                connector=connector,
+                # Microservice is parsed before provisioning, so env vars are injected
+                # even if handler doesn't get a thread before admission deadline
+                microservice=self._parse(connector, connector_annotations, labels),
+                context=context,
+                future=self._submit(connector, body=body, labels=labels,
+                                    annotations=connector_annotations, context=context),
+            ))
+        return calls
+
+    def _collect(self, calls: List[ConnectorCall], body) -> Tuple[Dict, List[ConnectorCall], bool]:
+        """
+        Returns statuses of finished handlers, connectors which env vars are
+        injected and whether all connectors were provisioned successfully.
+        """
+        statuses = {}
+        mutations = []
+        succeeded = True
+        for call in calls:
+            connector_type, context = call.connector.connector_type, call.context
+            if call.future is None:
+                succeeded = False
+                self._shed(connector_type, call.microservice, body)
+            elif call.future.done():
+                # Handlers are wrapped by `monitoring`, which never raises
+                statuses.update(call.future.result())
+                succeeded = succeeded and context.exception is None and context.microservice is not None
+                if isinstance(context.exception, InfrastructureServiceProblem):
+                    self._retry(connector_type, context, body)
+                elif context.exception is not None:
+                    continue
+            else:
+                succeeded = False
+                self._defer(connector_type, call.future, context, body)
+            if call.microservice is not None:
+                mutations.append(call)
+        return statuses, mutations, succeeded
+
+    @staticmethod
+    def _mutate(mutations: List[ConnectorCall], spec) -> Tuple[bool, bool]:
+        """Returns whether containers were changed and whether any connector failed to change them."""
+        mutated = is_failed = False
+        for call in mutations:
+            try:
+                mutated = call.connector.mutate(spec, call.microservice) or mutated
+            except Exception as e:
+                is_failed = True
+                logging.error(f"Containers are not mutated by {call.connector.connector_type}", exc_info=e)
+        return mutated, is_failed
+
+    @staticmethod
+    def patch_key(classified: Mapping[str, Mapping[str, str]], labels: Mapping[str, str], spec) -> str:
+        # Connectors append env vars which names are absent in container
+        env_names = [
+            [(container.get('name'), [env.get('name') for env in container.get('env') or []])
+             for container in spec.get(kind) or []]
+            for kind in CONTAINER_KINDS
+        ]
+        return generate_hash(
+            repr(sorted((connector_type, sorted(items.items())) for connector_type, items in classified.items())),
+            repr(sorted(dict(labels).items())),
+            repr(env_names),
+        )
+
+    @staticmethod
+    def _env_sizes(spec) -> Dict[str, List[int]]:
+        return {kind: [len(container.get('env') or []) for container in spec.get(kind) or []] for kind in CONTAINER_KINDS}
+
+    @staticmethod
+    def _added_env(spec, env_sizes: Dict[str, List[int]]) -> Dict[str, List[List[dict]]]:
+        return {
+            kind: [deepcopy((container.get('env') or [])[size:])
+                   for container, size in zip(spec.get(kind) or [], env_sizes[kind])]
+            for kind in CONTAINER_KINDS
+        }
+
+    @staticmethod
+    def _apply_patch(patch: PodPatch, spec) -> Tuple[Dict, bool]:
+        for kind, added_env in patch.added_env.items():
+            for container, env in zip(spec.get(kind) or [], added_env):
+                if env:
+                    container['env'] = (container.get('env') or []) + deepcopy(env)
+        return deepcopy(patch.statuses), patch.mutated
+
+    def provision_template(self, annotations: Mapping[str, str], labels: Mapping[str, str],
+                           owner: Optional[dict]) -> List[str]:
+        """
+        Queues provisioning of connectors of pod template that are not ready
+        yet. Returns types of queued connectors.
+        """
+        queued = []
+        classified = self.classify(annotations)
+        for connector in self.connectors:
+            connector_type = connector.connector_type
+            if connector_type not in classified:
+                continue
+            microservice = self._parse(connector, classified[connector_type], labels)
+            if microservice is None:
+                continue
+            if provisioning_memo.is_ready(connector_type, microservice):
+                continue
+            if self._queue.submit(ProvisioningJob(connector_type, microservice, owner=owner)):
+                queued.append(connector_type)
+        return queued
+
+    @staticmethod
+    def _parse(connector: PodConnector, annotations: Mapping[str, str], labels: Mapping[str, str]) -> Any:
+        try:
+            return connector.parse(annotations, labels)
+        except Exception as e:
+            # Incorrect annotations are reported by handler on pod admission
+            logging.info(f"Microservice of {connector.connector_type} is not parsed, reason: {e}")
+            return None
+
+    def _submit(self, connector: PodConnector, **kwargs) -> Optional[Future]:
+        """Submits handler of connector, returns None if backlog of executor is full."""
+        # Handler is run in context of kopf handler, e.g. to post events
+        return self._executor.submit(contextvars.copy_context().run, connector.handler, **kwargs)
+
+    def _shed(self, connector_type: str, microservice: Any, body):
+        app_admission_deferred_total.labels(connector_type=connector_type).inc()
+        logging.warning(f"Provisioning of {connector_type} is not started, too many pods are admitted, "
+                        f"it is passed to background")
+        if microservice is not None and not provisioning_memo.is_ready(connector_type, microservice):
+            self._queue.submit(ProvisioningJob(connector_type, microservice, owner=get_owner_object(body)))
+
+    def _retry(self, connector_type: str, context: PodConnectorContext, body):
+        job = ProvisioningJob(connector_type, context.microservice, owner=get_owner_object(body))
+        # The first attempt is made by handler
+        job.attempt = 1
+        self._queue.retry(job, context.exception)
+
+    def _defer(self, connector_type: str, future: Future, context: PodConnectorContext, body):
+        app_admission_deferred_total.labels(connector_type=connector_type).inc()
+        owner_ref: OwnerReferenceDto = get_owner_reference(body)
+        owner_fmt = f"{owner_ref.kind}: {owner_ref.name}" if owner_ref else ""
+        logging.warning(f"[{owner_fmt}] Provisioning of {connector_type} is not completed in "
+                        f"{self.deadline} seconds, it is continued in background")
+
+        # Done callback is run in executor thread, so jobs are created in
+        # context of kopf handler to post events about result
+        admission_context = contextvars.copy_context()
+
+        def on_done(_):
+            if context.microservice is None:
+                return
+            if isinstance(context.exception, InfrastructureServiceProblem):
+                self._retry(connector_type, context, body)
+                return
+            job = ProvisioningJob(connector_type, context.microservice, owner=get_owner_object(body))
+            job.attempt = 1
+            self._queue.complete(job, context.exception)
+
+        future.add_done_callback(lambda f: admission_context.run(on_done, f))
+
+
+pod_connectors = PodConnectorsDispatcher(
+    POD_CONNECTORS,
+    ThreadPoolExecutor(max_workers=operator_settings.POD_CONNECTORS_WORKERS, thread_name_prefix='pod-connectors'),
+    queue=provisioning_queue,
+    deadline=operator_settings.ADMISSION_DEADLINE,
+    backlog=operator_settings.POD_CONNECTORS_BACKLOG,
+    patches=TTLCache(
+        name='pod_patches', maxsize=operator_settings.POD_PATCH_CACHE_MAXSIZE, ttl=operator_settings.PROVISIONING_MEMO_TTL
+    ),
+)
+
+
+@kopf.on.mutate('pods.v1', id=POD_CONNECTORS_HANDLER_ID)
+def create_pods(body, patch, spec, annotations, labels, **_):
+    statuses, mutated = pod_connectors.dispatch(body, spec, annotations, labels)
+    if mutated:
+        owner_ref: OwnerReferenceDto = get_owner_reference(body)
+        owner_fmt = f"{owner_ref.kind}: {owner_ref.name}" if owner_ref else ""
+        patch.spec['containers'] = spec.get('containers', [])
+        patch.spec['initContainers'] = spec.get('initContainers', [])
+        logging.info(f"[{owner_fmt}] Connectors patched containers, patch.spec: {patch.spec}")
+    return statuses
@@ -4,7 +4,8 @@ import kopf
 
 from exceptions import InfrastructureServiceProblem
 from observability.metrics.decorator import monitoring, mutation_hook_monitoring
-from operators.dto import ConnectorStatus, MutationHookStatus
+from operators.dto import ConnectorStatus, MutationHookStatus, PodConnectorContext
+from connectors.postgres_connector.dto import PgConnectorMicroserviceDto
 from connectors.postgres_connector.exceptions import PgConnectorCrdDoesNotExist, UnknownVaultPathInPgConnector, \
     PgConnectorMissingRequiredAnnotationError, PgConnectorAnnotationEmptyValueError
 from connectors.postgres_connector.factories.dto_factory import PgConnectorMicroserviceDtoFactory
@@ -12,6 +13,7 @@ from connectors.postgres_connector.factories.service_factories.postgres_connecto
 from connectors.postgres_connector.factories.service_factories.validation import \
     PostgresConnectorValidationServiceFactory
 from connectors.postgres_connector.services.postgres_connector import PostgresConnectorService
+from provisioning.memo import provisioning_memo
 from utils.common import OwnerReferenceDto, get_owner_reference
 
 
@@ -20,9 +22,26 @@ def create_fn(body, **_):
     logging.info(f"A handler is called with body: {body}")
 
 
-@kopf.on.mutate('pods.v1', id='pg-con-on-createpods')
+def provision(ms_pg_con: PgConnectorMicroserviceDto):
+    """Provisions connector in infrastructure without pod, e.g. in background."""
+    PostgresConnectorServiceFactory.create_postgres_connector_service().on_create_deployment(ms_pg_con)
+
+
+async def provision_async(ms_pg_con: PgConnectorMicroserviceDto):
+    """Same as `provision`, but Postgres is provisioned by asyncio client."""
+    await PostgresConnectorServiceFactory.create_postgres_connector_service().on_create_deployment_async(ms_pg_con)
+
+
+def mutate_containers(spec: dict, ms_pg_con: PgConnectorMicroserviceDto) -> bool:
+    """
+    Appends env vars of connector to containers of pod. Env vars are
+    references to Vault secret that don't depend on result of provisioning.
+    """
+    return PostgresConnectorServiceFactory.create_postgres_connector_service().mutate_containers(spec, ms_pg_con)
+
+
 @monitoring(connector_type='postgres_connector')
-def create_pods(body, patch, spec, annotations, labels, **_):
+def create_pods(body, annotations, labels, context: PodConnectorContext, **_):
     # At the time of the creation of Pod, the name and uid were not yet
     # set in the manifest, so in the logs we refer to its owner.
     owner_ref: OwnerReferenceDto = get_owner_reference(body)
@@ -44,6 +63,12 @@ def create_pods(body, patch, spec, annotations, labels, **_):
 
     pg_con_service = PostgresConnectorServiceFactory.create_postgres_connector_service()
     logging.info(f"[{owner_fmt}] Postgres connector service is created")
+    context.microservice = ms_pg_con
+    if provisioning_memo.is_ready('postgres_connector', ms_pg_con):
+        # Connector was provisioned in advance, e.g. on creation of Deployment
+        logging.info(f"[{owner_fmt}] Postgres connector is already provisioned")
+        status.is_enabled = True
+        return status
     try:
         pg_con_service.on_create_deployment(ms_pg_con)
         logging.info(f"[{owner_fmt}] Postgres connector service was processed in infrastructure")
@@ -51,16 +76,14 @@ def create_pods(body, patch, spec, annotations, labels, **_):
         logging.error(f"[{owner_fmt}] Problem with Postgres connector", exc_info=e)
         status.is_enabled = False
         status.exception = e
+        context.exception = e
     except InfrastructureServiceProblem as e:
         logging.error(f"[{owner_fmt}] Problem with infrastructure, some changes may not be applied", exc_info=e)
         status.is_enabled = True
         status.exception = e
+        context.exception = e
     else:
         status.is_enabled = True
-        if pg_con_service.mutate_containers(spec, ms_pg_con):
-            patch.spec['containers'] = spec.get('containers', [])
-            patch.spec['initContainers'] = spec.get('initContainers', [])
-            logging.info(f"[{owner_fmt}] Postgres connector service patched containers, patch.spec: {patch.spec}")
     return status
 
 
@@ -0,0 +1,36 @@
+import logging
+
+import kopf
+
+import settings as operator_settings
+from exceptions import InfrastructureServiceProblem
+from provisioning.ledger import ProvisioningLedger
+from provisioning.memo import provisioning_memo
+
+
+@kopf.on.startup()
+def load_provisioning_ledger(**_):
+    if not operator_settings.PROVISIONING_LEDGER_NAME or not provisioning_memo.enabled:
+        return
+    ledger = ProvisioningLedger()
+    try:
+        records = ledger.load()
+    except InfrastructureServiceProblem as e:
+        # Operator works without ledger, memo is just started empty
+        logging.error("Provisioning ledger is not loaded", exc_info=e)
+        return
+    provisioning_memo.load(records)
+    provisioning_memo.ledger = ledger
+    ledger.start()
+    logging.info(f"Provisioning ledger is loaded: {len(records)} entries")
+
+
+@kopf.on.cleanup()
+def stop_provisioning_ledger(**_):
+    ledger = provisioning_memo.ledger
+    if ledger is None:
+        return
+    try:
+        ledger.stop()
+    except InfrastructureServiceProblem as e:
+        logging.error("Provisioning ledger is not synced on shutdown", exc_info=e)
@@ -0,0 +1,38 @@
+import logging
+
+import kopf
+
+import settings as operator_settings
+from clients.k8s.configmap_sync import ConfigMapSync
+from exceptions import InfrastructureServiceProblem
+from provisioning.queue import provisioning_queue
+
+
+@kopf.on.startup()
+def restore_provisioning_queue(**_):
+    if not operator_settings.PROVISIONING_QUEUE_CHECKPOINT:
+        return
+    checkpoint = ConfigMapSync(
+        operator_settings.PROVISIONING_QUEUE_CHECKPOINT,
+        operator_settings.OPERATOR_NAMESPACE,
+        operator_settings.PROVISIONING_LEDGER_SYNC_INTERVAL,
+    )
+    try:
+        restored = provisioning_queue.restore(checkpoint)
+    except InfrastructureServiceProblem as e:
+        # Queue works without checkpoint, jobs are just not kept on restart
+        logging.error("Provisioning queue checkpoint is not restored", exc_info=e)
+        return
+    checkpoint.start()
+    logging.info(f"Provisioning queue is restored from checkpoint: {restored} jobs")
+
+
+@kopf.on.cleanup()
+def stop_provisioning_queue_checkpoint(**_):
+    checkpoint = provisioning_queue.checkpoint
+    if checkpoint is None:
+        return
+    try:
+        checkpoint.stop()
+    except InfrastructureServiceProblem as e:
+        logging.error("Provisioning queue checkpoint is not synced on shutdown", exc_info=e)
@@ -4,20 +4,34 @@ import kopf
 
 from exceptions import InfrastructureServiceProblem
 from observability.metrics.decorator import monitoring, mutation_hook_monitoring
-from operators.dto import ConnectorStatus, MutationHookStatus
+from operators.dto import ConnectorStatus, MutationHookStatus, PodConnectorContext
+from connectors.rabbit_connector.dto import RabbitConnectorMicroserviceDto
 from connectors.rabbit_connector.exceptions import RabbitConnectorCrdDoesNotExist, UnknownVaultPathInRabbitConnector
 from connectors.rabbit_connector.factories.dto_factory import RabbitConnectorMicroserviceDtoFactory
 from connectors.rabbit_connector.factories.service_factories.rabbit_connector import RabbitConnectorServiceFactory
 from connectors.rabbit_connector.services.rabbit_connector import RabbitConnectorService
 from connectors.rabbit_connector.factories.service_factories.validation import \
     RabbitConnectorValidationServiceFactory
+from provisioning.memo import provisioning_memo
 from utils.common import OwnerReferenceDto, get_owner_reference
 from validation.exceptions import AnnotationValidatorEmptyValueException, AnnotationValidatorMissedRequiredException
 
 
-@kopf.on.mutate('pods.v1', id='rabbit-connector-on-createpods')
+def provision(ms_rabbit_con: RabbitConnectorMicroserviceDto):
+    """Provisions connector in infrastructure without pod, e.g. in background."""
+    RabbitConnectorServiceFactory.create_rabbit_connector_service().on_create_deployment(ms_rabbit_con)
+
+
+def mutate_containers(spec: dict, ms_rabbit_con: RabbitConnectorMicroserviceDto) -> bool:
+    """
+    Appends env vars of connector to containers of pod. Env vars are
+    references to Vault secret that don't depend on result of provisioning.
+    """
+    return RabbitConnectorServiceFactory.create_rabbit_connector_service().mutate_containers(spec, ms_rabbit_con)
+
+
 @monitoring(connector_type='rabbit_connector')
-def create_pods(body, patch, spec, annotations, labels, **_):
+def create_pods(body, annotations, labels, context: PodConnectorContext, **_):
     # At the time of the creation of Pod, the name and uid were not yet
     # set in the manifest, so in the logs we refer to its owner.
     owner_ref: OwnerReferenceDto = get_owner_reference(body)
@@ -40,6 +54,12 @@ def create_pods(body, patch, spec, annotations, labels, **_):
 
     rabbit_con_service = RabbitConnectorServiceFactory.create_rabbit_connector_service()
     logging.info(f"[{owner_fmt}] Rabbit connector service is created")
+    context.microservice = ms_rabbit_con
+    if provisioning_memo.is_ready('rabbit_connector', ms_rabbit_con):
+        # Connector was provisioned in advance, e.g. on creation of Deployment
+        logging.info(f"[{owner_fmt}] Rabbit connector is already provisioned")
+        status.is_enabled = True
+        return status
     try:
         rabbit_con_service.on_create_deployment(ms_rabbit_con)
         logging.info(f"[{owner_fmt}] Rabbit connector service was processed in infrastructure")
@@ -47,16 +67,14 @@ def create_pods(body, patch, spec, annotations, labels, **_):
         logging.error(f"[{owner_fmt}] Problem with Rabbit connector", exc_info=e)
         status.is_enabled = False
         status.exception = e
+        context.exception = e
     except InfrastructureServiceProblem as e:
         logging.error(f'[{owner_fmt}] Problem with infrastructure, some changes may not be applied', exc_info=e)
         status.is_enabled = True
         status.exception = e
+        context.exception = e
     else:
         status.is_enabled = True
-        if rabbit_con_service.mutate_containers(spec, ms_rabbit_con):
-            patch.spec['containers'] = spec.get('containers', [])
-            patch.spec['initContainers'] = spec.get('initContainers', [])
-            logging.info(f"[{owner_fmt}] Rabbit connector service patched containers, patch.spec: {patch.spec}")
     return status
 
 
@@ -4,20 +4,34 @@ import kopf
 
 from exceptions import InfrastructureServiceProblem
 from observability.metrics.decorator import monitoring, mutation_hook_monitoring
-from operators.dto import ConnectorStatus, MutationHookStatus
+from operators.dto import ConnectorStatus, MutationHookStatus, PodConnectorContext
+from connectors.sentry_connector.dto import SentryConnectorMicroserviceDto
 from connectors.sentry_connector.services.sentry_connector import SentryConnectorService
 from connectors.sentry_connector.factories.dto_factory import SentryConnectorMicroserviceDtoFactory
 from connectors.sentry_connector.factories.service_factories.sentry_connector import SentryConnectorServiceFactory
 from connectors.sentry_connector.exceptions import SentryConnectorError
 from connectors.sentry_connector.factories.service_factories.validation import \
     SentryConnectorValidationServiceFactory
+from provisioning.memo import provisioning_memo
 from utils.common import OwnerReferenceDto, get_owner_reference
 from validation.exceptions import AnnotationValidatorMissedRequiredException, AnnotationValidatorEmptyValueException
 
 
-@kopf.on.mutate("pods.v1", id="sentry-connector-on-createpods")
+def provision(ms_sentry_conn: SentryConnectorMicroserviceDto):
+    """Provisions connector in infrastructure without pod, e.g. in background."""
+    SentryConnectorServiceFactory.create_sentry_connector_service().on_create_deployment(ms_sentry_conn)
+
+
+def mutate_containers(spec: dict, ms_sentry_conn: SentryConnectorMicroserviceDto) -> bool:
+    """
+    Appends env vars of connector to containers of pod. Env vars are
+    references to Vault secret that don't depend on result of provisioning.
+    """
+    return SentryConnectorServiceFactory.create_sentry_connector_service().mutate_containers(spec, ms_sentry_conn)
+
+
 @monitoring(connector_type='sentry_connector')
-def create_pods(body, patch, spec, labels, annotations, **_):
+def create_pods(body, annotations, labels, context: PodConnectorContext, **_):
     # At the time of the creation of Pod, the name and uid were not yet
     # set in the manifest, so in the logs we refer to its owner.
     owner_ref: OwnerReferenceDto = get_owner_reference(body)
@@ -39,6 +53,12 @@ def create_pods(body, patch, spec, labels, annotations, **_):
 
     sentry_conn_service = SentryConnectorServiceFactory.create_sentry_connector_service()
     logging.info(f"[{owner_fmt}] Sentry connector service is created")
+    context.microservice = ms_sentry_conn
+    if provisioning_memo.is_ready('sentry_connector', ms_sentry_conn):
+        # Connector was provisioned in advance, e.g. on creation of Deployment
+        logging.info(f"[{owner_fmt}] Sentry connector is already provisioned")
+        status.is_enabled = True
+        return status
     try:
         sentry_conn_service.on_create_deployment(ms_sentry_conn)
         logging.info(f"[{owner_fmt}] Sentry connector service was processed in infrastructure")
@@ -46,16 +66,14 @@ def create_pods(body, patch, spec, labels, annotations, **_):
         logging.error(f"[{owner_fmt}] Problem with Sentry connector", exc_info=e)
         status.is_enabled = False
         status.exception = e
+        context.exception = e
     except InfrastructureServiceProblem as e:
         logging.error(f'[{owner_fmt}] Problem with infrastructure, some changes may not be applied', exc_info=e)
         status.is_enabled = True
         status.exception = e
+        context.exception = e
     else:
         status.is_enabled = True
-        if sentry_conn_service.mutate_containers(spec, ms_sentry_conn):
-            patch.spec["containers"] = spec.get("containers", [])
-            patch.spec["initContainers"] = spec.get("initContainers", [])
-            logging.info(f"[{owner_fmt}] Sentry connector service patched containers, patch.spec: {patch.spec}")
     return status
 
 
@@ -0,0 +1,36 @@
+import pytest
+
+from operators.connectorstore import _on_connector_event
+from provisioning.memo import ProvisioningMemo
+
+
+def event(event_type: str, resource_version: str) -> dict:
+    return {'type': event_type, 'object': {'metadata': {'name': 'main', 'resourceVersion': resource_version}}}
+
+
+@pytest.mark.unit
+class TestConnectorEvents:
+    @pytest.fixture
+    def memo(self, mocker):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        mocker.patch('operators.connectorstore.provisioning_memo', memo)
+        mocker.patch('operators.connectorstore.connectors_store.get',
+                     return_value={'metadata': {'name': 'main', 'resourceVersion': '1'}})
+        mocker.patch('operators.connectorstore.connectors_store.upsert')
+        mocker.patch('operators.connectorstore.connectors_store.delete')
+        memo.mark_provisioned('postgres_connector', 'fingerprint', lambda: 1,
+                              memo.source('postgres_connector', {'db_name': 'app'}))
+        return memo
+
+    def test_listed_custom_resource_keeps_microservice_ready(self, memo):
+        _on_connector_event('postgresconnectors')(event=event(None, '1'))
+
+        assert memo.is_ready('postgres_connector', {'db_name': 'app'})
+
+    @pytest.mark.parametrize('event_type, resource_version', [('MODIFIED', '2'), ('DELETED', '1')])
+    def test_changed_custom_resource_makes_microservice_not_ready(self, memo, event_type, resource_version):
+        _on_connector_event('rabbitconnectors')(event=event(event_type, resource_version))
+        assert memo.is_ready('postgres_connector', {'db_name': 'app'})
+
+        _on_connector_event('postgresconnectors')(event=event(event_type, resource_version))
+        assert not memo.is_ready('postgres_connector', {'db_name': 'app'})
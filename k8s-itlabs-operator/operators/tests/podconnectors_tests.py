@@ -0,0 +1,383 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+import pytest
+
+from observability.metrics.decorator import monitoring
+from exceptions import InfrastructureServiceProblem
+from operators.dto import ConnectorStatus
+from operators.podconnectors import PodConnector, PodConnectorsDispatcher
+from utils.cache import TTLCache
+from provisioning.memo import provisioning_memo
+from provisioning.queue import ProvisioningQueue
+
+# Stands for context variables of kopf handler, e.g. to post events
+handler_var = contextvars.ContextVar('handler_var')
+
+
+@dataclass
+class MicroserviceDto:
+    name: str
+
+
+def add_env(spec, microservice: MicroserviceDto) -> bool:
+    spec['containers'][0].setdefault('env', []).append({'name': microservice.name})
+    return True
+
+
+def connector(connector_type: str, barrier: threading.Barrier = None, error: Exception = None,
+              get_secret_version=lambda: 1) -> PodConnector:
+    @monitoring(connector_type=connector_type)
+    def create_pods(annotations, context, **_):
+        assert all(key.startswith(f'{connector_type}.connector.itlabs.io/') for key in annotations)
+        context.microservice = MicroserviceDto(connector_type)
+        if barrier is not None:
+            # Fails by timeout if connectors are called one after another
+            barrier.wait(timeout=5)
+        if error is not None:
+            context.exception = error
+        else:
+            provisioning_memo.mark_provisioned(connector_type, connector_type, get_secret_version,
+                                               provisioning_memo.source(connector_type, context.microservice))
+        create_pods.calls += 1
+        return ConnectorStatus(is_enabled=True, is_used=True, exception=error)
+    create_pods.calls = 0
+
+    def parse(connector_annotations, labels):
+        if not connector_annotations.get(f'{connector_type}.connector.itlabs.io/instance-name'):
+            raise ValueError('Instance name is empty')
+        return MicroserviceDto(connector_type)
+
+    return PodConnector(connector_type, f'{connector_type}.connector.itlabs.io', create_pods,
+                        MicroserviceDto, MagicMock(), parse, add_env)
+
+
+def annotations(*connector_types: str) -> dict:
+    return {f'{connector_type}.connector.itlabs.io/instance-name': 'main' for connector_type in connector_types}
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        yield executor
+
+
+@pytest.fixture
+def queue():
+    return MagicMock()
+
+
+@pytest.fixture
+def create_dispatcher(executor, queue):
+    def create(connectors, deadline: float = 5, patches: TTLCache = None, backlog: int = None) -> PodConnectorsDispatcher:
+        return PodConnectorsDispatcher(connectors, executor, queue=queue, deadline=deadline, patches=patches,
+                                       backlog=backlog)
+    return create
+
+
+@pytest.mark.unit
+class TestPodConnectorsDispatcher:
+    def test_connectors_are_provisioned_concurrently(self, create_dispatcher):
+        barrier = threading.Barrier(3)
+        dispatcher = create_dispatcher([connector('first', barrier), connector('second', barrier), connector('third', barrier)])
+        spec = {'containers': [{'name': 'app'}]}
+
+        statuses, mutated = dispatcher.dispatch({}, spec, annotations('first', 'second', 'third'), {})
+
+        assert mutated
+        assert set(statuses) == {'first', 'second', 'third'}
+
+    def test_containers_are_mutated_in_order_of_connectors(self, create_dispatcher):
+        dispatcher = create_dispatcher([connector('first'), connector('second')])
+        spec = {'containers': [{'name': 'app'}]}
+
+        dispatcher.dispatch({}, spec, annotations('second', 'first'), {})
+
+        assert spec['containers'][0]['env'] == [{'name': 'first'}, {'name': 'second'}]
+
+    def test_connectors_without_annotations_are_not_called(self, create_dispatcher):
+        dispatcher = create_dispatcher([connector('first'), connector('second')])
+        spec = {'containers': [{'name': 'app'}]}
+
+        statuses, _ = dispatcher.dispatch({}, spec, annotations('second'), {})
+
+        assert set(statuses) == {'second'}
+        assert spec['containers'][0]['env'] == [{'name': 'second'}]
+
+    def test_pod_without_connectors(self, create_dispatcher):
+        dispatcher = create_dispatcher([connector('first')])
+        spec = {'containers': [{'name': 'app'}]}
+        pod_annotations = {'prometheus.io/scrape': 'true', 'unknown.connector.itlabs.io/name': 'main'}
+
+        assert dispatcher.dispatch({}, spec, pod_annotations, {}) == ({}, False)
+        assert spec == {'containers': [{'name': 'app'}]}
+
+    def test_classify_annotations(self, create_dispatcher):
+        dispatcher = create_dispatcher([connector('first'), connector('second')])
+
+        classified = dispatcher.classify({
+            'first.connector.itlabs.io/instance-name': 'main',
+            'first.connector.itlabs.io/vault-path': 'vault:secret/data/app',
+            'second.connector.itlabs.io/instance-name': 'main',
+            'app.kubernetes.io/name': 'app',
+        })
+
+        assert classified == {
+            'first': {
+                'first.connector.itlabs.io/instance-name': 'main',
+                'first.connector.itlabs.io/vault-path': 'vault:secret/data/app',
+            },
+            'second': {'second.connector.itlabs.io/instance-name': 'main'},
+        }
+
+    def test_failed_mutation_does_not_break_others(self, create_dispatcher):
+        @monitoring(connector_type='broken')
+        def broken(**_):
+            return ConnectorStatus(is_enabled=True, is_used=True)
+
+        def mutate(spec, microservice):
+            return spec['missing']
+
+        dispatcher = create_dispatcher([PodConnector('broken', 'broken.connector.itlabs.io', broken, MicroserviceDto,
+                                                     MagicMock(), MagicMock(), mutate), connector('second')])
+        spec = {'containers': [{'name': 'app'}]}
+
+        _, mutated = dispatcher.dispatch({}, spec, annotations('broken', 'second'), {})
+
+        assert mutated
+        assert spec['containers'][0]['env'] == [{'name': 'second'}]
+
+    def test_containers_are_not_mutated_on_failure(self, create_dispatcher, queue):
+        dispatcher = create_dispatcher([connector('first', error=ValueError())])
+        spec = {'containers': [{'name': 'app'}]}
+
+        statuses, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+
+        assert not mutated
+        assert statuses['first']['exception']
+        queue.retry.assert_not_called()
+
+    def test_infrastructure_problem_is_retried_in_background(self, create_dispatcher, queue):
+        error = InfrastructureServiceProblem('First', Exception())
+        dispatcher = create_dispatcher([connector('first', error=error)])
+        spec = {'containers': [{'name': 'app'}]}
+
+        _, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+
+        assert mutated
+        queue.retry.assert_called_once()
+        job, retried_error = queue.retry.call_args.args
+        assert job.microservice == MicroserviceDto('first')
+        assert job.attempt == 1 and retried_error is error
+
+    def test_connectors_are_registered_in_queue(self, create_dispatcher, queue):
+        first = connector('first')
+
+        create_dispatcher([first])
+
+        queue.register.assert_called_once_with('first', MicroserviceDto, first.provision)
+
+    def test_provisioning_is_deferred_after_deadline(self, create_dispatcher, executor, queue):
+        barrier = threading.Barrier(2)
+        dispatcher = create_dispatcher([connector('first', barrier)], deadline=.05)
+        spec = {'containers': [{'name': 'app'}]}
+
+        statuses, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+
+        assert mutated
+        assert 'first' not in statuses
+        queue.complete.assert_not_called()
+        barrier.wait(timeout=5)
+        executor.shutdown(wait=True)
+        queue.complete.assert_called_once()
+        assert queue.complete.call_args.args[0].attempt == 1
+
+    @pytest.mark.parametrize('error', [None, InfrastructureServiceProblem('First', Exception())])
+    def test_deferred_job_is_created_in_handler_context(self, create_dispatcher, executor, queue, mocker, error):
+        barrier = threading.Barrier(2)
+        dispatcher = create_dispatcher([connector('first', barrier, error=error)], deadline=.05)
+        owner = {'kind': 'Deployment', 'metadata': {'name': 'app'}}
+        mocker.patch('operators.podconnectors.get_owner_object', return_value=owner)
+
+        def admit():
+            handler_var.set('admission')
+            dispatcher.dispatch({}, {'containers': [{'name': 'app'}]}, annotations('first'), {})
+        contextvars.copy_context().run(admit)
+        barrier.wait(timeout=5)
+        executor.shutdown(wait=True)
+
+        job = (queue.retry if error is not None else queue.complete).call_args.args[0]
+        posted = []
+        mocker.patch('provisioning.queue.kopf.event', side_effect=lambda *args, **kwargs: posted.append(handler_var.get()))
+        job.context.copy().run(ProvisioningQueue._post_event, job, 'Normal', 'Infrastructure is prepared')
+        assert posted == ['admission']
+
+    def test_containers_are_mutated_if_handler_is_not_started(self, queue):
+        blocked = threading.Event()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            executor.submit(blocked.wait, 5)
+            dispatcher = PodConnectorsDispatcher([connector('first')], executor, queue=queue, deadline=.05)
+            spec = {'containers': [{'name': 'app'}]}
+
+            _, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+            blocked.set()
+
+        assert mutated
+        assert spec['containers'][0]['env'] == [{'name': 'first'}]
+
+    def test_provisioning_over_backlog_is_queued(self, create_dispatcher, queue):
+        provisioning_memo.clear()
+        barrier = threading.Barrier(2)
+        dispatcher = create_dispatcher([connector('first', barrier)], deadline=.05, backlog=1)
+        dispatcher.dispatch({}, {'containers': [{'name': 'app'}]}, annotations('first'), {})
+        spec = {'containers': [{'name': 'app'}]}
+
+        statuses, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+        barrier.wait(timeout=5)
+
+        assert mutated and statuses == {}
+        assert spec['containers'][0]['env'] == [{'name': 'first'}]
+        queue.submit.assert_called_once()
+        assert queue.submit.call_args.args[0].microservice == MicroserviceDto('first')
+
+    def test_failed_deferred_provisioning_is_retried(self, create_dispatcher, executor, queue):
+        barrier = threading.Barrier(2)
+        error = InfrastructureServiceProblem('First', Exception())
+        dispatcher = create_dispatcher([connector('first', barrier, error=error)], deadline=.05)
+        spec = {'containers': [{'name': 'app'}]}
+
+        _, mutated = dispatcher.dispatch({}, spec, annotations('first'), {})
+        barrier.wait(timeout=5)
+        executor.shutdown(wait=True)
+
+        assert mutated
+        queue.retry.assert_called_once()
+        job, retried_error = queue.retry.call_args.args
+        assert job.connector_type == 'first' and retried_error is error
+
+
+@pytest.mark.unit
+class TestPodTemplateProvisioning:
+    @pytest.fixture(autouse=True)
+    def clear_memo(self, mocker):
+        mocker.patch.object(provisioning_memo, 'pre_provisioning', True)
+        provisioning_memo.clear()
+        yield
+        provisioning_memo.clear()
+
+    def test_connectors_of_template_are_queued(self, create_dispatcher, queue):
+        dispatcher = create_dispatcher([connector('first'), connector('second'), connector('third')])
+        owner = {'kind': 'Deployment', 'metadata': {'name': 'app'}}
+
+        queued = dispatcher.provision_template(annotations('first', 'second'), {}, owner=owner)
+
+        assert queued == ['first', 'second']
+        jobs = [call.args[0] for call in queue.submit.call_args_list]
+        assert [job.microservice for job in jobs] == [MicroserviceDto('first'), MicroserviceDto('second')]
+        assert all(job.owner is owner for job in jobs)
+
+    def test_ready_connectors_are_not_queued(self, create_dispatcher, queue):
+        dispatcher = create_dispatcher([connector('first'), connector('second')])
+        provisioning_memo.mark_provisioned('first', 'first', lambda: 1,
+                                           provisioning_memo.source('first', MicroserviceDto('first')))
+
+        queued = dispatcher.provision_template(annotations('first', 'second'), {}, owner=None)
+
+        assert queued == ['second']
+
+    def test_incorrect_annotations_are_skipped(self, create_dispatcher, queue):
+        dispatcher = create_dispatcher([connector('first')])
+
+        queued = dispatcher.provision_template({'first.connector.itlabs.io/instance-name': ''}, {}, owner=None)
+
+        assert queued == []
+        queue.submit.assert_not_called()
+
+
+@pytest.mark.unit
+class TestPodPatchCache:
+    @pytest.fixture(autouse=True)
+    def clear_memo(self):
+        provisioning_memo.clear()
+        yield
+        provisioning_memo.clear()
+
+    @pytest.fixture
+    def patches(self):
+        return TTLCache(name='pod_patches', maxsize=10, ttl=60)
+
+    @staticmethod
+    def pod_spec() -> dict:
+        return {
+            'containers': [{'name': 'app', 'image': 'app:1', 'env': [{'name': 'DEBUG', 'value': '1'}]}],
+            'initContainers': [{'name': 'migrate'}],
+        }
+
+    def test_patch_of_the_same_pod_is_cached(self, create_dispatcher, patches):
+        first, second = connector('first'), connector('second')
+        dispatcher = create_dispatcher([first, second], patches=patches)
+        pod_spec = self.pod_spec()
+        statuses, mutated = dispatcher.dispatch({}, pod_spec, annotations('first', 'second'), {'app': 'app'})
+
+        cached_spec = self.pod_spec()
+        assert dispatcher.dispatch({}, cached_spec, annotations('first', 'second'), {'app': 'app'}) == (statuses, mutated)
+
+        assert cached_spec == pod_spec
+        assert first.handler.calls == second.handler.calls == 1
+
+    def test_patch_depends_on_env_names(self, create_dispatcher, patches):
+        first = connector('first')
+        dispatcher = create_dispatcher([first], patches=patches)
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        pod_spec = self.pod_spec()
+        pod_spec['containers'][0]['env'].append({'name': 'first'})
+        _, mutated = dispatcher.dispatch({}, pod_spec, annotations('first'), {})
+
+        assert mutated
+        assert first.handler.calls == 2
+
+    def test_patch_is_invalidated_with_memo(self, create_dispatcher, patches):
+        first = connector('first')
+        dispatcher = create_dispatcher([first], patches=patches)
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        provisioning_memo.clear()
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        assert first.handler.calls == 2
+
+    def test_patch_is_invalidated_by_rotated_secret(self, create_dispatcher, patches):
+        get_secret_version = MagicMock(return_value=1)
+        first = connector('first', get_secret_version=get_secret_version)
+        dispatcher = create_dispatcher([first], patches=patches)
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+        assert first.handler.calls == 1
+
+        get_secret_version.return_value = 2
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        assert first.handler.calls == 2
+
+    def test_patch_is_invalidated_by_changed_custom_resource(self, create_dispatcher, patches):
+        first = connector('first')
+        dispatcher = create_dispatcher([first], patches=patches)
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        provisioning_memo.source_changed('first')
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        assert first.handler.calls == 2
+
+    def test_failed_patch_is_not_cached(self, create_dispatcher, patches):
+        first = connector('first', error=InfrastructureServiceProblem('First', Exception()))
+        dispatcher = create_dispatcher([first], patches=patches)
+
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+        dispatcher.dispatch({}, self.pod_spec(), annotations('first'), {})
+
+        assert first.handler.calls == 2
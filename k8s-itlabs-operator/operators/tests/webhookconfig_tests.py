@@ -0,0 +1,59 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+from operators.webhookconfig import build_webhook_config, POD_CONNECTORS_HANDLER_ID
+
+MANIFEST_PATH = Path(__file__).parents[3] / 'manifests' / 'webhook-config.yaml'
+
+
+def webhook(**kwargs) -> dict:
+    config = build_webhook_config(namespace='operator', **kwargs)
+    return config['webhooks'][0]
+
+
+@pytest.mark.unit
+class TestWebhookConfig:
+    def test_path_of_pod_connectors_handler(self):
+        assert webhook()['clientConfig']['service'] == {
+            'namespace': 'operator',
+            'name': 'k8s-itlabs-operator',
+            'path': f'/{POD_CONNECTORS_HANDLER_ID}',
+            'port': 443,
+        }
+
+    def test_opt_out_pod_label(self):
+        assert webhook(pod_label='connectors.itlabs.io/enabled', pod_opt_in=False)['objectSelector'] == {
+            'matchExpressions': [{'key': 'connectors.itlabs.io/enabled', 'operator': 'NotIn', 'values': ['false']}]
+        }
+
+    def test_opt_in_pod_label(self):
+        assert webhook(pod_label='connectors.itlabs.io/enabled', pod_opt_in=True)['objectSelector'] == {
+            'matchLabels': {'connectors.itlabs.io/enabled': 'true'}
+        }
+
+    def test_without_pod_label(self):
+        assert webhook(pod_label='')['objectSelector'] == {}
+
+    def test_namespace_selector(self):
+        selector = webhook(namespace_label='connectors.itlabs.io/enabled',
+                           excluded_namespaces=['kube-system'])['namespaceSelector']
+
+        assert selector['matchLabels'] == {'connectors.itlabs.io/enabled': 'true'}
+        assert {expression['key'] for expression in selector['matchExpressions']} == {
+            'name', 'kubernetes.io/metadata.name'
+        }
+        assert all(expression['values'] == ['kube-system'] for expression in selector['matchExpressions'])
+
+    def test_without_namespace_selector(self):
+        assert webhook(namespace_label='', excluded_namespaces=[])['namespaceSelector'] == {}
+
+    @pytest.mark.skipif(not MANIFEST_PATH.exists(), reason='Manifests are not available')
+    def test_committed_manifest_sends_unlabeled_pods(self):
+        # Pods of existing workloads are not labeled, so they are sent to
+        # operator until opt-in is enabled explicitly
+        manifest = yaml.safe_load(MANIFEST_PATH.read_text())
+
+        assert manifest == build_webhook_config(pod_opt_in=False)
+        assert 'matchLabels' not in manifest['webhooks'][0]['objectSelector']
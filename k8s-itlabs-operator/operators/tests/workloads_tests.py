@@ -0,0 +1,42 @@
+import pytest
+
+from operators.workloads import WORKLOAD_TEMPLATES, get_template_metadata, uses_connectors
+
+TEMPLATE_METADATA = {'annotations': {'postgres.connector.itlabs.io/instance-name': 'main'}, 'labels': {'app': 'app'}}
+
+
+@pytest.mark.unit
+class TestTemplateMetadata:
+    @pytest.mark.parametrize('plural, body', [
+        ('deployments', {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}),
+        ('statefulsets', {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}),
+        ('jobs', {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}),
+        ('cronjobs', {'spec': {'jobTemplate': {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}}}),
+    ])
+    def test_metadata_of_workload_template(self, plural, body):
+        template_path = next(path for _, _, name, path in WORKLOAD_TEMPLATES if name == plural)
+
+        assert get_template_metadata(body, template_path) == TEMPLATE_METADATA
+
+    def test_workload_without_template(self):
+        assert get_template_metadata({'spec': {}}, ('spec', 'jobTemplate', 'spec', 'template')) == {}
+
+
+@pytest.mark.unit
+class TestUsesConnectors:
+    TEMPLATE_PATH = ('spec', 'template')
+
+    def test_template_with_connector_annotations(self):
+        body = {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}
+
+        assert uses_connectors(body, 'default', self.TEMPLATE_PATH)
+
+    def test_template_without_connector_annotations(self):
+        body = {'spec': {'template': {'metadata': {'annotations': {'prometheus.io/scrape': 'true'}}}}}
+
+        assert not uses_connectors(body, 'default', self.TEMPLATE_PATH)
+
+    def test_workload_of_excluded_namespace(self):
+        body = {'spec': {'template': {'metadata': TEMPLATE_METADATA}}}
+
+        assert not uses_connectors(body, 'kube-system', self.TEMPLATE_PATH)
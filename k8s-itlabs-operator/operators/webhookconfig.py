@@ -0,0 +1,93 @@
+"""
+Generator of admission webhook configuration of pod connectors.
+
+Selectors are taken from `WEBHOOK_*` settings, so pods that never use
+connectors are not sent to operator by apiserver at all:
+
+    python -m operators.webhookconfig > ../manifests/webhook-config.yaml
+"""
+from typing import List
+
+import yaml
+
+import settings as operator_settings
+
+POD_CONNECTORS_HANDLER_ID = 'connectors-on-createpods'
+OPERATOR_NAME = 'k8s-itlabs-operator'
+
+
+def build_object_selector(label: str, opt_in: bool) -> dict:
+    if not label:
+        return {}
+    if opt_in:
+        return {'matchLabels': {label: 'true'}}
+    return {'matchExpressions': [{'key': label, 'operator': 'NotIn', 'values': ['false']}]}
+
+
+def build_namespace_selector(label: str, excluded_namespaces: List[str]) -> dict:
+    expressions = []
+    if excluded_namespaces:
+        # Label `name` is set manually in old clusters, where label
+        # `kubernetes.io/metadata.name` is absent
+        for key in ('name', 'kubernetes.io/metadata.name'):
+            expressions.append({'key': key, 'operator': 'NotIn', 'values': list(excluded_namespaces)})
+    selector = {}
+    if label:
+        selector['matchLabels'] = {label: 'true'}
+    if expressions:
+        selector['matchExpressions'] = expressions
+    return selector
+
+
+def build_webhook_config(namespace: str = operator_settings.OPERATOR_NAMESPACE,
+                         pod_label: str = operator_settings.WEBHOOK_POD_LABEL,
+                         pod_opt_in: bool = operator_settings.WEBHOOK_POD_OPT_IN,
+                         namespace_label: str = operator_settings.WEBHOOK_NAMESPACE_LABEL,
+                         excluded_namespaces: List[str] = operator_settings.WEBHOOK_EXCLUDED_NAMESPACES,
+                         timeout: int = operator_settings.WEBHOOK_TIMEOUT) -> dict:
+    return {
+        'apiVersion': 'admissionregistration.k8s.io/v1',
+        'kind': 'MutatingWebhookConfiguration',
+        'metadata': {
+            'name': f'{OPERATOR_NAME}-connectors',
+            'annotations': {
+                'cert-manager.io/inject-ca-from': f'{namespace}/{OPERATOR_NAME}',
+            },
+        },
+        'webhooks': [{
+            'admissionReviewVersions': ['v1', 'v1beta1'],
+            'clientConfig': {
+                'service': {
+                    'namespace': namespace,
+                    'name': OPERATOR_NAME,
+                    'path': f'/{POD_CONNECTORS_HANDLER_ID}',
+                    'port': 443,
+                },
+            },
+            'failurePolicy': 'Ignore',
+            'matchPolicy': 'Equivalent',
+            'name': 'create-pods.connectors.itlabs.io',
+            'namespaceSelector': build_namespace_selector(namespace_label, excluded_namespaces),
+            'objectSelector': build_object_selector(pod_label, pod_opt_in),
+            'reinvocationPolicy': 'Never',
+            'rules': [{
+                'apiGroups': [''],
+                'apiVersions': ['v1'],
+                'operations': ['CREATE'],
+                'resources': ['pods'],
+                'scope': '*',
+            }],
+            'sideEffects': 'None',
+            'timeoutSeconds': timeout,
+        }],
+    }
+
+
+def main():
+    print('---')
+    print('# Generated by `python -m operators.webhookconfig`, do not edit manually')
+    print(yaml.safe_dump(build_webhook_config(), sort_keys=False), end='')
+
+
+if __name__ == '__main__':
+    main()
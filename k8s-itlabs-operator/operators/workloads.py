@@ -0,0 +1,63 @@
+import logging
+from typing import Tuple
+
+import kopf
+
+import settings as operator_settings
+from operators.podconnectors import CONNECTOR_ANNOTATION_MARKER, pod_connectors
+from utils.common import get_object_reference
+
+# Path to pod template in spec of every workload resource
+WORKLOAD_TEMPLATES = (
+    ('apps', 'v1', 'deployments', ('spec', 'template')),
+    ('apps', 'v1', 'statefulsets', ('spec', 'template')),
+    ('batch', 'v1', 'jobs', ('spec', 'template')),
+    ('batch', 'v1', 'cronjobs', ('spec', 'jobTemplate', 'spec', 'template')),
+)
+
+
+def get_template_metadata(body: dict, template_path: Tuple[str, ...]) -> dict:
+    template = body
+    for key in template_path:
+        template = template.get(key) or {}
+    return template.get('metadata') or {}
+
+
+def uses_connectors(body: dict, namespace: str, template_path: Tuple[str, ...]) -> bool:
+    """
+    Returns whether pods of workload are sent to operator and use
+    connectors, other workloads are not handled at all.
+    """
+    if namespace in operator_settings.WEBHOOK_EXCLUDED_NAMESPACES:
+        return False
+    annotations = get_template_metadata(body, template_path).get('annotations') or {}
+    return any(CONNECTOR_ANNOTATION_MARKER in key for key in annotations)
+
+
+def _when(template_path: Tuple[str, ...]):
+    def when(body, namespace, **_) -> bool:
+        return uses_connectors(body, namespace, template_path)
+    return when
+
+
+def _on_workload(template_path: Tuple[str, ...]):
+    def handler(body, name, **_):
+        metadata = get_template_metadata(body, template_path)
+        queued = pod_connectors.provision_template(
+            metadata.get('annotations') or {},
+            metadata.get('labels') or {},
+            owner=get_object_reference(body),
+        )
+        if queued:
+            logging.info(f"[{body.get('kind')}: {name}] Connectors are provisioned in advance: {', '.join(queued)}")
+    return handler
+
+
+if operator_settings.WORKLOAD_PRE_PROVISIONING:
+    for _group, _version, _plural, _template_path in WORKLOAD_TEMPLATES:
+        _handler, _filter = _on_workload(_template_path), _when(_template_path)
+        kopf.on.create(_group, _version, _plural, id=f'{_plural}-pre-provisioning-on-create',
+                       when=_filter)(_handler)
+        # Only changes of pod template metadata may change connectors
+        kopf.on.update(_group, _version, _plural, id=f'{_plural}-pre-provisioning-on-update',
+                       field='.'.join(_template_path + ('metadata',)), when=_filter)(_handler)
@@ -0,0 +1,9 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ProvisioningRecord:
+    # Version of microservice Vault secret at the moment of provisioning
+    secret_version: int
+    # Unix time of provisioning
+    provisioned_at: float
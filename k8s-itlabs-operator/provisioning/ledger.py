@@ -0,0 +1,142 @@
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from kubernetes.client import V1ConfigMap
+
+import settings as operator_settings
+from clients.k8s.configmap_sync import ConfigMapSync
+from provisioning.dto import ProvisioningRecord
+
+logger = logging.getLogger('provisioning_ledger')
+
+# Entries provisioned before this time are invalid. Value is unix time or
+# ISO 8601 datetime, e.g. `2023-01-01T00:00:00Z`
+INVALIDATE_BEFORE_ANNOTATION = 'provisioning.itlabs.io/invalidate-before'
+
+LedgerKey = Tuple[str, str]
+
+
+def parse_invalidate_before(value: Optional[str]) -> float:
+    if not value:
+        return 0
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        logger.warning(f"Incorrect value of `{INVALIDATE_BEFORE_ANNOTATION}` annotation: {value}")
+        return 0
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+class ProvisioningLedger:
+    """
+    Provisioning memo persisted in ConfigMap of operator namespace.
+
+    Every entry is stored under `<connector type>.<fingerprint>` key.
+    Changes are written to ConfigMap in background, so admission is not
+    delayed by Kubernetes API. Entries of all replicas are merged in one
+    ConfigMap.
+
+    Ledger is invalidated manually by `provisioning.itlabs.io/invalidate-before`
+    annotation of ConfigMap, entries provisioned before its time are ignored
+    and removed.
+
+    Entries older than `max_age` and the oldest entries over `max_entries`
+    are removed on every sync, so ConfigMap doesn't grow while memo evicts
+    its entries.
+    """
+
+    def __init__(self, name: str = operator_settings.PROVISIONING_LEDGER_NAME,
+                 namespace: str = operator_settings.OPERATOR_NAMESPACE,
+                 max_age: float = operator_settings.PROVISIONING_LEDGER_MAX_AGE,
+                 max_entries: int = operator_settings.PROVISIONING_MEMO_MAXSIZE,
+                 sync_interval: float = operator_settings.PROVISIONING_LEDGER_SYNC_INTERVAL):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.invalidated_before: float = 0
+        self._config_map = ConfigMapSync(name, namespace, sync_interval, on_sync=self._on_sync)
+
+    @staticmethod
+    def key(connector_type: str, fingerprint: str) -> str:
+        return f"{connector_type}.{fingerprint}"
+
+    @staticmethod
+    def dumps(record: ProvisioningRecord) -> str:
+        return json.dumps({
+            'secretVersion': record.secret_version,
+            'provisionedAt': record.provisioned_at,
+        })
+
+    @staticmethod
+    def loads(value: str) -> ProvisioningRecord:
+        data = json.loads(value)
+        return ProvisioningRecord(
+            secret_version=int(data['secretVersion']),
+            provisioned_at=float(data['provisionedAt']),
+        )
+
+    def _on_sync(self, config_map: V1ConfigMap):
+        annotations = config_map.metadata.annotations or {}
+        self.invalidated_before = parse_invalidate_before(annotations.get(INVALIDATE_BEFORE_ANNOTATION))
+        _, stale = self._parse(config_map)
+        for key in stale:
+            self._config_map.discard(key)
+
+    def _parse(self, config_map: V1ConfigMap) -> Tuple[Dict[LedgerKey, ProvisioningRecord], List[str]]:
+        """
+        Returns valid entries and keys of expired, invalidated, malformed
+        entries and the oldest entries over `max_entries`.
+        """
+        valid_after = max(time.time() - self.max_age, self.invalidated_before)
+        records = {}
+        stale = []
+        for key, value in (config_map.data or {}).items():
+            connector_type, _, fingerprint = key.partition('.')
+            try:
+                record = self.loads(value)
+            except (ValueError, KeyError, TypeError):
+                record = None
+            if record is None or not fingerprint or record.provisioned_at < valid_after:
+                stale.append(key)
+                continue
+            records[(connector_type, fingerprint)] = record
+
+        # The most recently provisioned entries are kept
+        newest = sorted(records.items(), key=lambda item: item[1].provisioned_at, reverse=True)
+        stale.extend(self.key(connector_type, fingerprint) for (connector_type, fingerprint), _ in newest[self.max_entries:])
+        return dict(newest[:self.max_entries]), stale
+
+    def load(self) -> Dict[LedgerKey, ProvisioningRecord]:
+        """
+        Returns valid entries of ledger, ConfigMap is created if it doesn't
+        exist. Other entries are removed on the next sync.
+        """
+        records, _ = self._parse(self._config_map.read())
+        return records
+
+    def record(self, connector_type: str, fingerprint: str, record: ProvisioningRecord):
+        self._config_map.set(self.key(connector_type, fingerprint), self.dumps(record))
+
+    def forget(self, connector_type: str, fingerprint: str):
+        self._config_map.delete(self.key(connector_type, fingerprint))
+
+    def sync(self):
+        """
+        Writes pending changes to ConfigMap and reads invalidation
+        annotation in one request.
+        """
+        self._config_map.sync()
+
+    def start(self):
+        self._config_map.start()
+
+    def stop(self):
+        self._config_map.stop()
@@ -0,0 +1,155 @@
+import threading
+import time
+from typing import Any, Callable, Dict, NamedTuple, Optional, Tuple
+
+import settings as operator_settings
+from provisioning.dto import ProvisioningRecord
+from utils.cache import TTLCache, MISSING
+from utils.hashing import generate_hash
+
+MemoKey = Tuple[str, str]
+
+
+class MicroserviceSource(NamedTuple):
+    microservice: Any
+    # Generation of connector custom resources before connector custom
+    # resource of microservice is read
+    generation: int
+
+
+class MicroserviceRecord(NamedTuple):
+    # Memo entry of the last provisioning of microservice
+    fingerprint: str
+    get_secret_version: Callable[[], Optional[int]]
+    generation: int
+
+
+class ProvisioningMemo:
+    """
+    Memo of successfully provisioned connector sources.
+
+    Entry is keyed by connector type and fingerprint of connector custom
+    resource spec and microservice annotations, so any change of them
+    leads to provisioning again. Entry also keeps version of microservice
+    Vault secret, changed or deleted secret invalidates entry.
+
+    If ledger is attached, entries are also persisted in it, so operator
+    is started with memo loaded from ledger.
+
+    If microservice source is passed, memo entry is also recorded by
+    microservice DTO only, so pod admission finds it without connector
+    custom resource. Record is current while its memo entry is valid and
+    connector custom resources of its type are not changed, they are
+    counted by generation. Microservices provisioned in advance, e.g. on
+    creation of their Deployment, are ready if their record is current and
+    pre-provisioning is enabled.
+    """
+
+    def __init__(self, maxsize: int = operator_settings.PROVISIONING_MEMO_MAXSIZE,
+                 ttl: float = operator_settings.PROVISIONING_MEMO_TTL,
+                 pre_provisioning: bool = operator_settings.WORKLOAD_PRE_PROVISIONING):
+        self._cache = TTLCache(name='provisioning_memo', maxsize=maxsize, ttl=ttl)
+        self._microservices = TTLCache(name='provisioned_microservices', maxsize=maxsize, ttl=ttl)
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.pre_provisioning = pre_provisioning
+        self.ledger = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.ttl > 0
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        return generate_hash(*(repr(part) for part in parts))
+
+    def _invalidated_before(self) -> float:
+        return self.ledger.invalidated_before if self.ledger is not None else 0
+
+    def source(self, connector_type: str, microservice: Any) -> MicroserviceSource:
+        """Should be called before connector custom resource is read."""
+        with self._lock:
+            return MicroserviceSource(microservice, self._generations.get(connector_type, 0))
+
+    def source_changed(self, connector_type: str):
+        """Makes records of all microservices of connector type outdated."""
+        with self._lock:
+            self._generations[connector_type] = self._generations.get(connector_type, 0) + 1
+
+    def is_provisioned(self, connector_type: str, fingerprint: str,
+                       get_secret_version: Callable[[], Optional[int]],
+                       source: Optional[MicroserviceSource] = None) -> bool:
+        """Secret version is requested only if there is memo entry."""
+        if not self.enabled:
+            return False
+        record = self._cache.get((connector_type, fingerprint))
+        if record is MISSING:
+            return False
+        if record.provisioned_at < self._invalidated_before() \
+                or record.secret_version != get_secret_version():
+            self.invalidate(connector_type, fingerprint)
+            return False
+        if source is not None:
+            self._remember(connector_type, source, fingerprint, get_secret_version)
+        return True
+
+    def mark_provisioned(self, connector_type: str, fingerprint: str,
+                         get_secret_version: Callable[[], Optional[int]],
+                         source: Optional[MicroserviceSource] = None):
+        if not self.enabled:
+            return
+        version = get_secret_version()
+        if version is None:
+            return
+        record = ProvisioningRecord(secret_version=version, provisioned_at=time.time())
+        self._cache.set((connector_type, fingerprint), record)
+        if self.ledger is not None:
+            self.ledger.record(connector_type, fingerprint, record)
+        if source is not None:
+            self._remember(connector_type, source, fingerprint, get_secret_version)
+
+    def _remember(self, connector_type: str, source: MicroserviceSource, fingerprint: str,
+                  get_secret_version: Callable[[], Optional[int]]):
+        self._microservices.set(
+            (connector_type, self.fingerprint(source.microservice)),
+            MicroserviceRecord(fingerprint, get_secret_version, source.generation),
+        )
+
+    def invalidate(self, connector_type: str, fingerprint: str):
+        self._cache.pop((connector_type, fingerprint))
+        if self.ledger is not None:
+            self.ledger.forget(connector_type, fingerprint)
+
+    def is_current(self, connector_type: str, microservice: Any) -> bool:
+        """
+        Returns True if the last provisioning of microservice is still valid.
+        Secret version is requested as in `is_provisioned`.
+        """
+        if not self.enabled:
+            return False
+        key = (connector_type, self.fingerprint(microservice))
+        record = self._microservices.get(key)
+        if record is MISSING:
+            return False
+        with self._lock:
+            generation = self._generations.get(connector_type, 0)
+        if record.generation != generation \
+                or not self.is_provisioned(connector_type, record.fingerprint, record.get_secret_version):
+            self._microservices.pop(key)
+            return False
+        return True
+
+    def is_ready(self, connector_type: str, microservice: Any) -> bool:
+        """Returns True if microservice provisioned in advance may be admitted without provisioning."""
+        return self.pre_provisioning and self.is_current(connector_type, microservice)
+
+    def load(self, records: Dict[MemoKey, ProvisioningRecord]):
+        for key, record in records.items():
+            self._cache.set(key, record)
+
+    def clear(self):
+        self._cache.clear()
+        self._microservices.clear()
+
+
+provisioning_memo = ProvisioningMemo()
@@ -0,0 +1,281 @@
+import asyncio
+import contextvars
+import heapq
+import inspect
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+import kopf
+
+import settings as operator_settings
+from clients.k8s.configmap_sync import ConfigMapSync
+from exceptions import InfrastructureServiceProblem
+from observability.metrics.metrics import app_provisioning_jobs_total, app_provisioning_queue_depth, \
+    app_provisioning_job_age_seconds
+from provisioning.memo import ProvisioningMemo
+
+logger = logging.getLogger('provisioning_queue')
+
+# Provision function or coroutine function
+Provision = Callable[[Any], Any]
+
+
+class ProvisioningJob:
+    """
+    Provisioning of connector source described by microservice DTO.
+
+    Jobs with the same connector type and microservice DTO provision the
+    same source, so they have the same key.
+    """
+
+    def __init__(self, connector_type: str, microservice: Any, owner: Optional[dict] = None):
+        self.connector_type = connector_type
+        self.microservice = microservice
+        # Object that receives events about result of provisioning
+        self.owner = owner
+        self.key = ProvisioningMemo.fingerprint(connector_type, microservice)
+        self.attempt = 0
+        self.created_at = time.time()
+        # Context of kopf handler is kept to post events from worker threads
+        self.context = contextvars.copy_context()
+
+    @property
+    def reason(self) -> str:
+        return ''.join(part.capitalize() for part in self.connector_type.split('_'))
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f"{self.connector_type}.{self.key}"
+
+
+@dataclass(frozen=True)
+class QueuePolicy:
+    workers: int = operator_settings.PROVISIONING_QUEUE_WORKERS
+    retries: int = operator_settings.PROVISIONING_RETRIES
+    backoff: float = operator_settings.PROVISIONING_RETRY_BACKOFF
+
+
+class JobSchedule:
+    """Jobs ordered by time when they are ready to run."""
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, ProvisioningJob]] = []
+        # Jobs ready at the same time are run in order of submission
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, job: ProvisioningJob, ready_at: float):
+        heapq.heappush(self._heap, (ready_at, next(self._sequence), job))
+
+    def pop_ready(self) -> Tuple[Optional[ProvisioningJob], Optional[float]]:
+        """Returns ready job or None and time to wait for the next one."""
+        if not self._heap:
+            return None, None
+        timeout = self._heap[0][0] - time.monotonic()
+        if timeout <= 0:
+            return heapq.heappop(self._heap)[2], None
+        return None, timeout
+
+
+@dataclass
+class QueueWorkers:
+    threads: List[threading.Thread] = field(default_factory=list)
+    # Event loop of coroutine provision functions, started on first use
+    loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+class ProvisioningQueue:
+    """
+    Background provisioning of connectors with retries.
+
+    Job that failed with infrastructure problem is repeated with
+    exponential backoff and jitter up to `retries` times. Job of source that
+    is already queued is dropped. Result of job is posted as event of its
+    owner, e.g. Deployment of pod.
+
+    Connector types are registered with DTO class and provision function,
+    so job is plain data. If checkpoint is attached, queued jobs are kept
+    in it and restored after restart of operator.
+
+    Coroutine provision functions are run on event loop of queue, worker
+    only starts them, so their jobs are not limited by number of workers.
+    """
+
+    def __init__(self, workers: int = operator_settings.PROVISIONING_QUEUE_WORKERS,
+                 retries: int = operator_settings.PROVISIONING_RETRIES,
+                 backoff: float = operator_settings.PROVISIONING_RETRY_BACKOFF):
+        self.policy = QueuePolicy(workers, retries, backoff)
+        self.checkpoint: Optional[ConfigMapSync] = None
+        self._provisions: Dict[str, Tuple[Type, Provision]] = {}
+        self._jobs = JobSchedule()
+        # Queued and running jobs by key
+        self._pending: Dict[str, ProvisioningJob] = {}
+        self._cond = threading.Condition()
+        self._workers = QueueWorkers()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def register(self, connector_type: str, dto_class: Type, provision: Provision):
+        self._provisions[connector_type] = (dto_class, provision)
+
+    def submit(self, job: ProvisioningJob, delay: float = 0) -> bool:
+        """Returns False if job of the same source is already pending."""
+        with self._cond:
+            pending = self._pending.get(job.key)
+            if pending is not None and pending is not job:
+                app_provisioning_jobs_total.labels(connector_type=job.connector_type, result='deduplicated').inc()
+                return False
+            if pending is None:
+                self._pending[job.key] = job
+                app_provisioning_queue_depth.labels(connector_type=job.connector_type).inc()
+                if self.checkpoint is not None:
+                    self.checkpoint.set(job.checkpoint_key, self.dumps(job))
+            self._start_workers()
+            self._jobs.push(job, time.monotonic() + delay)
+            self._cond.notify()
+        return True
+
+    def backoff_delay(self, attempt: int) -> float:
+        delay = self.policy.backoff * 2 ** (attempt - 1)
+        # Jitter spreads retries of jobs that failed at the same time
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def retry(self, job: ProvisioningJob, error: Exception):
+        """Schedules next attempt of failed job if attempts are not exhausted."""
+        if job.attempt > self.policy.retries:
+            self.complete(job, error)
+            return
+        delay = self.backoff_delay(job.attempt)
+        app_provisioning_jobs_total.labels(connector_type=job.connector_type, result='retried').inc()
+        logger.warning(f"Provisioning of {job.connector_type} failed on attempt {job.attempt}, "
+                       f"it is repeated in {delay:.1f} seconds: {error}")
+        self.submit(job, delay)
+
+    def complete(self, job: ProvisioningJob, error: Optional[Exception] = None):
+        with self._cond:
+            if self._pending.get(job.key) is job:
+                del self._pending[job.key]
+                app_provisioning_queue_depth.labels(connector_type=job.connector_type).dec()
+                if self.checkpoint is not None:
+                    self.checkpoint.delete(job.checkpoint_key)
+        result = 'succeeded' if error is None else 'failed'
+        app_provisioning_jobs_total.labels(connector_type=job.connector_type, result=result).inc()
+        if error is None:
+            logger.info(f"Provisioning of {job.connector_type} is completed in background")
+            job.context.copy().run(self._post_event, job, 'Normal', 'Infrastructure is prepared in background')
+        else:
+            logger.error(f"Provisioning of {job.connector_type} failed", exc_info=error)
+            job.context.copy().run(self._post_event, job, 'Error', f'Infrastructure is not prepared: {error}')
+
+    @staticmethod
+    def dumps(job: ProvisioningJob) -> str:
+        return json.dumps({
+            'connectorType': job.connector_type,
+            'microservice': asdict(job.microservice),
+            'owner': job.owner,
+        })
+
+    def loads(self, value: str) -> ProvisioningJob:
+        data = json.loads(value)
+        dto_class, _ = self._provisions[data['connectorType']]
+        return ProvisioningJob(data['connectorType'], dto_class(**data['microservice']), owner=data['owner'])
+
+    def restore(self, checkpoint: ConfigMapSync) -> int:
+        """
+        Submits jobs kept in checkpoint and attaches it to queue. Returns
+        number of restored jobs, malformed and unknown jobs are removed.
+        """
+        config_map = checkpoint.read()
+        jobs = []
+        for key, value in (config_map.data or {}).items():
+            try:
+                job = self.loads(value)
+            except (ValueError, KeyError, TypeError):
+                logger.warning(f"Provisioning job `{key}` is not restored from checkpoint")
+                checkpoint.delete(key)
+                continue
+            if job.checkpoint_key != key:
+                # Key was computed for another version of DTO
+                checkpoint.delete(key)
+            jobs.append(job)
+        self.checkpoint = checkpoint
+        for job in jobs:
+            self.submit(job)
+        return len(jobs)
+
+    @staticmethod
+    def _post_event(job: ProvisioningJob, event_type: str, message: str):
+        if job.owner is None:
+            return
+        try:
+            kopf.event(job.owner, type=event_type, reason=job.reason, message=message)
+        except Exception as e:
+            logger.warning(f"Event of {job.connector_type} provisioning is not posted", exc_info=e)
+
+    def _start_workers(self):
+        threads = self._workers.threads
+        while len(threads) < self.policy.workers:
+            thread = threading.Thread(target=self._work, name=f'provisioning-queue-{len(threads)}', daemon=True)
+            threads.append(thread)
+            thread.start()
+
+    def _event_loop(self) -> asyncio.AbstractEventLoop:
+        with self._cond:
+            if self._workers.loop is None:
+                self._workers.loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._workers.loop.run_forever, name='provisioning-queue-loop', daemon=True
+                ).start()
+            return self._workers.loop
+
+    def _next_job(self) -> ProvisioningJob:
+        with self._cond:
+            while True:
+                job, timeout = self._jobs.pop_ready()
+                if job is not None:
+                    return job
+                self._cond.wait(timeout)
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            job.context.copy().run(self._run, job)
+
+    def _run(self, job: ProvisioningJob):
+        job.attempt += 1
+        app_provisioning_job_age_seconds.labels(connector_type=job.connector_type).observe(
+            time.time() - job.created_at
+        )
+        _, provision = self._provisions[job.connector_type]
+        if inspect.iscoroutinefunction(provision):
+            future = asyncio.run_coroutine_threadsafe(provision(job.microservice), self._event_loop())
+            future.add_done_callback(lambda f: job.context.copy().run(self._finish_future, job, f))
+            return
+        try:
+            provision(job.microservice)
+        except Exception as e:
+            self._finish(job, e)
+        else:
+            self._finish(job)
+
+    def _finish_future(self, job: ProvisioningJob, future: Future):
+        self._finish(job, CancelledError() if future.cancelled() else future.exception())
+
+    def _finish(self, job: ProvisioningJob, error: Optional[BaseException] = None):
+        if isinstance(error, InfrastructureServiceProblem):
+            self.retry(job, error)
+        else:
+            self.complete(job, error)
+
+
+provisioning_queue = ProvisioningQueue()
@@ -0,0 +1,149 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from kubernetes.client import ApiException, V1ConfigMap, V1ObjectMeta
+
+from exceptions import InfrastructureServiceProblem
+from provisioning.dto import ProvisioningRecord
+from provisioning.ledger import ProvisioningLedger, INVALIDATE_BEFORE_ANNOTATION, parse_invalidate_before
+from provisioning.memo import ProvisioningMemo
+
+
+def config_map(data: dict = None, annotations: dict = None) -> V1ConfigMap:
+    return V1ConfigMap(metadata=V1ObjectMeta(name='ledger', annotations=annotations), data=data)
+
+
+def entry(provisioned_ago: float = 0, version: int = 1) -> str:
+    return ProvisioningLedger.dumps(ProvisioningRecord(version, time.time() - provisioned_ago))
+
+
+@pytest.fixture
+def api(mocker):
+    api = MagicMock()
+    mocker.patch('clients.k8s.configmap_sync.client.CoreV1Api', return_value=api)
+    return api
+
+
+def create_ledger(**kwargs) -> ProvisioningLedger:
+    return ProvisioningLedger('ledger', namespace='operator', max_age=60, **kwargs)
+
+
+@pytest.mark.unit
+class TestProvisioningLedger:
+    def test_create_missing_ledger(self, api):
+        api.read_namespaced_config_map.side_effect = ApiException(status=404)
+        api.create_namespaced_config_map.return_value = config_map()
+
+        assert create_ledger().load() == {}
+        api.create_namespaced_config_map.assert_called_once()
+
+    def test_load_valid_entries(self, api):
+        api.read_namespaced_config_map.return_value = config_map({
+            'postgres_connector.valid': entry(version=3),
+            'postgres_connector.expired': entry(provisioned_ago=120),
+            'postgres_connector.malformed': 'not json',
+        })
+        ledger = create_ledger()
+
+        records = ledger.load()
+
+        assert list(records) == [('postgres_connector', 'valid')]
+        assert records[('postgres_connector', 'valid')].secret_version == 3
+        ledger.sync()
+        api.patch_namespaced_config_map.assert_called_once_with('ledger', 'operator', {'data': {
+            'postgres_connector.expired': None,
+            'postgres_connector.malformed': None,
+        }})
+
+    def test_load_keeps_newest_entries(self, api):
+        api.read_namespaced_config_map.return_value = config_map({
+            'rabbit_connector.old': entry(provisioned_ago=10),
+            'rabbit_connector.new': entry(provisioned_ago=1),
+        })
+
+        records = create_ledger(max_entries=1).load()
+
+        assert list(records) == [('rabbit_connector', 'new')]
+
+    def test_skip_invalidated_entries(self, api):
+        api.read_namespaced_config_map.return_value = config_map(
+            {'sentry_connector.fingerprint': entry(provisioned_ago=10)},
+            annotations={INVALIDATE_BEFORE_ANNOTATION: str(time.time() - 5)},
+        )
+
+        assert create_ledger().load() == {}
+
+    def test_sync_writes_pending_changes(self, api):
+        api.patch_namespaced_config_map.return_value = config_map()
+        ledger = create_ledger()
+        record = ProvisioningRecord(secret_version=1, provisioned_at=100.0)
+        ledger.record('keycloak_connector', 'new', record)
+        ledger.forget('keycloak_connector', 'old')
+
+        ledger.sync()
+        ledger.sync()
+
+        api.patch_namespaced_config_map.assert_called_once_with('ledger', 'operator', {'data': {
+            'keycloak_connector.new': ProvisioningLedger.dumps(record),
+            'keycloak_connector.old': None,
+        }})
+
+    def test_sync_removes_stale_entries(self, api):
+        api.patch_namespaced_config_map.return_value = config_map({
+            'rabbit_connector.expired': entry(provisioned_ago=120),
+            'rabbit_connector.old': entry(provisioned_ago=10),
+            'rabbit_connector.new': entry(provisioned_ago=1),
+            'rabbit_connector.recorded': entry(provisioned_ago=120),
+        })
+        api.read_namespaced_config_map.return_value = config_map()
+        ledger = create_ledger(max_entries=1)
+        ledger.forget('rabbit_connector', 'forgotten')
+
+        ledger.sync()
+        # Entry recorded again after the last sync is not removed
+        record = ProvisioningRecord(secret_version=1, provisioned_at=time.time())
+        ledger.record('rabbit_connector', 'recorded', record)
+        ledger.sync()
+
+        assert api.patch_namespaced_config_map.call_args.args[2] == {'data': {
+            'rabbit_connector.expired': None,
+            'rabbit_connector.old': None,
+            'rabbit_connector.recorded': ProvisioningLedger.dumps(record),
+        }}
+
+    def test_failed_sync_is_repeated(self, api):
+        api.patch_namespaced_config_map.side_effect = [ApiException(status=500), config_map()]
+        ledger = create_ledger()
+        ledger.forget('keycloak_connector', 'old')
+
+        with pytest.raises(InfrastructureServiceProblem):
+            ledger.sync()
+        ledger.sync()
+
+        assert api.patch_namespaced_config_map.call_count == 2
+
+    def test_memo_is_invalidated_by_annotation(self, api):
+        api.patch_namespaced_config_map.return_value = config_map(
+            annotations={INVALIDATE_BEFORE_ANNOTATION: str(time.time() + 5)}
+        )
+        memo = ProvisioningMemo(maxsize=10, ttl=60)
+        memo.ledger = create_ledger()
+        memo.mark_provisioned('postgres_connector', 'fingerprint', lambda: 1)
+        assert memo.is_provisioned('postgres_connector', 'fingerprint', lambda: 1)
+
+        memo.ledger.sync()
+
+        assert not memo.is_provisioned('postgres_connector', 'fingerprint', lambda: 1)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value, expected", [
+    (None, 0),
+    ("1672531200", 1672531200),
+    ("2023-01-01T00:00:00Z", 1672531200),
+    ("2023-01-01T00:00:00", 1672531200),
+    ("yesterday", 0),
+])
+def test_parse_invalidate_before(value, expected):
+    assert parse_invalidate_before(value) == expected
@@ -0,0 +1,110 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from provisioning.memo import ProvisioningMemo
+
+
+@pytest.mark.unit
+class TestProvisioningMemo:
+    connector_type = "postgres_connector"
+
+    def test_not_provisioned_without_entry(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60)
+        get_secret_version = MagicMock(return_value=1)
+
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", get_secret_version)
+        get_secret_version.assert_not_called()
+
+    def test_provisioned_with_same_secret_version(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1)
+
+        assert memo.is_provisioned(self.connector_type, "fingerprint", lambda: 1)
+        assert not memo.is_provisioned("rabbit_connector", "fingerprint", lambda: 1)
+        assert not memo.is_provisioned(self.connector_type, "another", lambda: 1)
+
+    def test_changed_secret_version_invalidates_entry(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1)
+
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", lambda: 2)
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", lambda: 1)
+
+    def test_deleted_secret_is_not_memoized(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: None)
+
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", lambda: None)
+
+    def test_disabled_memo(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=0)
+        get_secret_version = MagicMock(return_value=1)
+        memo.mark_provisioned(self.connector_type, "fingerprint", get_secret_version)
+
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", get_secret_version)
+        get_secret_version.assert_not_called()
+
+    def test_fingerprint_depends_on_parts(self):
+        assert ProvisioningMemo.fingerprint("a", "b") == ProvisioningMemo.fingerprint("a", "b")
+        assert ProvisioningMemo.fingerprint("a", "b") != ProvisioningMemo.fingerprint("a", "c")
+
+    def test_microservice_is_ready(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+
+        assert memo.is_ready(self.connector_type, {"db_name": "app"})
+        assert not memo.is_ready(self.connector_type, {"db_name": "other"})
+        assert not memo.is_ready("rabbit_connector", {"db_name": "app"})
+
+    def test_microservice_is_not_ready_without_pre_provisioning(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=False)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+
+        assert not memo.is_ready(self.connector_type, {"db_name": "app"})
+        assert memo.is_current(self.connector_type, {"db_name": "app"})
+
+    def test_rotated_secret_makes_microservice_not_ready(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        get_secret_version = MagicMock(return_value=1)
+        memo.is_provisioned(self.connector_type, "fingerprint", get_secret_version)
+        memo.mark_provisioned(self.connector_type, "fingerprint", get_secret_version,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+
+        get_secret_version.return_value = 2
+
+        assert not memo.is_ready(self.connector_type, {"db_name": "app"})
+        assert not memo.is_provisioned(self.connector_type, "fingerprint", get_secret_version)
+
+    def test_changed_custom_resource_makes_microservice_not_ready(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        source = memo.source(self.connector_type, {"db_name": "app"})
+        # Custom resource is changed while microservice is provisioned
+        memo.source_changed(self.connector_type)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1, source)
+
+        assert not memo.is_ready(self.connector_type, {"db_name": "app"})
+
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+        assert memo.is_ready(self.connector_type, {"db_name": "app"})
+        memo.source_changed("rabbit_connector")
+        assert memo.is_ready(self.connector_type, {"db_name": "app"})
+
+    def test_invalidated_memo_makes_microservice_not_ready(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=60, pre_provisioning=True)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+        memo.ledger = MagicMock(invalidated_before=time.time() + 1)
+
+        assert not memo.is_ready(self.connector_type, {"db_name": "app"})
+
+    def test_disabled_memo_is_never_ready(self):
+        memo = ProvisioningMemo(maxsize=10, ttl=0, pre_provisioning=True)
+        memo.mark_provisioned(self.connector_type, "fingerprint", lambda: 1,
+                              memo.source(self.connector_type, {"db_name": "app"}))
+
+        assert not memo.is_ready(self.connector_type, {"db_name": "app"})
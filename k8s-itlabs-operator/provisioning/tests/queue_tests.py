@@ -0,0 +1,171 @@
+import json
+import threading
+from dataclasses import dataclass
+from unittest.mock import MagicMock
+
+import pytest
+
+from exceptions import InfrastructureServiceProblem
+from provisioning.queue import ProvisioningJob, ProvisioningQueue
+
+
+@dataclass
+class MicroserviceDto:
+    name: str
+
+
+def run_job(queue: ProvisioningQueue, provision, timeout: float = 5) -> ProvisioningJob:
+    completed = threading.Event()
+    complete = queue.complete
+
+    def on_complete(job, error=None):
+        complete(job, error)
+        on_complete.error = error
+        completed.set()
+
+    queue.complete = on_complete
+    queue.register('postgres_connector', MicroserviceDto, provision)
+    job = ProvisioningJob('postgres_connector', MicroserviceDto('app'), owner=None)
+    queue.submit(job)
+    assert completed.wait(timeout)
+    job.error = on_complete.error
+    return job
+
+
+@pytest.mark.unit
+class TestProvisioningQueue:
+    def test_successful_job(self):
+        provision = MagicMock()
+
+        job = run_job(ProvisioningQueue(workers=1, retries=3, backoff=0), provision)
+
+        assert job.error is None
+        assert job.attempt == 1
+        provision.assert_called_once_with(MicroserviceDto('app'))
+
+    def test_retry_infrastructure_problem(self):
+        error = InfrastructureServiceProblem('Postgres', Exception())
+        provision = MagicMock(side_effect=[error, error, None])
+
+        job = run_job(ProvisioningQueue(workers=2, retries=3, backoff=0), provision)
+
+        assert job.error is None
+        assert job.attempt == 3
+
+    def test_retries_are_exhausted(self):
+        error = InfrastructureServiceProblem('Postgres', Exception())
+        provision = MagicMock(side_effect=error)
+
+        job = run_job(ProvisioningQueue(workers=1, retries=2, backoff=0), provision)
+
+        assert job.error is error
+        assert provision.call_count == 3
+
+    def test_other_errors_are_not_retried(self):
+        error = ValueError()
+        provision = MagicMock(side_effect=error)
+
+        job = run_job(ProvisioningQueue(workers=1, retries=2, backoff=0), provision)
+
+        assert job.error is error
+        provision.assert_called_once()
+
+    def test_coroutine_provision_is_run_on_event_loop(self):
+        error = InfrastructureServiceProblem('Postgres', Exception())
+        threads = []
+
+        async def provision(microservice):
+            threads.append(threading.current_thread().name)
+            if len(threads) == 1:
+                raise error
+
+        job = run_job(ProvisioningQueue(workers=1, retries=3, backoff=0), provision)
+
+        assert job.error is None
+        assert job.attempt == 2
+        assert threads == ['provisioning-queue-loop'] * 2
+
+    def test_event_is_posted_to_owner(self, mocker):
+        event = mocker.patch('provisioning.queue.kopf.event')
+        owner = {'apiVersion': 'apps/v1', 'kind': 'ReplicaSet', 'metadata': {'name': 'app'}}
+        job = ProvisioningJob('postgres_connector', MicroserviceDto('app'), owner=owner)
+
+        ProvisioningQueue(workers=1).complete(job)
+
+        event.assert_called_once()
+        assert event.call_args.args[0] is owner
+        assert event.call_args.kwargs['reason'] == 'PostgresConnector'
+
+    def test_jobs_of_the_same_source_are_deduplicated(self):
+        queue = ProvisioningQueue(workers=0)
+
+        assert queue.submit(ProvisioningJob('postgres_connector', MicroserviceDto('app')))
+        assert not queue.submit(ProvisioningJob('postgres_connector', MicroserviceDto('app')))
+        assert queue.submit(ProvisioningJob('postgres_connector', MicroserviceDto('other')))
+        assert len(queue) == 2
+
+    def test_retried_job_is_not_deduplicated(self):
+        queue = ProvisioningQueue(workers=0, retries=3, backoff=0)
+        job = ProvisioningJob('postgres_connector', MicroserviceDto('app'))
+        queue.submit(job)
+        job.attempt = 1
+
+        queue.retry(job, InfrastructureServiceProblem('Postgres', Exception()))
+
+        assert len(queue._jobs) == 2
+
+    def test_completed_job_is_removed(self):
+        queue = ProvisioningQueue(workers=0)
+        job = ProvisioningJob('postgres_connector', MicroserviceDto('app'))
+        queue.submit(job)
+
+        queue.complete(job)
+
+        assert len(queue) == 0
+        assert queue.submit(ProvisioningJob('postgres_connector', MicroserviceDto('app')))
+
+    def test_backoff_delay_with_jitter(self):
+        queue = ProvisioningQueue(workers=0, backoff=2)
+
+        for attempt, delay in ((1, 2), (2, 4), (3, 8)):
+            assert delay / 2 <= queue.backoff_delay(attempt) <= delay
+
+
+@pytest.mark.unit
+class TestProvisioningQueueCheckpoint:
+    def test_pending_jobs_are_checkpointed(self):
+        queue = ProvisioningQueue(workers=0)
+        queue.register('postgres_connector', MicroserviceDto, MagicMock())
+        queue.checkpoint = MagicMock()
+        job = ProvisioningJob('postgres_connector', MicroserviceDto('app'), owner={'kind': 'ReplicaSet'})
+
+        queue.submit(job)
+        queue.complete(job)
+
+        key, value = queue.checkpoint.set.call_args.args
+        assert key == job.checkpoint_key
+        assert json.loads(value) == {
+            'connectorType': 'postgres_connector',
+            'microservice': {'name': 'app'},
+            'owner': {'kind': 'ReplicaSet'},
+        }
+        queue.checkpoint.delete.assert_called_once_with(job.checkpoint_key)
+
+    def test_jobs_are_restored(self):
+        queue = ProvisioningQueue(workers=0)
+        queue.register('postgres_connector', MicroserviceDto, MagicMock())
+        job = ProvisioningJob('postgres_connector', MicroserviceDto('app'))
+        checkpoint = MagicMock()
+        checkpoint.read.return_value.data = {
+            job.checkpoint_key: queue.dumps(job),
+            'unknown_connector.key': json.dumps({'connectorType': 'unknown_connector'}),
+            'postgres_connector.key': 'malformed',
+        }
+
+        assert queue.restore(checkpoint) == 1
+
+        assert len(queue) == 1
+        assert queue.checkpoint is checkpoint
+        assert queue._pending[job.key].microservice == MicroserviceDto('app')
+        deleted = {call.args[0] for call in checkpoint.delete.call_args_list}
+        assert deleted == {'unknown_connector.key', 'postgres_connector.key'}
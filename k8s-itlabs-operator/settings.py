@@ -1,4 +1,5 @@
 from os import getenv
+from socket import gethostname
 
 ENVIRONMENT = getenv("ENVIRONMENT", "development")
 OPERATOR_NAMESPACE = getenv("OPERATOR_NAMESPACE", "k8s-itlabs-operator")
@@ -13,3 +14,83 @@ CLUSTER_NAME = getenv("CLUSTER_NAME", "unknown")
 SENTRY_DSN = getenv("SENTRY_DSN")
 
 LOG_LEVEL = getenv("LOG_LEVEL", "DEBUG")
+
+# Pooled HTTP sessions of infrastructure clients
+HTTP_POOL_CONNECTIONS = int(getenv("HTTP_POOL_CONNECTIONS", "10"))
+HTTP_POOL_MAXSIZE = int(getenv("HTTP_POOL_MAXSIZE", "10"))
+# Retries of idempotent GET requests on connection errors and 502, 503, 504
+HTTP_RETRIES = int(getenv("HTTP_RETRIES", "3"))
+HTTP_RETRY_BACKOFF = float(getenv("HTTP_RETRY_BACKOFF", "0.3"))
+
+# Max time of waiting for connector source lock, seconds. Wait without limit if not set
+CONNECTOR_SOURCE_LOCK_TIMEOUT = float(getenv("CONNECTOR_SOURCE_LOCK_TIMEOUT")) \
+    if getenv("CONNECTOR_SOURCE_LOCK_TIMEOUT") else None
+
+# Backend of connector source lock: `local` serializes threads of one replica,
+# `lease` also serializes replicas with coordination.k8s.io/v1 Lease objects
+CONNECTOR_SOURCE_LOCK_BACKEND = getenv("CONNECTOR_SOURCE_LOCK_BACKEND", "local")
+LEASE_HOLDER_IDENTITY = getenv("POD_NAME") or gethostname()
+# Lease not renewed for this time is taken over by another replica, seconds
+LEASE_DURATION = int(getenv("LEASE_DURATION", "15"))
+LEASE_RENEW_INTERVAL = float(getenv("LEASE_RENEW_INTERVAL", "5"))
+LEASE_RETRY_INTERVAL = float(getenv("LEASE_RETRY_INTERVAL", "0.5"))
+
+# Result of provisioning of connector source is reused by callers that came
+# during this time after provisioning completion, seconds
+SINGLE_FLIGHT_SHARE_WINDOW = float(getenv("SINGLE_FLIGHT_SHARE_WINDOW", "2"))
+
+# Memo of provisioned connector sources, repeat admissions of provisioned
+# microservice skip infrastructure. Set TTL to 0 to disable memo. Connector CR
+# and Vault secret of microservice are not checked again until its entry expires,
+# so their removal is noticed on admission up to TTL seconds later
+PROVISIONING_MEMO_TTL = float(getenv("PROVISIONING_MEMO_TTL", "300"))
+PROVISIONING_MEMO_MAXSIZE = int(getenv("PROVISIONING_MEMO_MAXSIZE", "1024"))
+
+# ConfigMap in operator namespace that keeps memo of provisioned connector
+# sources between restarts of operator. Set empty name to disable ledger
+PROVISIONING_LEDGER_NAME = getenv("PROVISIONING_LEDGER_NAME", "k8s-itlabs-operator-provisioning-ledger")
+# Entries older than max age are not loaded and removed from ledger, seconds
+PROVISIONING_LEDGER_MAX_AGE = float(getenv("PROVISIONING_LEDGER_MAX_AGE", "86400"))
+PROVISIONING_LEDGER_SYNC_INTERVAL = float(getenv("PROVISIONING_LEDGER_SYNC_INTERVAL", "10"))
+
+# Connectors of pod template are provisioned on creation and change of Deployments,
+# StatefulSets, Jobs and CronJobs, so their pods are admitted without provisioning.
+# Only templates with connector annotations out of WEBHOOK_EXCLUDED_NAMESPACES are
+# handled. Pods admitted within PROVISIONING_MEMO_TTL skip provisioning while Vault
+# secret version is the same and connector CRs are not changed, see memo above
+WORKLOAD_PRE_PROVISIONING = getenv("WORKLOAD_PRE_PROVISIONING", "false") == "true"
+
+# Number of threads that provision connectors of admitted pods concurrently
+POD_CONNECTORS_WORKERS = int(getenv("POD_CONNECTORS_WORKERS", "8"))
+# Provisioning of admitted pods waiting for free thread. Provisioning over it is
+# passed to background queue at once, env vars of pod are injected anyway
+POD_CONNECTORS_BACKLOG = int(getenv("POD_CONNECTORS_BACKLOG", "64"))
+# Patches of pods with the same connector annotations, labels and env names of
+# containers, e.g. pods of one ReplicaSet. Entries expire with provisioning memo
+POD_PATCH_CACHE_MAXSIZE = int(getenv("POD_PATCH_CACHE_MAXSIZE", "1024"))
+
+# Selectors of generated admission webhook configuration (operators/webhookconfig.py).
+# Pods labeled `<WEBHOOK_POD_LABEL>: "false"` are never sent to operator. If opt-in
+# is enabled, only pods labeled `<WEBHOOK_POD_LABEL>: "true"` are sent
+WEBHOOK_POD_LABEL = getenv("WEBHOOK_POD_LABEL", "connectors.itlabs.io/enabled")
+WEBHOOK_POD_OPT_IN = getenv("WEBHOOK_POD_OPT_IN", "false") == "true"
+# Only pods of namespaces labeled `<WEBHOOK_NAMESPACE_LABEL>: "true"` are sent if set
+WEBHOOK_NAMESPACE_LABEL = getenv("WEBHOOK_NAMESPACE_LABEL", "")
+WEBHOOK_EXCLUDED_NAMESPACES = [
+    namespace for namespace in getenv("WEBHOOK_EXCLUDED_NAMESPACES", "kube-system,vswh,k8s-itlabs-operator").split(",")
+    if namespace
+]
+WEBHOOK_TIMEOUT = int(getenv("WEBHOOK_TIMEOUT", "30"))
+
+# Time of pod admission for provisioning of its connectors, seconds. Must be less
+# than webhook timeout. Provisioning that is not completed in time is finished in
+# background, env vars of pod are injected anyway
+ADMISSION_DEADLINE = float(getenv("ADMISSION_DEADLINE", "20"))
+# Background provisioning of connectors that failed with infrastructure problems
+PROVISIONING_QUEUE_WORKERS = int(getenv("PROVISIONING_QUEUE_WORKERS", "2"))
+PROVISIONING_RETRIES = int(getenv("PROVISIONING_RETRIES", "5"))
+# Delay before the first retry, it is doubled for every next retry, seconds
+PROVISIONING_RETRY_BACKOFF = float(getenv("PROVISIONING_RETRY_BACKOFF", "2"))
+# ConfigMap in operator namespace that keeps queued provisioning jobs between
+# restarts of operator. Checkpoint is disabled by default
+PROVISIONING_QUEUE_CHECKPOINT = getenv("PROVISIONING_QUEUE_CHECKPOINT", "")
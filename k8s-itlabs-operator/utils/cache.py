@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from observability.metrics.metrics import app_cache_events_total
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Thread-safe bounded LRU cache with expiration time for every entry.
+
+    `get` returns `MISSING` if key is not cached, so `None` could be cached
+    as a regular value. Hits, misses and evictions are counted in
+    `app_cache_events_total` with label `cache` equal to cache name.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        if maxsize <= 0:
+            raise ValueError(f"Cache size must be greater than zero '{maxsize}'")
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _count(self, event: str):
+        app_cache_events_total.labels(cache=self.name, event=event).inc()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self._count('miss')
+                return MISSING
+            expires_at, value = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self._count('expired')
+                self._count('miss')
+                return MISSING
+            self._data.move_to_end(key)
+            self._count('hit')
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._count('eviction')
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return MISSING if item is None else item[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            item = self._data.get(key)
+            return item is not None and item[0] > time.monotonic()
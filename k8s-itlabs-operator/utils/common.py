@@ -43,6 +43,38 @@ def get_owner_reference(body: dict) -> Optional[OwnerReferenceDto]:
         return None
 
 
+def get_owner_object(body: dict) -> Optional[dict]:
+    """Returns the first owner of object in form accepted by `kopf.event`."""
+    metadata = body.get("metadata", {})
+    try:
+        owner = metadata.get("ownerReferences", [])[0]
+    except IndexError:
+        return None
+    return {
+        "apiVersion": owner.get("apiVersion"),
+        "kind": owner.get("kind"),
+        "metadata": {
+            "name": owner.get("name"),
+            "namespace": metadata.get("namespace"),
+            "uid": owner.get("uid"),
+        },
+    }
+
+
+def get_object_reference(body: dict) -> dict:
+    """Returns reference to object in form accepted by `kopf.event`."""
+    metadata = body.get("metadata", {})
+    return {
+        "apiVersion": body.get("apiVersion"),
+        "kind": body.get("kind"),
+        "metadata": {
+            "name": metadata.get("name"),
+            "namespace": metadata.get("namespace"),
+            "uid": metadata.get("uid"),
+        },
+    }
+
+
 def join(base: str, url: str):
     if not base.endswith('/'):
         base += '/'
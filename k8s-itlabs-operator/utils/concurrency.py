@@ -1,23 +1,196 @@
-from threading import Condition
-from typing import List
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future
+from typing import Callable, Deque, Dict, Optional
+
+import settings as operator_settings
+from clients.k8s.lease_lock import LeaseLock, LeaseLockTimeout
+from observability.metrics.metrics import app_connector_source_lock_wait_seconds, \
+    app_connector_source_lock_hold_seconds
+
+
+class ConnectorSourceLockTimeout(TimeoutError):
+    pass
+
+
+class ConnectorSourceLockLost(RuntimeError):
+    pass
+
+
+class _SourceLockState:
+    __slots__ = ('locked', 'waiters', 'users', 'lease')
+
+    def __init__(self):
+        self.locked = False
+        self.waiters: Deque[threading.Event] = deque()
+        # Lease of source held by this replica, it is passed to local waiters
+        # together with lock, so only the first holder requests Kubernetes
+        self.lease: Optional[LeaseLock] = None
+        # Holder and waiters, key is removed from registry at zero
+        self.users = 0
 
 
 class ConnectorSourceLock:
-    _lock = Condition()
-    _lock_sources: List[str] = []
+    """
+    Lock of connector source (e.g. database or vhost) identified by hash.
+
+    Every source hash has its own lock that is given to waiters in FIFO
+    order: releasing holder wakes up and passes ownership to the first
+    waiter of the same hash. Lock of hash is removed as soon as there are
+    no holder and waiters.
 
-    def __init__(self, source_hash: str):
+    With `lease` backend lock is also shared between operator replicas:
+    holder of local lock acquires Lease of source hash, while other threads
+    of the replica wait locally.
+    """
+    _registry_lock = threading.Lock()
+    _sources: Dict[str, _SourceLockState] = {}
+
+    def __init__(self, source_hash: str, connector_type: str = 'unknown',
+                 timeout: Optional[float] = operator_settings.CONNECTOR_SOURCE_LOCK_TIMEOUT,
+                 backend: str = operator_settings.CONNECTOR_SOURCE_LOCK_BACKEND):
         self.source_hash = source_hash
+        self.connector_type = connector_type
+        self.timeout = timeout
+        self.backend = backend
+        self._acquired_at: Optional[float] = None
 
     def __enter__(self):
-        with self._lock:
-            self._lock.wait_for(self.is_source_unlocked)
-            self._lock_sources.append(self.source_hash)
+        self.acquire()
+        return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+    def acquire(self):
+        started_at = time.monotonic()
+        with self._registry_lock:
+            state = self._sources.get(self.source_hash)
+            if state is None:
+                state = self._sources[self.source_hash] = _SourceLockState()
+            state.users += 1
+            if not state.locked:
+                state.locked = True
+                waiter = None
+            else:
+                waiter = threading.Event()
+                state.waiters.append(waiter)
+
+        if waiter is not None and not waiter.wait(self.timeout):
+            with self._registry_lock:
+                # Ownership could be passed right after timeout
+                if not waiter.is_set():
+                    state.waiters.remove(waiter)
+                    self._leave(state)
+                    raise ConnectorSourceLockTimeout(
+                        f"Source lock `{self.source_hash}` is not acquired in {self.timeout} seconds"
+                    )
+
+        if self.backend == 'lease' and state.lease is None:
+            try:
+                state.lease = self._acquire_lease(started_at)
+            except BaseException:
+                self._unlock(state)
+                raise
+        self._on_acquired(started_at)
+
+    def _acquire_lease(self, started_at: float) -> LeaseLock:
+        lease = LeaseLock(name=f'connector-source-{self.source_hash}')
+        timeout = None if self.timeout is None else max(self.timeout - (time.monotonic() - started_at), 0)
+        try:
+            lease.acquire(timeout=timeout)
+        except LeaseLockTimeout as e:
+            raise ConnectorSourceLockTimeout(str(e)) from e
+        return lease
+
+    def release(self):
+        if self._acquired_at is not None:
+            app_connector_source_lock_hold_seconds.labels(connector_type=self.connector_type) \
+                .observe(time.monotonic() - self._acquired_at)
+            self._acquired_at = None
+        with self._registry_lock:
+            state = self._sources[self.source_hash]
+            is_lost = state.lease is not None and state.lease.is_lost
+        self._unlock(state)
+        if is_lost:
+            # Another replica could work with the source at the same time,
+            # so work is failed to be retried
+            raise ConnectorSourceLockLost(f"Lease of source `{self.source_hash}` was lost while lock was held")
+
+    def _unlock(self, state: _SourceLockState):
+        while True:
+            with self._registry_lock:
+                lease = state.lease
+                if lease is None or (state.waiters and not lease.is_lost):
+                    if state.waiters:
+                        # Lock stays locked and is owned by the first waiter now,
+                        # lease of replica is passed together with it
+                        state.waiters.popleft().set()
+                    else:
+                        state.locked = False
+                    self._leave(state)
+                    return
+                state.lease = None
+            # Lease is released while local lock is still held, so another
+            # thread of replica can't take over the lease being deleted. Waiters
+            # are checked again after that, as they could come or leave meanwhile
+            try:
+                lease.release()
+            except BaseException:
+                self._unlock(state)
+                raise
+
+    def _on_acquired(self, started_at: float):
+        self._acquired_at = time.monotonic()
+        app_connector_source_lock_wait_seconds.labels(connector_type=self.connector_type) \
+            .observe(self._acquired_at - started_at)
+
+    def _leave(self, state: _SourceLockState):
+        state.users -= 1
+        if state.users == 0:
+            del self._sources[self.source_hash]
+
+    def is_source_unlocked(self) -> bool:
+        with self._registry_lock:
+            state = self._sources.get(self.source_hash)
+            return state is None or not state.locked
+
+
+class BoundedExecutor:
+    """
+    Executor that keeps no more than `backlog` calls submitted and not
+    finished yet. Call over it is not submitted, so caller may pass it
+    elsewhere instead of waiting behind the whole queue of executor.
+    """
+
+    def __init__(self, executor: Executor, backlog: Optional[int] = None):
+        self.executor = executor
+        self.backlog = backlog
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """Returns future of call or None if backlog is full."""
+        with self._lock:
+            if self.backlog is not None and self._pending >= self.backlog:
+                return None
+            self._pending += 1
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._on_done(None)
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, _):
         with self._lock:
-            self._lock_sources.remove(self.source_hash)
-            self._lock.notify()
+            self._pending -= 1
 
-    def is_source_unlocked(self):
-        return self.source_hash not in self._lock_sources
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -0,0 +1,86 @@
+import threading
+from functools import lru_cache
+from typing import Dict, Type
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+import settings as operator_settings
+from observability.metrics.metrics import app_http_client_requests_total, app_http_client_connections_total
+
+
+@lru_cache(maxsize=None)
+def _metered_pool_class(pool_class: Type[HTTPConnectionPool], client: str) -> Type[HTTPConnectionPool]:
+    counter = app_http_client_connections_total.labels(client=client)
+
+    class MeteredConnectionPool(pool_class):
+        def _new_conn(self):
+            counter.inc()
+            return super()._new_conn()
+
+    return MeteredConnectionPool
+
+
+class MeteredHTTPAdapter(HTTPAdapter):
+    """
+    HTTP adapter that counts sent requests and opened connections, so
+    connection reuse ratio of client could be calculated as
+    1 - connections / requests.
+    """
+
+    def __init__(self, client: str, **kwargs):
+        self.client = client
+        self._requests_counter = app_http_client_requests_total.labels(client=client)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _metered_pool_class(HTTPConnectionPool, self.client),
+            'https': _metered_pool_class(HTTPSConnectionPool, self.client),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self._requests_counter.inc()
+        return super().send(request, *args, **kwargs)
+
+
+def create_session(client: str) -> requests.Session:
+    """
+    Returns session with keep-alive connections pooled per host. Only
+    idempotent GET requests are retried with backoff.
+    """
+    retries = Retry(
+        total=operator_settings.HTTP_RETRIES,
+        backoff_factor=operator_settings.HTTP_RETRY_BACKOFF,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({'GET'}),
+        raise_on_status=False,
+    )
+    adapter = MeteredHTTPAdapter(
+        client=client,
+        pool_connections=operator_settings.HTTP_POOL_CONNECTIONS,
+        pool_maxsize=operator_settings.HTTP_POOL_MAXSIZE,
+        max_retries=retries,
+    )
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(client: str) -> requests.Session:
+    """Returns process-wide session of infrastructure client."""
+    session = _sessions.get(client)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(client)
+            if session is None:
+                session = _sessions[client] = create_session(client)
+    return session
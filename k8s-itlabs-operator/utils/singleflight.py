@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+import settings as operator_settings
+from observability.metrics.metrics import app_single_flight_calls_total
+
+T = TypeVar('T')
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error', 'finished_at')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs
+    the function, others wait and get its result or exception.
+
+    Successful result is also given to callers that come during
+    `share_window` seconds after completion. Exception is shared only with
+    callers that were waiting, so the next call runs the function again.
+    """
+
+    def __init__(self, name: str, share_window: float = operator_settings.SINGLE_FLIGHT_SHARE_WINDOW):
+        self.name = name
+        self.share_window = share_window
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def _is_shareable(self, call: _Call, now: float) -> bool:
+        if not call.done.is_set():
+            return True
+        return call.error is None and call.finished_at + self.share_window > now
+
+    def _prune(self, now: float):
+        for key in [k for k, call in self._calls.items() if not self._is_shareable(call, now)]:
+            del self._calls[key]
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        with self._lock:
+            self._prune(time.monotonic())
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            app_single_flight_calls_total.labels(name=self.name, role='shared').inc()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        app_single_flight_calls_total.labels(name=self.name, role='leader').inc()
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            call.finished_at = time.monotonic()
+            with self._lock:
+                is_expired = call.error is not None or self.share_window <= 0
+                if is_expired and self._calls.get(key) is call:
+                    del self._calls[key]
+            call.done.set()
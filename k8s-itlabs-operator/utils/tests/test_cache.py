@@ -0,0 +1,37 @@
+import pytest
+
+from utils.cache import TTLCache, MISSING
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    def test_get_missing_key(self):
+        cache = TTLCache(name="test", maxsize=2, ttl=60)
+        assert cache.get("key") is MISSING
+
+    def test_cache_none_value(self):
+        cache = TTLCache(name="test", maxsize=2, ttl=60)
+        cache.set("key", None)
+        assert cache.get("key") is None
+
+    def test_expired_value(self):
+        cache = TTLCache(name="test", maxsize=2, ttl=60)
+        cache.set("key", "value", ttl=0)
+        assert cache.get("key") is MISSING
+        assert len(cache) == 0
+
+    def test_evict_least_recently_used(self):
+        cache = TTLCache(name="test", maxsize=2, ttl=60)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+        cache.set("third", 3)
+        assert cache.get("first") == 1
+        assert cache.get("second") is MISSING
+        assert cache.get("third") == 3
+
+    def test_pop(self):
+        cache = TTLCache(name="test", maxsize=2, ttl=60)
+        cache.set("key", "value")
+        assert cache.pop("key") == "value"
+        assert cache.pop("key") is MISSING
@@ -1,6 +1,6 @@
 import pytest
 
-from utils.common import get_owner_reference, OwnerReferenceDto
+from utils.common import get_owner_reference, get_owner_object, get_object_reference, OwnerReferenceDto
 
 
 @pytest.mark.unit
@@ -37,3 +37,47 @@ class TestGettingOwnerName:
     def test_return_none_on_empty_body(self):
         body = {}
         assert get_owner_reference(body) is None
+
+
+@pytest.mark.unit
+class TestGettingOwnerObject:
+    def test_getting_first_owner(self):
+        body = {
+            "metadata": {
+                "namespace": "default",
+                "ownerReferences": [
+                    {
+                        "apiVersion": "apps/v1",
+                        "kind": "ReplicaSet",
+                        "name": "firstOwner",
+                        "uid": "uid",
+                    },
+                ]
+            }
+        }
+
+        assert get_owner_object(body) == {
+            "apiVersion": "apps/v1",
+            "kind": "ReplicaSet",
+            "metadata": {"name": "firstOwner", "namespace": "default", "uid": "uid"},
+        }
+
+    def test_return_none_on_empty_body(self):
+        assert get_owner_object({}) is None
+
+
+@pytest.mark.unit
+class TestGettingObjectReference:
+    def test_getting_reference(self):
+        body = {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": "app", "namespace": "default", "uid": "uid", "labels": {"app": "app"}},
+            "spec": {"replicas": 1},
+        }
+
+        assert get_object_reference(body) == {
+            "apiVersion": "apps/v1",
+            "kind": "Deployment",
+            "metadata": {"name": "app", "namespace": "default", "uid": "uid"},
+        }
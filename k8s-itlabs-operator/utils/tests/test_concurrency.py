@@ -1,9 +1,12 @@
 import asyncio
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
 
 import pytest
 
-from utils.concurrency import ConnectorSourceLock
+from utils.concurrency import BoundedExecutor, ConnectorSourceLock, ConnectorSourceLockLost, ConnectorSourceLockTimeout
 
 
 @pytest.mark.unit
@@ -66,3 +69,133 @@ class TestConnectorSourceLock:
         await asyncio.sleep(self.thread_sleep_time)
         assert thread_1_task.done() is True
         assert thread_2_task.done() is True
+
+
+@pytest.mark.unit
+class TestConnectorSourceLockRegistry:
+    def test_waiters_acquire_in_fifo_order(self):
+        order = []
+        holder = ConnectorSourceLock("fifo-resource")
+        holder.acquire()
+
+        def wait_for_lock(number: int):
+            with ConnectorSourceLock("fifo-resource"):
+                order.append(number)
+
+        threads = []
+        for number in range(5):
+            thread = threading.Thread(target=wait_for_lock, args=(number,))
+            thread.start()
+            threads.append(thread)
+            # Waiters are queued in order of start
+            while len(ConnectorSourceLock._sources["fifo-resource"].waiters) <= number:
+                time.sleep(.001)
+
+        holder.release()
+        for thread in threads:
+            thread.join()
+
+        assert order == [0, 1, 2, 3, 4]
+
+    def test_release_wakes_waiter_of_released_source(self):
+        other = ConnectorSourceLock("still-locked-resource")
+        other.acquire()
+        holder = ConnectorSourceLock("released-resource")
+        holder.acquire()
+        acquired = threading.Event()
+
+        def wait_for_lock():
+            with ConnectorSourceLock("released-resource"):
+                acquired.set()
+
+        thread = threading.Thread(target=wait_for_lock)
+        thread.start()
+        holder.release()
+
+        assert acquired.wait(1)
+        thread.join()
+        other.release()
+
+    def test_acquire_timeout(self):
+        with ConnectorSourceLock("timeout-resource"):
+            with pytest.raises(ConnectorSourceLockTimeout):
+                ConnectorSourceLock("timeout-resource", timeout=.01).acquire()
+
+        assert "timeout-resource" not in ConnectorSourceLock._sources
+
+    def test_idle_source_is_removed(self):
+        with ConnectorSourceLock("idle-resource"):
+            assert "idle-resource" in ConnectorSourceLock._sources
+
+        assert "idle-resource" not in ConnectorSourceLock._sources
+
+
+@pytest.mark.unit
+class TestConnectorSourceLockLeaseBackend:
+    def test_lease_is_passed_to_local_waiter(self, mocker):
+        lease_class = mocker.patch('utils.concurrency.LeaseLock', return_value=MagicMock(is_lost=False))
+        holder = ConnectorSourceLock("lease-resource", backend='lease')
+        holder.acquire()
+        acquired = threading.Event()
+
+        def wait_for_lock():
+            with ConnectorSourceLock("lease-resource", backend='lease'):
+                acquired.set()
+
+        thread = threading.Thread(target=wait_for_lock)
+        thread.start()
+        while not ConnectorSourceLock._sources["lease-resource"].waiters:
+            time.sleep(.001)
+        holder.release()
+        thread.join()
+
+        assert acquired.is_set()
+        assert lease_class.call_count == 1
+        lease_class.return_value.acquire.assert_called_once()
+        lease_class.return_value.release.assert_called_once()
+
+    def test_lease_is_released_after_waiter_timeout(self, mocker):
+        lease_class = mocker.patch('utils.concurrency.LeaseLock', return_value=MagicMock(is_lost=False))
+        holder = ConnectorSourceLock("lease-timeout-resource", backend='lease')
+        holder.acquire()
+
+        with pytest.raises(ConnectorSourceLockTimeout):
+            ConnectorSourceLock("lease-timeout-resource", timeout=.01, backend='lease').acquire()
+        holder.release()
+
+        lease_class.return_value.release.assert_called_once()
+        assert "lease-timeout-resource" not in ConnectorSourceLock._sources
+
+    def test_lost_lease_fails_holder(self, mocker):
+        lease_class = mocker.patch('utils.concurrency.LeaseLock', return_value=MagicMock(is_lost=True))
+
+        with pytest.raises(ConnectorSourceLockLost):
+            with ConnectorSourceLock("lost-resource", backend='lease'):
+                pass
+
+        lease_class.return_value.release.assert_called_once()
+        assert "lost-resource" not in ConnectorSourceLock._sources
+
+
+@pytest.mark.unit
+class TestBoundedExecutor:
+    def test_call_over_backlog_is_not_submitted(self):
+        started, finish = threading.Event(), threading.Event()
+
+        def work():
+            started.set()
+            finish.wait(5)
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            executor = BoundedExecutor(pool, backlog=2)
+            first, second = executor.submit(work), executor.submit(work)
+            started.wait(5)
+
+            assert executor.submit(work) is None
+            finish.set()
+            first.result(5), second.result(5)
+            # Backlog is freed by callback of finished call
+            while executor.pending:
+                time.sleep(.001)
+
+            assert executor.submit(work).result(5) is None
@@ -0,0 +1,53 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from observability.metrics.metrics import app_http_client_requests_total, app_http_client_connections_total
+from utils.http import create_session
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'{}')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def counter_value(counter, client: str) -> float:
+    return counter.labels(client=client)._value.get()
+
+
+@pytest.mark.unit
+class TestCreateSession:
+    def test_connection_is_reused(self, server_url):
+        session = create_session('test_reuse')
+
+        for _ in range(3):
+            assert session.get(server_url, timeout=5).ok
+
+        assert counter_value(app_http_client_requests_total, 'test_reuse') == 3
+        assert counter_value(app_http_client_connections_total, 'test_reuse') == 1
+
+    def test_only_get_is_retried(self):
+        session = create_session('test_retries')
+        retries = session.get_adapter('http://').max_retries
+
+        assert retries.is_retry('GET', 503)
+        assert not retries.is_retry('POST', 503)
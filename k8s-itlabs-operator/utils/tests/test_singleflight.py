@@ -0,0 +1,81 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from utils.singleflight import SingleFlight
+
+
+def run_concurrently(flight: SingleFlight, fn, count: int = 5):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do("key", fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def slow(result=None, error=None):
+    def fn():
+        time.sleep(.05)
+        if error:
+            raise error
+        return result
+    return MagicMock(side_effect=fn)
+
+
+@pytest.mark.unit
+class TestSingleFlight:
+    def test_concurrent_calls_share_result(self):
+        fn = slow(result="result")
+
+        results, errors = run_concurrently(SingleFlight("test", share_window=0), fn)
+
+        assert fn.call_count == 1
+        assert results == ["result"] * 5
+        assert not errors
+
+    def test_concurrent_calls_share_exception(self):
+        error = ValueError("failed")
+        fn = slow(error=error)
+
+        results, errors = run_concurrently(SingleFlight("test", share_window=60), fn)
+
+        assert fn.call_count == 1
+        assert errors == [error] * 5
+
+    def test_exception_is_not_shared_after_completion(self):
+        flight = SingleFlight("test", share_window=60)
+        fn = MagicMock(side_effect=[ValueError(), "result"])
+
+        with pytest.raises(ValueError):
+            flight.do("key", fn)
+
+        assert flight.do("key", fn) == "result"
+
+    def test_result_is_shared_in_window(self):
+        flight = SingleFlight("test", share_window=60)
+        fn = MagicMock(return_value="result")
+
+        flight.do("key", fn)
+        flight.do("key", fn)
+
+        assert fn.call_count == 1
+
+    def test_result_is_not_shared_after_window(self):
+        flight = SingleFlight("test", share_window=0)
+        fn = MagicMock(return_value="result")
+
+        flight.do("key", fn)
+        flight.do("key", fn)
+
+        assert fn.call_count == 2